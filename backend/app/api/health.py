@@ -1,8 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.database import pool_status
 from app.services.deteccao import detector
+from app.services.micro_batcher import scheduler
+from app.services.write_behind import writer
 
 router = APIRouter(
     prefix="/health",
@@ -13,13 +16,36 @@ router = APIRouter(
 @router.get("")
 def health_check():
     model_ok = detector.model is not None
-    data_ok = detector.df is not None
 
-    return {
-        "status": "ok" if (model_ok and data_ok) else "unavailable",
+    response = {
+        "status": "ok" if (model_ok and detector.ready) else "unavailable",
         "service": settings.APP_NAME,
         "model_loaded": model_ok,
-        "data_loaded": data_ok,
-        "total_records": len(detector.df) if data_ok else 0,
+        "model_status": detector.status,
+        "model_version": detector.version,
         "timestamp": datetime.utcnow()
-    }
\ No newline at end of file
+    }
+
+    if scheduler.running:
+        response["micro_batching"] = scheduler.metrics.snapshot()
+
+    if writer.running:
+        response["write_behind"] = writer.metrics.snapshot()
+
+    response["database_pools"] = pool_status()
+
+    return response
+
+
+@router.get("/ready")
+def readiness_check(response: Response):
+    """
+    Readiness: 200 somente depois que o modelo foi carregado e aquecido.
+    """
+    if not detector.ready:
+        response.status_code = 503
+
+    return {
+        "ready": detector.ready,
+        "model_status": detector.status,
+    }
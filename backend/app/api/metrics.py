@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Response
+
+from app.core.database import pool_status
+from app.core.metrics import CONTENT_TYPE, metrics
+from app.services.deteccao import detector
+from app.services.micro_batcher import scheduler
+from app.services.write_behind import writer
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Health"]
+)
+
+
+@router.get("", response_class=Response)
+def prometheus_metrics():
+    """
+    Métricas no formato texto do Prometheus. Os valores são do processo:
+    com vários workers do uvicorn, cada scrape vê um deles.
+    """
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+# ======================================================
+# COLETA (estado lido a cada scrape)
+# ======================================================
+
+def _register_pool_metrics() -> None:
+    gauges = {
+        "checked_out": "Conexões em uso",
+        "idle": "Conexões abertas e livres",
+        "capacity": "pool_size + max_overflow",
+        "saturation": "Conexões em uso / capacidade",
+    }
+    counters = {
+        "checkouts": "Conexões entregues pelo pool",
+        "timeouts": "Checkouts que esgotaram DB_POOL_TIMEOUT_SECONDS",
+    }
+
+    for key, documentation in {**gauges, **counters}.items():
+        metrics.callback(
+            f"db_pool_{key}{'_total' if key in counters else ''}",
+            documentation,
+            lambda key=key: {(name,): pool[key] for name, pool in pool_status().items()},
+            labelnames=["pool"],
+            type="counter" if key in counters else "gauge",
+        )
+
+
+def _register_snapshot_counters(prefix: str, component, keys: dict) -> None:
+    for key, documentation in keys.items():
+        metrics.callback(
+            f"{prefix}_{key}_total",
+            documentation,
+            lambda key=key: {(): component.metrics.snapshot()[key]},
+            type="counter",
+        )
+
+
+_register_pool_metrics()
+
+_register_snapshot_counters("micro_batch", scheduler, {
+    "submitted": "Predições enfileiradas no micro-batching",
+    "rejected": "Predições rejeitadas com a fila cheia",
+    "timed_out": "Predições que esgotaram MICRO_BATCH_TIMEOUT_MS",
+    "batches": "Lotes enviados ao modelo",
+})
+
+_register_snapshot_counters("write_behind", writer, {
+    "enqueued": "Linhas aceitas na fila de persistência",
+    "rejected": "Linhas rejeitadas com a fila cheia",
+    "flushed_rows": "Linhas gravadas no banco",
+    "failed_flushes": "Flushes que falharam",
+    "spilled_rows": "Linhas desviadas para o arquivo de spill",
+})
+
+metrics.callback(
+    "model_ready",
+    "1 quando o modelo está carregado e aquecido",
+    lambda: {(detector.version or "",): float(detector.ready)},
+    labelnames=["version"],
+)
@@ -0,0 +1,48 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.core.profiling import profiler, verify_profile_token
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["Health"]
+)
+
+
+def require_profile_token(
+    x_profile_token: Optional[str] = Header(default=None)
+) -> None:
+    """
+    Os perfis trazem caminhos do código e SQL: só saem com um
+    X-Profile-Token válido. Sem PROFILING_SECRET nenhum token é válido
+    (create_app nem registra as rotas).
+    """
+    if not profiler.secret:
+        raise HTTPException(status_code=403, detail="PROFILING_SECRET não definido")
+
+    if not verify_profile_token(profiler.secret, x_profile_token):
+        raise HTTPException(status_code=403, detail="X-Profile-Token inválido ou expirado")
+
+
+@router.get("", dependencies=[Depends(require_profile_token)])
+def list_profiles(limit: int = Query(20, ge=1, le=200)):
+    """
+    Perfis mais recentes, com os hotspots (frames com mais amostras
+    próprias e acumuladas) e os comandos SQL mais demorados.
+    """
+    return profiler.recent(limit)
+
+
+@router.get("/{name}", dependencies=[Depends(require_profile_token)])
+def get_profile(name: str):
+    """
+    Pilhas no formato folded, para flamegraph.pl, speedscope ou inferno.
+    """
+    path = profiler.folded_path(name)
+
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    return FileResponse(path, media_type="text/plain", filename=path.name)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.routes import prediction, anomalies, kpis, transactions
+from app.api.v1.routes import prediction, anomalies, kpis, transactions, models
 
 api_router = APIRouter()
 
@@ -8,3 +8,4 @@ api_router.include_router(prediction.router)
 api_router.include_router(anomalies.router)
 api_router.include_router(kpis.router)
 api_router.include_router(transactions.router)
+api_router.include_router(models.router)
@@ -1,8 +1,19 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
-
-from app.core.database import get_session
-from app.repositories.transactions_repository import TransactionsRepository
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import kpi_cache
+from app.core.database import get_async_read_session
+from app.core.responses import trusted_response
+from app.repositories.kpi_repository import AsyncKPIRepository
+from app.repositories.transactions_repository import AsyncTransactionsRepository
+from app.api.v1.routes.transactions import (
+    FIELDS_QUERY,
+    next_cursor,
+    parse_cursor,
+    parse_fields,
+)
 
 router = APIRouter(
     prefix="/anomalies",
@@ -11,29 +22,41 @@ router = APIRouter(
 
 
 @router.get("")
-def list_anomalies(
-    limit: int = 100,
-    offset: int = 0,
-    session: Session = Depends(get_session)
+async def list_anomalies(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    session: AsyncSession = Depends(get_async_read_session)
 ):
-    repo = TransactionsRepository(session)
+    repo = AsyncTransactionsRepository(session)
 
-    anomalies = repo.list_anomalies(
+    anomalies = await repo.list_anomalies(
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=parse_cursor(cursor, offset),
+        columns=parse_fields(fields)
+    )
+
+    # Mesmos contadores do /kpis/overview (em cache): os totais "live",
+    # sem os meses arquivados, cobrem as mesmas linhas da listagem
+    overview = await kpi_cache.get_or_compute_async(
+        "anomalies:overview",
+        lambda: AsyncKPIRepository.overview(session)
     )
 
-    total = repo.count()
-    total_anomalies = repo.count_anomalies()
+    total = overview["total_transactions"]
+    total_anomalies = overview["total_anomalies"]
 
     percentage = (
         (total_anomalies / total) * 100
         if total > 0 else 0
     )
 
-    return {
+    return trusted_response({
         "total_transactions": total,
         "total_anomalies": total_anomalies,
         "percentage": f"{percentage:.2f}%",
+        "next_cursor": next_cursor(anomalies, limit),
         "data": anomalies
-    }
+    })
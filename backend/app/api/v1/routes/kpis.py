@@ -1,51 +1,63 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import get_session
-from app.repositories.kpi_repository import KPIRepository
+from app.core.cache import cached_json_response
+from app.core.database import get_async_read_session
+from app.repositories.kpi_repository import AsyncKPIRepository
 
 router = APIRouter(
     prefix="/kpis",
     tags=["KPIs"]
 )
 
+# Respostas servidas pelo kpi_cache, com ETag / 304 (ver cached_json_response)
+
 
 @router.get("/overview")
-def kpis_overview(
-    session: Session = Depends(get_session)
+async def kpis_overview(
+    request: Request,
+    session: AsyncSession = Depends(get_async_read_session)
 ):
 
-    total = KPIRepository.total_transactions(session)
-    anomalies = KPIRepository.total_anomalies(session)
-
-    return {
-        "total_transactions": total,
-        "total_anomalies": anomalies,
-        "anomaly_rate": KPIRepository.anomaly_rate(session)
-    }
+    return await cached_json_response(
+        request,
+        lambda: AsyncKPIRepository.overview(session)
+    )
 
 
 @router.get("/risk-distribution")
-def risk_distribution(
-    session: Session = Depends(get_session)
+async def risk_distribution(
+    request: Request,
+    session: AsyncSession = Depends(get_async_read_session)
 ):
 
-    return KPIRepository.risk_distribution(session)
+    return await cached_json_response(
+        request,
+        lambda: AsyncKPIRepository.risk_distribution(session)
+    )
 
 
 @router.get("/daily-transactions")
-def daily_transactions(
+async def daily_transactions(
+    request: Request,
     limit: int = 30,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
 
-    return KPIRepository.daily_transactions(session, limit)
+    return await cached_json_response(
+        request,
+        lambda: AsyncKPIRepository.daily_transactions(session, limit)
+    )
 
 
 @router.get("/daily-anomalies")
-def daily_anomalies(
+async def daily_anomalies(
+    request: Request,
     limit: int = 30,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
 
-    return KPIRepository.daily_anomalies(session, limit)
+    return await cached_json_response(
+        request,
+        lambda: AsyncKPIRepository.daily_anomalies(session, limit)
+    )
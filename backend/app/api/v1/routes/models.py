@@ -0,0 +1,65 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core.config import settings
+from app.core.profiling import verify_profile_token
+from app.services.model_registry import registry, ModelActivationError
+
+router = APIRouter(
+    prefix="/models",
+    tags=["Modelos"]
+)
+
+
+def require_admin_token(
+    x_admin_token: Optional[str] = Header(default=None)
+) -> None:
+    """
+    Ativação e rollback trocam o modelo de toda a API: só com um
+    X-Admin-Token válido. Sem MODELS_ADMIN_SECRET nenhum token é válido.
+    """
+    if not settings.MODELS_ADMIN_SECRET:
+        raise HTTPException(status_code=403, detail="MODELS_ADMIN_SECRET não definido")
+
+    if not verify_profile_token(settings.MODELS_ADMIN_SECRET, x_admin_token):
+        raise HTTPException(status_code=403, detail="X-Admin-Token inválido ou expirado")
+
+
+@router.get("")
+def list_models():
+    return registry.status()
+
+
+@router.post("/rollback", dependencies=[Depends(require_admin_token)])
+def rollback_model():
+    try:
+        version = registry.rollback()
+    except ModelActivationError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    return {"active_version": version}
+
+
+@router.post(
+    "/{version}/activate",
+    status_code=202,
+    dependencies=[Depends(require_admin_token)]
+)
+def activate_model(version: str):
+    """
+    Carrega, valida e ativa a versão em background.
+    Acompanhe o resultado em GET /models.
+    """
+    if version not in registry.available_versions():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Versão não encontrada: {version}"
+        )
+
+    try:
+        registry.activate(version)
+    except ModelActivationError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    return {"activating": version}
@@ -1,11 +1,26 @@
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.schemas.transaction import TransactionInput, PredictionResponse
-from app.services.deteccao import detector
-from app.core.database import get_session
+from app.schemas.transaction import (
+    TransactionInput,
+    PredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+)
+from app.services.deteccao import detector, REQUIRED_FEATURES
+from app.services.micro_batcher import scheduler, SchedulerOverloadedError
+from app.services.write_behind import writer, PersistenceQueueFullError
+from app.core.database import get_async_session
+from app.core.metrics import PREDICT_STAGE_SECONDS
+from app.core.middleware import elapsed_since_request_start
 from app.models.transaction import Transaction
-from app.repositories.transactions_repository import TransactionsRepository
+from app.repositories.transactions_repository import AsyncTransactionsRepository
 
 router = APIRouter(
     prefix="/predict",
@@ -14,32 +29,194 @@ router = APIRouter(
 
 
 @router.post("", response_model=PredictionResponse)
-def predict_transaction(
+async def predict_transaction(
     request: TransactionInput,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    if detector.model is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Modelo de fraude não carregado"
-        )
+    _observe_parse("predict")
+    _ensure_model_ready()
 
+    # O scoring é CPU: roda na thread do micro-batching ou no
+    # threadpool, nunca no event loop
     try:
-        result = detector.predict_transaction(request.features)
+        with PREDICT_STAGE_SECONDS.time("predict", "score"):
+            if scheduler.running:
+                result = await scheduler.submit_async(request.features)
+            else:
+                result = await run_in_threadpool(
+                    detector.predict_transaction,
+                    request.features
+                )
+    except SchedulerOverloadedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="Tempo esgotado aguardando o modelo"
+        )
     except Exception as exc:
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao executar modelo: {exc}"
         )
 
+    if writer.running:
+        # A resposta não espera o commit; a linha entra no próximo flush
+        features = {key.lower(): value for key, value in request.features.items()}
+        row = {name: features[name] for name in REQUIRED_FEATURES}
+        row.update({
+            "prediction": -1 if result["is_fraud"] else 1,
+            "risk_score": result["probability"],
+            "risk_level": result["risk_level"],
+            "model_version": result["model_version"],
+            "created_at": datetime.utcnow(),
+        })
+        with PREDICT_STAGE_SECONDS.time("predict", "persist"):
+            await _enqueue_rows([row])
+        return result
+
     transaction = Transaction(
         **request.features,
         prediction=-1 if result["is_fraud"] else 1,
         risk_score=result["probability"],
-        risk_level=result["risk_level"]
+        risk_level=result["risk_level"],
+        model_version=result["model_version"]
     )
 
-    repo = TransactionsRepository(session)
-    repo.create(transaction)
+    repo = AsyncTransactionsRepository(session)
+    with PREDICT_STAGE_SECONDS.time("predict", "persist"):
+        await repo.create(transaction)
+
+    return result
+
+
+@router.post("/batch", response_model=BatchPredictionResponse)
+async def predict_batch(
+    request: BatchPredictionRequest,
+    session: AsyncSession = Depends(get_async_session)
+):
+    _observe_parse("batch")
+    _ensure_model_ready()
+
+    # Validação e scoring do lote são CPU: fora do event loop
+    with PREDICT_STAGE_SECONDS.time("batch", "score"):
+        items, rows = await run_in_threadpool(_score_batch, request.transactions)
+
+    with PREDICT_STAGE_SECONDS.time("batch", "persist"):
+        if writer.running:
+            await _enqueue_rows(rows)
+        else:
+            repo = AsyncTransactionsRepository(session)
+            await repo.create_many(rows)
+
+    return {
+        "total": len(items),
+        "processed": len(rows),
+        "failed": len(items) - len(rows),
+        "items": items,
+    }
+
+
+def _score_batch(
+    transactions: List[Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Valida e pontua os itens do lote. Retorna os itens da resposta
+    e as linhas a persistir (só as válidas).
+    """
+    items: List[Dict[str, Any]] = []
+    valid: List[Tuple[int, Dict[str, float]]] = []
+
+    for index, raw in enumerate(transactions):
+        features, errors = _validate_batch_item(raw)
+
+        if errors:
+            items.append({"index": index, "success": False, "errors": errors})
+        else:
+            items.append({"index": index, "success": True})
+            valid.append((index, features))
+
+    try:
+        results = detector.predict_batch([features for _, features in valid])
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao executar modelo: {exc}"
+        )
+
+    created_at = datetime.utcnow()
+    rows = []
+
+    for (index, features), result in zip(valid, results):
+        items[index]["result"] = result
+        rows.append({
+            **features,
+            "prediction": -1 if result["is_fraud"] else 1,
+            "risk_score": result["probability"],
+            "risk_level": result["risk_level"],
+            "model_version": result["model_version"],
+            "created_at": created_at,
+        })
+
+    return items, rows
+
+
+async def _enqueue_rows(rows: List[Dict[str, Any]]) -> None:
+    # Com a fila cheia, enqueue espera por espaço: fica no threadpool
+    try:
+        await run_in_threadpool(writer.enqueue_many, rows)
+    except PersistenceQueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+
+def _observe_parse(endpoint: str) -> None:
+    # Da chegada da requisição até a rota: corpo, JSON, validação
+    # pydantic e dependências
+    elapsed = elapsed_since_request_start()
+    if elapsed is not None:
+        PREDICT_STAGE_SECONDS.observe(elapsed, endpoint, "parse")
+
+
+def _ensure_model_ready() -> None:
+    if not detector.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Modelo de fraude carregando"
+        )
+
+    if detector.model is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Modelo de fraude não carregado"
+        )
+
+
+def _validate_batch_item(
+    raw: Any
+) -> Tuple[Optional[Dict[str, float]], List[str]]:
+    """
+    Valida um item do lote isoladamente, retornando as features
+    normalizadas (minúsculas, apenas as colunas do modelo) ou os erros.
+    """
+    try:
+        payload = TransactionInput.model_validate(raw)
+    except ValidationError as exc:
+        return None, [
+            ": ".join(filter(None, [
+                ".".join(str(loc) for loc in error["loc"]),
+                error["msg"],
+            ]))
+            for error in exc.errors()
+        ]
+
+    features = {key.lower(): value for key, value in payload.features.items()}
+
+    missing = [name for name in REQUIRED_FEATURES if name not in features]
+    if missing:
+        return None, [f"Features faltando: {missing}"]
+
+    invalid = [name for name in REQUIRED_FEATURES if not math.isfinite(features[name])]
+    if invalid:
+        return None, [f"Valores não finitos: {invalid}"]
 
-    return result
\ No newline at end of file
+    return {name: features[name] for name in REQUIRED_FEATURES}, []
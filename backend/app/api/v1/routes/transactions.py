@@ -1,10 +1,23 @@
-from fastapi import APIRouter, Depends, Query
-from sqlmodel import Session
+from typing import List, Literal, Optional
 
-from app.core.database import get_session
-from app.repositories.transactions_repository import TransactionsRepository
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_async_read_session
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import trusted_response
+from app.models.transaction import Transaction
+from app.repositories.transactions_repository import (
+    AsyncTransactionsRepository,
+    TransactionsRepository,
+)
+from app.services.export import MEDIA_TYPES, stream_export
 from app.schemas.transaction import (
+    SUMMARY_FIELDS,
+    TRANSACTION_FIELDS,
     TransactionFilter,
+    TransactionRead,
     PaginatedTransactionsResponse,
 )
 
@@ -13,17 +26,38 @@ router = APIRouter(
     tags=["Transações"],
 )
 
+FIELDS_QUERY = Query(
+    None,
+    description=(
+        "Campos de cada item separados por vírgula (id e created_at "
+        "sempre vêm), ou 'all' para o vetor completo. Padrão: "
+        + ",".join(SUMMARY_FIELDS)
+    ),
+)
+
 
 @router.get("", response_model=PaginatedTransactionsResponse)
-def list_transactions(
+async def list_transactions(
     filters: TransactionFilter = Depends(),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = Query(
+        None,
+        description="next_cursor da página anterior (substitui offset)"
+    ),
+    count: Literal["exact", "estimate", "none"] = Query(
+        "exact",
+        description="Total exato, estimado pelo planner ou omitido"
+    ),
+    fields: Optional[str] = FIELDS_QUERY,
+    session: AsyncSession = Depends(get_async_read_session),
 ):
-    repo = TransactionsRepository(session)
+    keyset = parse_cursor(cursor, offset)
+    columns = parse_fields(fields)
+
+    repo = AsyncTransactionsRepository(session)
 
-    total, items = repo.list_with_filters(
+    total, items = await repo.list_with_filters(
         limit=limit,
         offset=offset,
         is_fraud=filters.is_fraud,
@@ -32,11 +66,128 @@ def list_transactions(
         max_risk_score=filters.max_risk_score,
         min_amount=filters.min_amount,
         max_amount=filters.max_amount,
+        created_from=filters.created_from,
+        created_to=filters.created_to,
+        cursor=keyset,
+        count=count,
+        columns=columns,
     )
 
-    return {
+    return trusted_response({
         "total": total,
+        "total_estimated": count == "estimate" and repo.can_estimate,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor(items, limit),
         "items": items,
-    }
\ No newline at end of file
+    })
+
+
+@router.get("/export")
+async def export_transactions(
+    filters: TransactionFilter = Depends(),
+    format: Literal["ndjson", "csv", "parquet"] = Query(
+        "ndjson",
+        description="Formato do arquivo"
+    ),
+    gzip: bool = Query(
+        False,
+        description="Comprime o corpo (Content-Encoding: gzip)"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Campos separados por vírgula. Padrão: todos"
+    ),
+):
+    """
+    Todas as transações que atendem aos filtros, em ordem de
+    created_at, transmitidas em blocos a partir de um cursor do
+    servidor (memória constante, sem paginação).
+
+    O corpo é gerado no threadpool, com conexão síncrona própria (ver
+    stream_export): a rota não usa a AsyncSession.
+    """
+    columns = parse_fields(fields) if fields else TRANSACTION_FIELDS
+
+    statement = (
+        TransactionsRepository.filter_statement(
+            columns=columns,
+            **filters.model_dump(),
+        )
+        .order_by(Transaction.created_at, Transaction.id)
+    )
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="transactions.{format}"'
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        stream_export(statement, columns, format, gzip=gzip),
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+@router.get("/{transaction_id}", response_model=TransactionRead)
+async def get_transaction(
+    transaction_id: int,
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    """Transação completa, com todas as features."""
+    transaction = await AsyncTransactionsRepository(session).get(transaction_id)
+
+    if transaction is None:
+        raise HTTPException(status_code=404, detail="Transação não encontrada")
+
+    return trusted_response(transaction.model_dump())
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Colunas do SELECT para ?fields=. id e created_at entram sempre
+    (o next_cursor depende deles); a ordem é a de TransactionRead.
+    """
+    if fields is None:
+        return SUMMARY_FIELDS
+
+    if fields.strip() == "all":
+        return TRANSACTION_FIELDS
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+
+    unknown = requested - set(TRANSACTION_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos inválidos: {', '.join(sorted(unknown))}"
+        )
+
+    requested |= {"id", "created_at"}
+    return [name for name in TRANSACTION_FIELDS if name in requested]
+
+
+def parse_cursor(cursor: Optional[str], offset: int):
+    if cursor is None:
+        return None
+
+    if offset:
+        raise HTTPException(
+            status_code=400,
+            detail="Use cursor ou offset, não os dois"
+        )
+
+    try:
+        return decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def next_cursor(items, limit: int) -> Optional[str]:
+    """Cursor do último item, se a página veio cheia (e não vazia)."""
+    if not items or len(items) < limit:
+        return None
+
+    last = items[-1]
+    return encode_cursor(last["created_at"], last["id"])
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.responses import dumps
+
+
+class TTLCache:
+    """
+    Cache em memória do processo, com expiração por tempo.
+
+    invalidate() descarta tudo: é chamado depois de cada escrita em
+    transactions feita por este processo. Escritas de outros processos
+    (seed, outros workers do uvicorn) aparecem em até ttl segundos.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    async def get_or_compute_async(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = await compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+async def cached_json_response(
+    request: Request,
+    compute: Callable[[], Awaitable[Any]],
+    cache: Optional[TTLCache] = None,
+) -> Response:
+    """
+    Resposta JSON servida pelo cache (chave = caminho + query string),
+    com ETag e Cache-Control. Se o If-None-Match do cliente bate com
+    o ETag atual, responde 304 sem corpo.
+
+    compute é uma corrotina (ex.: AsyncKPIRepository.overview), só
+    aguardada quando a chave não está no cache.
+    """
+    cache = cache or kpi_cache
+    key = f"{request.url.path}?{request.url.query}"
+
+    async def render() -> Tuple[bytes, str]:
+        body = dumps(await compute())
+        return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+    body, etag = await cache.get_or_compute_async(key, render)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={int(cache.ttl)}, must-revalidate",
+    }
+
+    client_tags = _parse_if_none_match(request.headers.get("if-none-match"))
+    if etag in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _parse_if_none_match(header: Optional[str]) -> set:
+    if not header:
+        return set()
+
+    return {
+        tag.strip().removeprefix("W/")
+        for tag in header.split(",")
+    }
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+kpi_cache = TTLCache(settings.KPI_CACHE_TTL_SECONDS)
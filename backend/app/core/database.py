@@ -1,19 +1,307 @@
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.core.pool_metrics import PoolMetrics, instrumented_pool
+from app.repositories.partitions_repository import PartitionsRepository
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = settings.DATABASE_URL
+DATABASE_READ_URL = settings.DATABASE_READ_URL or DATABASE_URL
+
+# Métricas de cada pool, pelo nome dado em create_pooled_engine
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def create_pooled_engine(
+    url: str,
+    name: str,
+    pool_size: int,
+    max_overflow: int,
+    is_async: bool = False,
+    connect_args: Optional[Dict] = None,
+):
+    """
+    Engine com pool próprio, dimensionado pelas configurações DB_* e
+    instrumentado em pool_metrics[name]. Com is_async cria um
+    AsyncEngine: postgresql+psycopg serve aos dois modos, e uma URL
+    sqlite (banco local no lugar do PostgreSQL) passa a usar aiosqlite.
+    connect_args vai para o driver (ex.: options com search_path).
+    """
+    metrics = PoolMetrics(name, pool_size, max_overflow)
+    pool_metrics[name] = metrics
+
+    url = make_url(url)
+    if is_async and url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    factory = create_async_engine if is_async else create_engine
+    pool_class = AsyncAdaptedQueuePool if is_async else QueuePool
+
+    return factory(
+        url,
+        echo=settings.DB_ECHO,
+        pool_pre_ping=True,
+        poolclass=instrumented_pool(pool_class, metrics),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        connect_args=connect_args or {},
+    )
 
-engine = create_engine(
+
+# Escrita (banco principal): write-behind, manutenção de partições,
+# startup e scripts
+engine = create_pooled_engine(
     DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True
+    "write",
+    settings.DB_WRITE_POOL_SIZE,
+    settings.DB_WRITE_MAX_OVERFLOW,
+)
+
+# Leitura (réplica, se DATABASE_READ_URL): exportação
+read_engine = create_pooled_engine(
+    DATABASE_READ_URL,
+    "read",
+    settings.DB_READ_POOL_SIZE,
+    settings.DB_READ_MAX_OVERFLOW,
 )
 
+# Engines das rotas (AsyncSession), com os mesmos papéis: /predict
+# escreve no principal; listagens e KPIs do dashboard leem em um pool
+# separado e não disputam conexões com as predições
+async_engine = create_pooled_engine(
+    DATABASE_URL,
+    "async_write",
+    settings.DB_WRITE_POOL_SIZE,
+    settings.DB_WRITE_MAX_OVERFLOW,
+    is_async=True,
+)
+
+async_read_engine = create_pooled_engine(
+    DATABASE_READ_URL,
+    "async_read",
+    settings.DB_READ_POOL_SIZE,
+    settings.DB_READ_MAX_OVERFLOW,
+    is_async=True,
+)
+
+
+# Alterações em tabelas já existentes (create_all só cria o que falta).
+# Cada comando precisa ser idempotente e barato (só catálogo): roda a
+# cada startup, em cada processo, serializado por SCHEMA_LOCK.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS model_version VARCHAR",
+]
+
+# Índices de Transaction.__table_args__ para bancos criados antes deles.
+# Construir um índice em uma tabela grande leva minutos, então não
+# acontece no startup (que só avisa o que falta): é feito uma vez por
+# scripts/create_indexes.py, com CREATE INDEX CONCURRENTLY.
+INDEX_UPGRADES = {
+    "ix_transactions_created_at_id":
+        "ON transactions (created_at DESC, id DESC)",
+    "ix_transactions_anomalies_created_at_id":
+        "ON transactions (created_at DESC, id DESC) WHERE prediction = -1",
+    "ix_transactions_risk_level_created_at_id":
+        "ON transactions (risk_level, created_at DESC, id DESC)",
+    "ix_transactions_risk_score":
+        "ON transactions (risk_score)",
+    "ix_transactions_amount":
+        "ON transactions (amount)",
+}
+
+# Índices que um índice de INDEX_UPGRADES tornou redundantes: removidos
+# por scripts/create_indexes.py depois que o substituto está válido
+OBSOLETE_INDEXES = {
+    "ix_transactions_risk_level": "ix_transactions_risk_level_created_at_id",
+}
+
+# Advisory lock (pg_advisory_lock(hashtext(...))) das alterações de schema
+SCHEMA_LOCK = "fraud-detection:schema"
+
+
+def create_db_and_tables(bind=None):
+    bind = bind or engine
+
+    SQLModel.metadata.create_all(bind)
+    apply_schema_upgrades(bind)
+
+
+def apply_schema_upgrades(bind=None):
+    """
+    Aplica SCHEMA_UPGRADES e avisa (sem construir) os índices de
+    INDEX_UPGRADES ausentes ou INVALID.
+    """
+    bind = bind or engine
+
+    if bind.dialect.name != "postgresql":
+        return
+
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("SELECT pg_advisory_lock(hashtext(:lock))"), {"lock": SCHEMA_LOCK})
+        try:
+            for statement in SCHEMA_UPGRADES:
+                connection.exec_driver_sql(statement)
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(hashtext(:lock))"), {"lock": SCHEMA_LOCK})
+
+        pending = {
+            name: state
+            for name, state in index_states(connection).items()
+            if state != "valid"
+        }
+        obsolete = obsolete_indexes(connection)
+
+    if pending:
+        logger.warning(
+            f"⚠️ Índices ausentes ou INVALID em transactions: {pending}. "
+            "Rode python scripts/create_indexes.py"
+        )
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    if obsolete:
+        logger.warning(
+            f"⚠️ Índices redundantes em transactions: {obsolete}. "
+            "Rode python scripts/create_indexes.py"
+        )
+
+
+def index_states(connection) -> Dict[str, str]:
+    """Estado de cada índice de INDEX_UPGRADES: valid, invalid ou missing."""
+    rows = connection.execute(
+        text(
+            "SELECT c.relname, i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = to_regclass('transactions') "
+            "AND c.relname = ANY(:names)"
+        ),
+        {"names": list(INDEX_UPGRADES)},
+    ).all()
+
+    found = {name: "valid" if valid else "invalid" for name, valid in rows}
+    return {name: found.get(name, "missing") for name in INDEX_UPGRADES}
+
+
+def obsolete_indexes(connection) -> List[str]:
+    """Índices de OBSOLETE_INDEXES que ainda existem em transactions."""
+    rows = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = to_regclass('transactions') "
+            "AND c.relname = ANY(:names)"
+        ),
+        {"names": list(OBSOLETE_INDEXES)},
+    ).scalars().all()
+
+    return sorted(rows)
+
+
+def create_indexes(bind=None, log=logger.info) -> Dict[str, str]:
+    """
+    Cria os índices de INDEX_UPGRADES que faltam. Um índice INVALID
+    (CREATE INDEX CONCURRENTLY interrompido, que IF NOT EXISTS pularia
+    para sempre) é removido e reconstruído. Depois remove os índices de
+    OBSOLETE_INDEXES cujo substituto está válido.
+
+    Usa CONCURRENTLY (não bloqueia escritas), exceto com transactions
+    particionada: o PostgreSQL não cria índices CONCURRENTLY na tabela
+    pai, e o build bloqueia as escritas até terminar.
+
+    Segura SCHEMA_LOCK durante todo o processo; se outro processo já o
+    tem, levanta RuntimeError em vez de disputar o mesmo índice.
+    Devolve o que foi feito com cada índice.
+    """
+    bind = bind or engine
+
+    if bind.dialect.name != "postgresql":
+        return {}
+
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(hashtext(:lock))"), {"lock": SCHEMA_LOCK}
+        ).scalar()
+        if not acquired:
+            raise RuntimeError("Outro processo está alterando o schema (advisory lock)")
+
+        try:
+            concurrently = (
+                "" if PartitionsRepository.is_partitioned(connection) else "CONCURRENTLY"
+            )
+
+            actions = {}
+            for name, state in index_states(connection).items():
+                if state == "valid":
+                    actions[name] = "ok"
+                    continue
+
+                if state == "invalid":
+                    log(f"🧹 Removendo índice INVALID {name}")
+                    connection.exec_driver_sql(f"DROP INDEX {concurrently} IF EXISTS {name}")
+
+                log(f"🔨 Criando {name}...")
+                connection.exec_driver_sql(
+                    f"CREATE INDEX {concurrently} {name} {INDEX_UPGRADES[name]}"
+                )
+                actions[name] = "rebuilt" if state == "invalid" else "created"
+
+            # Aqui todos os índices de INDEX_UPGRADES já estão válidos
+            for name in obsolete_indexes(connection):
+                log(f"🧹 Removendo índice redundante {name}")
+                connection.exec_driver_sql(f"DROP INDEX {concurrently} IF EXISTS {name}")
+                actions[name] = "dropped"
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:lock))"), {"lock": SCHEMA_LOCK}
+            )
+
+    return actions
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    """Sessão de escrita (banco principal)."""
+    # expire_on_commit=False: ler um atributo depois do commit não pode
+    # disparar um refresh implícito (I/O fora de um await)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_session():
+    """
+    Sessão de leitura do dashboard. Com réplica, os dados podem estar
+    atrás do principal pelo atraso da replicação.
+    """
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def dispose_async_engines():
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+
+
+def pool_status() -> Dict[str, Dict]:
+    """Ocupação e espera no checkout de cada pool (ver PoolMetrics)."""
+    engines = {
+        "write": engine,
+        "read": read_engine,
+        "async_write": async_engine,
+        "async_read": async_read_engine,
+    }
+
+    return {
+        name: pool_metrics[name].snapshot(bound.pool)
+        for name, bound in engines.items()
+    }
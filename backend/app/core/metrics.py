@@ -0,0 +1,277 @@
+import bisect
+from contextlib import contextmanager
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Buckets padrão (s): de 25 µs (etapas do modelo) a 10 s (requisições)
+DEFAULT_BUCKETS = [
+    0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+class Counter:
+    """Contador monotônico, uma série por combinação de labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+
+        return [
+            (self.name, dict(zip(self.labelnames, labels)), value)
+            for labels, value in values
+        ]
+
+
+class _HistogramSeries:
+    __slots__ = ("_bounds", "_lock", "counts", "sum")
+
+    def __init__(self, bounds: List[float]) -> None:
+        self._bounds = bounds
+        self._lock = threading.Lock()
+        # Um contador por bucket, mais o +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._bounds, value)
+
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram:
+    """
+    Histograma de latências com buckets fixos. observe() custa uma
+    busca binária e um lock: pode ficar ligado no caminho quente.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = sorted(buckets)
+
+        self._lock = threading.Lock()
+        self._series: Dict[Labels, _HistogramSeries] = {}
+
+    def labels(self, *labels: str) -> _HistogramSeries:
+        series = self._series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labels, _HistogramSeries(self.buckets))
+        return series
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels(*labels).observe(value)
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        series = self.labels(*labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            series.observe(time.perf_counter() - start)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            series = list(self._series.items())
+
+        samples = []
+        for labels, values in series:
+            names = dict(zip(self.labelnames, labels))
+            counts, total = values.snapshot()
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + [math.inf], counts):
+                cumulative += count
+                samples.append((
+                    f"{self.name}_bucket",
+                    {**names, "le": _format_value(bound)},
+                    cumulative,
+                ))
+
+            samples.append((f"{self.name}_sum", names, total))
+            samples.append((f"{self.name}_count", names, cumulative))
+
+        return samples
+
+
+class CallbackMetric:
+    """
+    Gauge ou contador lido na hora da coleta, a partir de um estado que
+    já existe (pools, filas): callback devolve {labels: valor}.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge",
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.type = type
+        self._callback = callback
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labelnames, labels)), value)
+            for labels, value in self._callback().items()
+        ]
+
+
+class MetricsRegistry:
+    """Métricas do processo, no formato texto do Prometheus (render)."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge",
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, callback, labelnames, type))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+
+            for name, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(
+                        f'{key}="{_escape(label)}"' for key, label in labels.items()
+                    )
+                    name = f"{name}{{{rendered}}}"
+                lines.append(f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+metrics = MetricsRegistry()
+
+# Métricas do caminho quente (registradas aqui para não depender da
+# ordem de import dos módulos que as alimentam)
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições, do primeiro byte recebido ao último enviado",
+    ["method", "route", "status"],
+)
+
+PREDICT_STAGE_SECONDS = metrics.histogram(
+    "predict_stage_duration_seconds",
+    "Etapas das rotas de predição: parse (corpo, JSON e validação), "
+    "score e persist",
+    ["endpoint", "stage"],
+)
+
+MODEL_STAGE_SECONDS = metrics.histogram(
+    "model_stage_duration_seconds",
+    "Etapas do FraudDetector por caminho (single = vetor NumPy, "
+    "dataframe = process_dataframe)",
+    ["path", "stage"],
+)
+
+PREDICTIONS_TOTAL = metrics.counter(
+    "predictions_total",
+    "Transações pontuadas, por nível de risco",
+    ["risk_level"],
+)
+
+FALLBACK_PREDICTIONS_TOTAL = metrics.counter(
+    "fallback_predictions_total",
+    "Transações pontuadas em modo fallback (sem modelo ou scaler)",
+)
+
+DB_OPERATION_SECONDS = metrics.histogram(
+    "db_operation_duration_seconds",
+    "Chamadas aos repositories (inclui a espera por conexão) e commits",
+    ["operation"],
+)
+
+DB_POOL_CHECKOUT_WAIT_SECONDS = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Espera por uma conexão do pool",
+    ["pool"],
+)
@@ -0,0 +1,120 @@
+from contextvars import ContextVar
+import logging
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import HTTP_REQUEST_SECONDS
+from app.core.profiling import EXCLUDED_PATHS, PROFILE_HEADER, RequestProfiler
+
+logger = logging.getLogger(__name__)
+
+# perf_counter() da chegada da requisição (visível nas rotas async)
+request_started: ContextVar[Optional[float]] = ContextVar("request_started", default=None)
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware, que custa uma task e
+    uma fila por requisição) que mede cada requisição HTTP em
+    http_request_duration_seconds.
+
+    O label route é o template da rota (/api/v1/transactions/{transaction_id}),
+    não o caminho: a cardinalidade não cresce com os ids.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = request_started.set(start)
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_started.reset(token)
+            route = scope.get("route")
+
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Perfila as requisições escolhidas pelo profiler (header
+    X-Profile-Token assinado ou 1 a cada PROFILING_SAMPLE_EVERY): pilhas
+    amostradas durante a requisição e o tempo de cada SQL. As demais
+    passam direto, com o custo de ler um header.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(EXCLUDED_PATHS)
+            or not self.profiler.should_profile(_header(scope, PROFILE_HEADER))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        active = self.profiler.start(scope["method"], scope["path"])
+        if active is None:
+            # Outro perfil em andamento
+            await self.app(scope, receive, send)
+            return
+
+        profile, sampler = active
+        start = time.perf_counter()
+
+        async def send_with_status(message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.duration = time.perf_counter() - start
+            profile.route = getattr(scope.get("route"), "path", None)
+            self.profiler.finish(profile, sampler)
+
+            # Gravação em disco fora do event loop
+            try:
+                await run_in_threadpool(self.profiler.save, profile)
+            except OSError as exc:
+                logger.error(f"❌ Falha ao gravar o perfil {profile.name}: {exc}")
+
+
+def _header(scope, name: str) -> Optional[str]:
+    encoded = name.encode("latin-1")
+
+    for key, value in scope["headers"]:
+        if key == encoded:
+            return value.decode("latin-1")
+    return None
+
+
+def elapsed_since_request_start() -> Optional[float]:
+    """Segundos desde a chegada da requisição atual (None fora de uma)."""
+    start = request_started.get()
+    return None if start is None else time.perf_counter() - start
@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT_SECONDS
+
+# Limites superiores (ms) dos buckets de espera no checkout
+CHECKOUT_WAIT_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]
+
+
+class PoolMetrics:
+    """
+    Espera no checkout e ocupação de um pool de conexões.
+
+    A espera vai do pedido da conexão até o pool entregá-la: inclui a
+    fila quando todas estão em uso e a abertura de conexões novas.
+    """
+
+    def __init__(self, name: str, pool_size: int, max_overflow: int) -> None:
+        self.name = name
+        self.capacity = pool_size + max(max_overflow, 0)
+        self._wait_series = DB_POOL_CHECKOUT_WAIT_SECONDS.labels(name)
+
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_checked_out = 0
+        self.wait_buckets = {bound: 0 for bound in CHECKOUT_WAIT_BUCKETS_MS}
+
+    def record_checkout(self, wait: float, checked_out: int) -> None:
+        self._wait_series.observe(wait)
+
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+            for bound in CHECKOUT_WAIT_BUCKETS_MS:
+                if wait * 1000 <= bound:
+                    self.wait_buckets[bound] += 1
+                    break
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> Dict:
+        checked_out = pool.checkedout()
+
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "checked_out": checked_out,
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "saturation": (
+                    round(checked_out / self.capacity, 3)
+                    if self.capacity else 0.0
+                ),
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_checkout_wait_ms": (
+                    round(self.wait_total / self.checkouts * 1000, 3)
+                    if self.checkouts else 0.0
+                ),
+                "max_checkout_wait_ms": round(self.wait_max * 1000, 3),
+                "checkout_wait_buckets": {
+                    f"le_{bound}ms": count
+                    for bound, count in self.wait_buckets.items()
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+
+        self.metrics.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+
+def instrumented_pool(pool_class, metrics: PoolMetrics):
+    """
+    Subclasse de pool_class (QueuePool ou AsyncAdaptedQueuePool) que
+    registra cada checkout em metrics. As métricas ficam na classe:
+    sobrevivem ao recreate() que o engine faz no dispose().
+    """
+    return type(
+        f"Instrumented{pool_class.__name__}",
+        (_InstrumentedPoolMixin, pool_class),
+        {"metrics": metrics},
+    )
@@ -0,0 +1,424 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+import hashlib
+import hmac
+import json
+import logging
+import math
+from pathlib import Path
+import re
+import sys
+import sysconfig
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Header com o token assinado (ver sign_profile_token)
+PROFILE_HEADER = "x-profile-token"
+# Validade máxima de um token, mesmo que expires_at seja maior
+MAX_TOKEN_TTL_SECONDS = 24 * 3_600
+
+# Funções em que uma thread está parada esperando (não é CPU)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+# Rotas que nunca são perfiladas: ler os perfis com o token não pode
+# gerar perfis novos (e empurrar os antigos para fora da rotação)
+EXCLUDED_PATHS = ("/profiles",)
+
+# Quantos itens entram nos resumos (hotspots e SQL)
+SUMMARY_TOP = 10
+
+_FOLDED_UNSAFE = re.compile(r"[;\r\n]+")
+_SITE_PACKAGES = re.compile(r".*[\\/](site|dist)-packages[\\/]")
+_APP_ROOT = str(Path(__file__).resolve().parents[2])
+_STDLIB = sysconfig.get_paths()["stdlib"]
+
+
+# ======================================================
+# TOKEN ASSINADO
+# ======================================================
+
+def sign_profile_token(secret: str, expires_at: int) -> str:
+    """Token "<expires_at>:<hmac-sha256>" para o header X-Profile-Token."""
+    digest = hmac.new(secret.encode(), str(expires_at).encode(), hashlib.sha256)
+    return f"{expires_at}:{digest.hexdigest()}"
+
+
+def verify_profile_token(secret: str, token: Optional[str]) -> bool:
+    if not secret or not token:
+        return False
+
+    expires, _, _ = token.partition(":")
+    try:
+        expires_at = int(expires)
+    except ValueError:
+        return False
+
+    remaining = expires_at - time.time()
+    if remaining < 0 or remaining > MAX_TOKEN_TTL_SECONDS:
+        return False
+
+    return hmac.compare_digest(token, sign_profile_token(secret, expires_at))
+
+
+# ======================================================
+# AMOSTRAGEM
+# ======================================================
+
+class StackSampler:
+    """
+    Profiler estatístico: uma thread lê a pilha de todas as outras
+    (sys._current_frames) a cada interval segundos e conta as pilhas em
+    formato folded ("thread;frame;frame"). Threads esperando (fila,
+    select do event loop) são descartadas: só entra tempo de CPU e de
+    código nativo (pandas, sklearn, NumPy), atribuído à função Python
+    que o chamou.
+
+    Amostra o processo inteiro: com requisições concorrentes, o perfil
+    inclui o trabalho das outras. Enquanto amostra, o switch interval do
+    interpretador (5 ms por padrão) cai para interval: sem isso a thread
+    do sampler quase não consegue o GIL durante o trabalho de CPU.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval = sys.getswitchinterval()
+
+    def start(self) -> None:
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="stack-sampler",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        return self.stacks
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self.samples += 1
+
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+
+                stack = _folded_stack(frame)
+                if stack is not None:
+                    thread = _sanitize(names.get(ident, str(ident)))
+                    self.stacks[f"{thread};{stack}"] += 1
+
+
+def _folded_stack(frame) -> Optional[str]:
+    code = frame.f_code
+    if (Path(code.co_filename).name, code.co_name) in IDLE_FRAMES:
+        return None
+
+    frames = []
+    while frame is not None:
+        frames.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+
+    return ";".join(reversed(frames))
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_APP_ROOT):
+        filename = filename[len(_APP_ROOT) + 1:]
+    elif filename.startswith(_STDLIB) and "-packages" not in filename:
+        filename = filename[len(_STDLIB) + 1:]
+    else:
+        filename = _SITE_PACKAGES.sub("", filename)
+
+    return _sanitize(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+
+
+def _sanitize(label: str) -> str:
+    # ";" separa frames e a quebra de linha separa pilhas no formato folded
+    return _FOLDED_UNSAFE.sub("_", label)
+
+
+def _is_app_frame(label: str) -> bool:
+    # Código da aplicação, sem a própria camada de profiling/métricas
+    return "(app/" in label and "(app/core/middleware.py" not in label
+
+
+# ======================================================
+# SQL
+# ======================================================
+
+class SQLRecorder:
+    """
+    Tempo de cada comando SQL (eventos before/after_cursor_execute de
+    todos os engines, síncronos e assíncronos) enquanto um perfil está
+    ativo. É tempo de relógio: inclui a espera pelo banco, que a
+    amostragem de CPU não vê.
+    """
+
+    def __init__(self) -> None:
+        self.active: Optional[List[Tuple[str, float]]] = None
+        self._installed = False
+
+    def install(self) -> None:
+        if self._installed:
+            return
+
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+        self._installed = True
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self.active is not None:
+            conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.get("profiling_started")
+        if not started:
+            return
+
+        elapsed = time.perf_counter() - started.pop()
+        if self.active is not None:
+            self.active.append((" ".join(statement.split()), elapsed))
+
+
+# ======================================================
+# PERFIS
+# ======================================================
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    started_at: datetime
+    interval: float
+    route: Optional[str] = None
+    status: Optional[int] = None
+    duration: float = 0.0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    sql: List[Tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", self.path).strip("_")[:60] or "root"
+        return f"{self.started_at:%Y%m%dT%H%M%S%f}_{self.method}_{slug}"
+
+    def folded(self) -> str:
+        """
+        Pilhas no formato folded (flamegraph.pl, speedscope, inferno).
+        O SQL entra como a raiz [sql], convertido em amostras pelo
+        intervalo (tempo de relógio, não de CPU; no mínimo uma amostra
+        por comando).
+        """
+        stacks = Counter(self.stacks)
+
+        for statement, elapsed in self.sql:
+            samples = max(math.ceil(elapsed / self.interval), 1)
+            stacks[f"[sql];{_sanitize(statement[:120])}"] += samples
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def summary(self) -> Dict:
+        total = sum(self.stacks.values())
+        self_samples: Counter = Counter()
+        inclusive: Counter = Counter()
+
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # sem a thread
+            if not frames:
+                continue
+            self_samples[frames[-1]] += count
+            # Acumulado só do código da aplicação: o event loop, o
+            # Starlette e os middlewares aparecem em toda pilha
+            for frame in set(frames):
+                if _is_app_frame(frame):
+                    inclusive[frame] += count
+
+        def top(counter: Counter) -> List[Dict]:
+            return [
+                {
+                    "frame": frame,
+                    "samples": count,
+                    "percent": round(count / total * 100, 1) if total else 0.0,
+                }
+                for frame, count in counter.most_common(SUMMARY_TOP)
+            ]
+
+        statements: Dict[str, List[float]] = {}
+        for statement, elapsed in self.sql:
+            statements.setdefault(statement, []).append(elapsed)
+
+        slowest = sorted(statements.items(), key=lambda item: -sum(item[1]))
+
+        return {
+            "name": self.name,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "cpu_samples": total,
+            "hotspots": {"self": top(self_samples), "app_total": top(inclusive)},
+            "sql": {
+                "statements": len(self.sql),
+                "total_ms": round(sum(elapsed for _, elapsed in self.sql) * 1000, 3),
+                "top": [
+                    {
+                        "statement": statement[:500],
+                        "count": len(times),
+                        "total_ms": round(sum(times) * 1000, 3),
+                    }
+                    for statement, times in slowest[:SUMMARY_TOP]
+                ],
+            },
+        }
+
+
+class RequestProfiler:
+    """
+    Decide quais requisições perfilar (token assinado ou 1 a cada
+    sample_every), grava os perfis em directory e mantém só os
+    max_files mais recentes. Um perfil por vez: enquanto um está
+    ativo, as outras requisições passam sem perfil.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        secret: str = "",
+        sample_every: int = 0,
+        interval_ms: float = 5.0,
+        max_files: int = 100,
+    ) -> None:
+        self.directory = directory
+        self.secret = secret
+        self.sample_every = sample_every
+        self.interval = interval_ms / 1000
+        self.max_files = max_files
+
+        self.sql = SQLRecorder()
+        self._busy = threading.Lock()
+        self._requests = 0
+
+    def should_profile(self, token: Optional[str] = None) -> bool:
+        """token: valor do header X-Profile-Token, se veio."""
+        if token is not None and verify_profile_token(self.secret, token):
+            return True
+
+        if self.sample_every <= 0:
+            return False
+
+        self._requests += 1
+        return self._requests % self.sample_every == 0
+
+    def start(self, method: str, path: str) -> Optional[Tuple[RequestProfile, StackSampler]]:
+        if not self._busy.acquire(blocking=False):
+            return None
+
+        self.sql.install()
+        profile = RequestProfile(method, path, datetime.utcnow(), self.interval)
+
+        sampler = StackSampler(self.interval)
+        self.sql.active = profile.sql
+        sampler.start()
+
+        return profile, sampler
+
+    def finish(self, profile: RequestProfile, sampler: StackSampler) -> None:
+        try:
+            profile.stacks = sampler.stop()
+            profile.samples = sampler.samples
+        finally:
+            self.sql.active = None
+            self._busy.release()
+
+    # ======================================================
+    # ARQUIVOS
+    # ======================================================
+
+    def save(self, profile: RequestProfile) -> Path:
+        """Grava <nome>.folded e <nome>.json e aplica a rotação."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        folded_path = self.directory / f"{profile.name}.folded"
+        folded_path.write_text(profile.folded(), encoding="utf-8")
+
+        summary_path = self.directory / f"{profile.name}.json"
+        summary_path.write_text(json.dumps(profile.summary(), indent=2), encoding="utf-8")
+
+        self._rotate()
+        logger.info(f"🔬 Perfil gravado: {folded_path}")
+        return folded_path
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        if not self.directory.exists():
+            return []
+
+        paths = sorted(self.directory.glob("*.json"), reverse=True)[:limit]
+        return [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+
+    def folded_path(self, name: str) -> Optional[Path]:
+        # Só nomes gerados por RequestProfile.name (sem caminhos)
+        if not re.fullmatch(r"[A-Za-z0-9_]+", name):
+            return None
+
+        path = self.directory / f"{name}.folded"
+        return path if path.exists() else None
+
+    def _rotate(self) -> None:
+        summaries = sorted(self.directory.glob("*.json"))
+
+        for summary in summaries[:max(len(summaries) - self.max_files, 0)]:
+            summary.unlink(missing_ok=True)
+            summary.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def _resolve_profiling_dir() -> Path:
+    # Caminho relativo é resolvido a partir de backend/
+    directory = Path(settings.PROFILING_DIR)
+    if not directory.is_absolute():
+        directory = Path(__file__).resolve().parents[2] / directory
+    return directory
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+profiler = RequestProfiler(
+    directory=_resolve_profiling_dir(),
+    secret=settings.PROFILING_SECRET,
+    sample_every=settings.PROFILING_SAMPLE_EVERY,
+    interval_ms=settings.PROFILING_INTERVAL_MS,
+    max_files=settings.PROFILING_MAX_FILES,
+)
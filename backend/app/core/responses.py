@@ -0,0 +1,43 @@
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+import orjson
+
+from app.core.config import settings
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(content: Any) -> bytes:
+    """
+    JSON compacto. Com FAST_JSON_RESPONSES usa orjson (datetime, date,
+    Enum e arrays NumPy nativos); o que ele não conhece, como modelos
+    Pydantic, passa pelo jsonable_encoder.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return orjson.dumps(content, default=jsonable_encoder, option=ORJSON_OPTIONS)
+
+    return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder, option=ORJSON_OPTIONS)
+
+
+# default_response_class da aplicação
+DefaultResponse = FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+
+
+def trusted_response(content: Any) -> Any:
+    """
+    Resposta montada a partir de linhas do banco, já no formato do
+    schema. Com FAST_JSON_RESPONSES vai direto para o orjson, sem a
+    revalidação pelo response_model da rota; sem ele, o conteúdo
+    segue o caminho normal do FastAPI.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(content)
+    return content
@@ -1,9 +1,16 @@
 import logging
+import threading
 from sqlalchemy import text
 from sqlmodel import Session
 
 from app.services.deteccao import detector
-from app.core.database import engine
+from app.services.micro_batcher import scheduler
+from app.services.partition_maintenance import partition_maintainer
+from app.services.scoring_pool import scoring_pool
+from app.services.write_behind import writer
+from app.core.config import settings
+from app.core.database import engine, create_db_and_tables
+from app.repositories.kpi_repository import KPIRepository
 
 logger = logging.getLogger(__name__)
 
@@ -12,16 +19,76 @@ def startup_event():
 
     logger.info("🚀 [STARTUP] Iniciando aplicação...")
 
-    if detector.model is None or detector.scaler is None:
-        logger.error("❌ Modelo ou Scaler NÃO carregados")
+    if settings.MODEL_BACKGROUND_LOADING:
+        # O servidor começa a escutar já; /predict responde 503
+        # até o modelo ficar pronto
+        threading.Thread(
+            target=_load_model_in_background,
+            name="model-loader",
+            daemon=True
+        ).start()
+        logger.info("⏳ Carregando modelo em background")
     else:
-        logger.info("✅ Modelo e Scaler carregados")
+        _start_scoring()
 
     try:
         with Session(engine) as session:
             session.exec(text("SELECT 1"))
         logger.info("✅ Conexão com banco de dados OK")
+
+        # Aplica SCHEMA_UPGRADES em bancos criados por versões anteriores
+        # (índices faltando só geram aviso: scripts/create_indexes.py)
+        create_db_and_tables()
+
+        with Session(engine) as session:
+            if KPIRepository.needs_backfill(session):
+                days = KPIRepository.rebuild_daily(session)
+                logger.info(f"📊 Rollup diário reconstruído ({days} dias)")
+
+        # Partições futuras e arquivamento (só com a tabela particionada)
+        partition_maintainer.start()
     except Exception as exc:
         logger.critical(f"❌ Falha ao conectar no banco: {exc}")
 
-    logger.info("🏁 [STARTUP] Finalizado")
\ No newline at end of file
+    if settings.PERSISTENCE_WRITE_BEHIND:
+        writer.start()
+
+    logger.info("🏁 [STARTUP] Finalizado")
+
+
+def _load_model_in_background():
+    try:
+        detector.load()
+    except Exception:
+        return
+
+    _start_scoring()
+
+
+def _start_scoring():
+    """Sobe os serviços de scoring que dependem do modelo carregado."""
+
+    if detector.model is None or detector.scaler is None:
+        logger.error("❌ Modelo ou Scaler NÃO carregados")
+    else:
+        logger.info("✅ Modelo e Scaler carregados")
+
+    if settings.SCORING_POOL_WORKERS > 0:
+        scoring_pool.start()
+
+    if settings.PREDICT_MICRO_BATCHING:
+        scheduler.start()
+
+
+def shutdown_event():
+
+    logger.info("🛑 [SHUTDOWN] Encerrando aplicação...")
+
+    # Responde as predições que ainda estão na fila
+    scheduler.stop()
+    scoring_pool.stop()
+    # Grava as transações que ainda estão na fila de persistência
+    writer.stop()
+    partition_maintainer.stop()
+
+    logger.info("🏁 [SHUTDOWN] Finalizado")
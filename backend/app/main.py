@@ -1,9 +1,19 @@
+import logging
+
 from fastapi import FastAPI
 
 from app.core.config import settings
-from app.core.startup import startup_event
+from app.core.database import dispose_async_engines
+from app.core.middleware import ProfilingMiddleware, RequestMetricsMiddleware
+from app.core.profiling import profiler
+from app.core.responses import DefaultResponse
+from app.core.startup import startup_event, shutdown_event
 from app.api.v1.router import api_router
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
+from app.api.profiles import router as profiles_router
+
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
@@ -11,12 +21,32 @@ def create_app() -> FastAPI:
         title=settings.APP_NAME,
         description="API para detecção de transações financeiras suspeitas.",
         version="1.0.0",
-        debug=settings.DEBUG
+        debug=settings.DEBUG,
+        default_response_class=DefaultResponse
     )
 
     app.add_event_handler("startup", startup_event)
+    app.add_event_handler("shutdown", shutdown_event)
+    app.add_event_handler("shutdown", dispose_async_engines)
+
+    app.add_middleware(RequestMetricsMiddleware)
+
+    # Profiling sob demanda (desligado por padrão)
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware, profiler=profiler)
 
     app.include_router(health_router)
+    app.include_router(metrics_router)
+
+    # GET /profiles expõe SQL e caminhos do código: só com segredo
+    if settings.PROFILING_ENABLED and settings.PROFILING_SECRET:
+        app.include_router(profiles_router)
+    elif settings.PROFILING_ENABLED:
+        logger.warning(
+            "⚠️ PROFILING_SECRET vazio: GET /profiles desativado "
+            f"(perfis só em {settings.PROFILING_DIR})"
+        )
+
     app.include_router(api_router, prefix="/api/v1")
 
     return app
@@ -0,0 +1,255 @@
+import logging
+from pathlib import Path
+from typing import List, Optional, Union
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledForest:
+    """
+    Representação "achatada" de um RandomForestClassifier do scikit-learn.
+
+    Todas as árvores são concatenadas em arrays NumPy contíguos:
+
+    - feature:   feature testada em cada nó (0 nas folhas)
+    - threshold: limiar float32 de cada nó (+inf nas folhas)
+    - children:  (n_nós, 2) com os filhos esquerdo/direito;
+                 folhas apontam para si mesmas
+    - value:     (n_nós, n_classes) com as probabilidades da folha
+    - roots:     índice do nó raiz de cada árvore
+
+    Lotes pequenos percorrem todas as árvores ao mesmo tempo de forma
+    vetorizada (max_depth passos). Lotes grandes usam o `apply` em
+    Cython de cada árvore, que é mais rápido a partir de algumas dezenas
+    de linhas. Nos dois casos o predict_proba do scikit-learn (validação,
+    despacho via joblib) é evitado e o resultado é idêntico.
+
+    Os objetos Tree do `apply` existem na instância compilada e na
+    carregada com load(with_trees=True); sem eles, todo lote usa a
+    travessia vetorizada (cerca de 2,5x mais lenta em 512 linhas).
+    """
+
+    # Até quantas linhas a travessia vetorizada compensa
+    VECTORIZED_MAX_BATCH = 16
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        classes: np.ndarray,
+        trees: Optional[list] = None,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.classes_ = classes
+
+        # Objetos Tree do sklearn, usados apenas em lotes grandes
+        self._trees = trees
+
+        self._children_flat = children.reshape(-1)
+
+    # ======================================================
+    # COMPILAÇÃO
+    # ======================================================
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        """
+        Compila um RandomForestClassifier já treinado.
+        Levanta ValueError para modelos não suportados.
+        """
+        estimators = getattr(model, "estimators_", None)
+        if not estimators:
+            raise ValueError("Modelo sem estimators_ (não treinado?)")
+
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Apenas modelos com uma saída são suportados")
+
+        features: List[np.ndarray] = []
+        thresholds: List[np.ndarray] = []
+        children: List[np.ndarray] = []
+        values: List[np.ndarray] = []
+        roots: List[int] = []
+
+        offset = 0
+        max_depth = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.intp)
+
+            is_leaf = tree.children_left == -1
+
+            # Folhas apontam para si mesmas
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            feature = np.where(is_leaf, 0, tree.feature)
+            threshold = np.where(is_leaf, np.inf, tree.threshold)
+
+            # Mesma normalização do DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+            features.append(feature)
+            thresholds.append(threshold)
+            children.append(np.stack([left, right], axis=1))
+            values.append(value)
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        compiled = cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=cls._float32_thresholds(np.concatenate(thresholds)),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            classes=np.asarray(model.classes_),
+            trees=[estimator.tree_ for estimator in estimators],
+        )
+
+        logger.info(
+            f"🌲 Floresta compilada: {len(estimators)} árvores, "
+            f"{offset} nós, profundidade máxima {max_depth}"
+        )
+
+        return compiled
+
+    @staticmethod
+    def _float32_thresholds(threshold: np.ndarray) -> np.ndarray:
+        """
+        Converte os limiares float64 do sklearn para float32 sem mudar
+        nenhuma decisão: para x float32, `x <= t` equivale a
+        `x <= maior float32 <= t`.
+        """
+        rounded = threshold.astype(np.float32)
+        above = rounded.astype(np.float64) > threshold
+        rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+        return np.ascontiguousarray(rounded)
+
+    # ======================================================
+    # PERSISTÊNCIA
+    # ======================================================
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Grava os arrays sem compressão, para que possam ser abertos com
+        mmap_mode. Os objetos Tree do sklearn, se houver, vão para um
+        arquivo à parte (trees_path), lido só com load(with_trees=True).
+        """
+        if self._trees is not None:
+            joblib.dump(self._trees, self.trees_path(path))
+
+        joblib.dump(
+            {
+                "feature": self.feature,
+                "threshold": self.threshold,
+                "children": self.children,
+                "value": self.value,
+                "roots": self.roots,
+                "max_depth": self.max_depth,
+                "n_features": self.n_features,
+                "classes": self.classes_,
+            },
+            path,
+        )
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        mmap_mode: Optional[str] = "r",
+        with_trees: bool = False,
+    ) -> "CompiledForest":
+        """
+        Carrega os arrays gravados por save(). Com mmap_mode="r",
+        vários processos compartilham as mesmas páginas do arquivo.
+
+        with_trees também carrega os objetos Tree (importa o sklearn e
+        copia os nós para a memória do processo, alguns MB), para que
+        lotes grandes usem o `apply` em Cython.
+        """
+        trees = None
+        trees_path = cls.trees_path(path)
+        if with_trees and trees_path.exists():
+            trees = joblib.load(trees_path)
+
+        return cls(**joblib.load(path, mmap_mode=mmap_mode), trees=trees)
+
+    @staticmethod
+    def trees_path(path: Union[str, Path]) -> Path:
+        path = Path(path)
+        return path.with_name(path.name + ".trees")
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    # ======================================================
+    # INFERÊNCIA
+    # ======================================================
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Retorna o índice (global) da folha alcançada em cada árvore,
+        com shape (n_estimators, n_amostras).
+        """
+        # Mesmo dtype usado internamente pelas árvores do sklearn
+        X = np.ascontiguousarray(X, dtype=np.float32)
+
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Esperado array com {self.n_features} features, "
+                f"recebido shape {X.shape}"
+            )
+
+        if self._trees is not None and X.shape[0] > self.VECTORIZED_MAX_BATCH:
+            return np.stack([
+                tree.apply(X) + root
+                for tree, root in zip(self._trees, self.roots)
+            ])
+
+        return self._apply_vectorized(X)
+
+    def _apply_vectorized(self, X: np.ndarray) -> np.ndarray:
+        n_samples = X.shape[0]
+        flat = X.reshape(-1)
+        row_offsets = (np.arange(n_samples, dtype=np.intp) * self.n_features)[np.newaxis, :]
+
+        nodes = np.repeat(self.roots[:, np.newaxis], n_samples, axis=1)
+
+        for _ in range(self.max_depth):
+            values = flat[row_offsets + self.feature[nodes]]
+            go_right = values > self.threshold[nodes]
+            nodes = self._children_flat[2 * nodes + go_right]
+
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+
+        # Redução no eixo 0 soma na ordem das árvores,
+        # como o sklearn com n_jobs=1
+        proba = np.add.reduce(self.value[leaves], axis=0)
+        proba /= self.n_estimators
+        return proba
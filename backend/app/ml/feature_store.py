@@ -0,0 +1,208 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+METADATA_FILE = "metadata.json"
+
+# Colunas mantidas em float64 independentemente do dtype escolhido:
+# passam pelo scaler antes do modelo e são persistidas como valor real
+FLOAT64_COLUMNS = {"time", "amount"}
+
+
+class FeatureStore:
+    """
+    Dataset colunar em disco: um .npy por coluna mais um metadata.json.
+
+    As colunas são abertas com mmap_mode="r", então abrir o store não
+    lê nada do disco e cada bloco devolvido por iter_chunks é uma view
+    das páginas do arquivo (sem parse e sem cópia). Só as colunas
+    pedidas são tocadas.
+
+    Os nomes das colunas são normalizados para minúsculas, como em
+    FraudDetector.process_dataframe. As features V1..V28 ficam em
+    float32 por padrão: a árvore do scikit-learn já converte a entrada
+    para float32, então os scores saem idênticos aos do CSV. Os valores
+    em si perdem precisão: quem os persiste (seed) exige um store
+    float64 (ver lossless).
+    """
+
+    def __init__(self, path: Path, arrays: Dict[str, np.ndarray], metadata: Dict) -> None:
+        self.path = path
+        self.arrays = arrays
+        self.metadata = metadata
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.arrays)
+
+    @property
+    def source_hash(self) -> Optional[str]:
+        """SHA-256 do CSV de origem."""
+        return self.metadata.get("source_hash")
+
+    @property
+    def lossless(self) -> bool:
+        """
+        True se as colunas de ponto flutuante guardam os valores do CSV
+        sem perda (float64). Um store float32 serve ao scoring, mas não
+        para persistir V1..V28.
+        """
+        return all(
+            dtype == "float64"
+            for dtype in self.metadata["columns"].values()
+            if dtype.startswith("float")
+        )
+
+    def __len__(self) -> int:
+        return self.metadata["rows"]
+
+    # ======================================================
+    # LEITURA
+    # ======================================================
+
+    @classmethod
+    def open(cls, path: Path) -> "FeatureStore":
+        path = Path(path)
+        metadata = json.loads((path / METADATA_FILE).read_text())
+
+        arrays = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r")
+            for name in metadata["columns"]
+        }
+
+        return cls(path, arrays, metadata)
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return (Path(path) / METADATA_FILE).exists()
+
+    def frame(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> "pd.DataFrame":
+        """DataFrame (sem cópia) com as colunas e a faixa de linhas pedidas."""
+        import pandas as pd
+
+        columns = columns or self.columns
+        return pd.DataFrame(
+            {name: self.arrays[name][start:stop] for name in columns},
+            copy=False,
+        )
+
+    def iter_chunks(
+        self,
+        chunk_size: int,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Iterator["pd.DataFrame"]:
+        for start in range(0, len(self), chunk_size):
+            yield self.frame(columns, start, start + chunk_size)
+
+    # ======================================================
+    # ESCRITA
+    # ======================================================
+
+    @classmethod
+    def from_csv(
+        cls,
+        csv_path: Path,
+        path: Path,
+        chunk_size: int = 50_000,
+        dtype: str = "float32",
+        source_hash: Optional[str] = None,
+    ) -> "FeatureStore":
+        """
+        Converte o CSV em blocos (memória constante). Os arquivos são
+        gravados em um diretório temporário e trocados no final, então
+        um store incompleto nunca fica visível.
+        """
+        import pandas as pd
+
+        path = Path(path)
+        rows = _count_rows(csv_path)
+
+        header = pd.read_csv(csv_path, nrows=0).columns
+        columns = {
+            name.lower(): _column_dtype(name.lower(), dtype)
+            for name in header
+        }
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.mkdir(parents=True, exist_ok=True)
+
+        arrays = {
+            name: np.lib.format.open_memmap(
+                tmp_path / f"{name}.npy", mode="w+", dtype=column_dtype, shape=(rows,)
+            )
+            for name, column_dtype in columns.items()
+        }
+
+        offset = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            chunk.columns = [name.lower() for name in chunk.columns]
+            for name, array in arrays.items():
+                array[offset:offset + len(chunk)] = chunk[name].to_numpy()
+            offset += len(chunk)
+
+        if offset != rows:
+            raise ValueError(f"CSV com {offset} linhas de dados, esperado {rows}")
+
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        metadata = {
+            "rows": rows,
+            "columns": {name: str(np.dtype(column_dtype)) for name, column_dtype in columns.items()},
+            "source": Path(csv_path).name,
+            "source_hash": source_hash,
+        }
+        (tmp_path / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+
+        if path.exists():
+            for stale in path.iterdir():
+                stale.unlink()
+            path.rmdir()
+        tmp_path.rename(path)
+
+        return cls.open(path)
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 do arquivo, lido em blocos de 1 MB."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column_dtype(name: str, dtype: str) -> str:
+    if name == "class":
+        return "int8"
+    if name in FLOAT64_COLUMNS:
+        return "float64"
+    return dtype
+
+
+def _count_rows(csv_path: Path) -> int:
+    """Linhas de dados (sem o cabeçalho), contando quebras de linha."""
+    lines = 0
+    last = b"\n"
+
+    with open(csv_path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+
+    if last != b"\n":
+        lines += 1
+
+    return lines - 1
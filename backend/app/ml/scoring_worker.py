@@ -0,0 +1,35 @@
+"""
+Código executado dentro dos processos do pool de scoring.
+
+Os arrays da floresta compilada são abertos com mmap e ficam
+compartilhados entre os workers, mas só a travessia vetorizada (lotes
+de até VECTORIZED_MAX_BATCH linhas) lê deles. Os blocos do pool
+(SCORING_POOL_CHUNK_ROWS, 512 por padrão) são maiores e, com
+load_trees, passam pelo `apply` em Cython dos objetos Tree do sklearn:
+~9ms por bloco de 512 linhas contra ~25ms na travessia sobre o mmap,
+ao custo do import de sklearn.tree no spawn (~2s) e de uma cópia
+privada dos nós (~2,6 MB) em cada worker. Sem load_trees, os workers
+só usam o mmap compartilhado.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from app.ml.compiled_forest import CompiledForest
+
+_engine: Optional[CompiledForest] = None
+
+
+def init_worker(model_path: str, load_trees: bool = True) -> None:
+    """
+    Abre os arrays da floresta em modo somente leitura (mmap) e, com
+    load_trees, carrega os objetos Tree para os blocos grandes.
+    """
+    global _engine
+    _engine = CompiledForest.load(model_path, mmap_mode="r", with_trees=load_trees)
+
+
+def predict_proba(X: np.ndarray) -> np.ndarray:
+    return _engine.predict_proba(X)
+
@@ -0,0 +1,33 @@
+from datetime import date, datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class DailyKPI(SQLModel, table=True):
+    """
+    Agregado diário das transações (dia em UTC, por created_at).
+
+    Atualizado na mesma transação dos INSERTs (/predict, /predict/batch,
+    write-behind e seed). Pode ser reconstruído a partir da tabela
+    transactions com scripts/rebuild_daily_kpis.py.
+    """
+
+    __tablename__ = "daily_kpis"
+
+    day: date = Field(primary_key=True)
+
+    total: int = Field(default=0, description="Transações no dia")
+    anomalies: int = Field(default=0, description="Transações com prediction = -1")
+
+    low_risk: int = Field(default=0)
+    medium_risk: int = Field(default=0)
+    high_risk: int = Field(default=0)
+    unknown_risk: int = Field(default=0, description="Sem risk_level")
+
+    amount_total: float = Field(default=0.0, description="Soma de amount no dia")
+    anomaly_amount: float = Field(
+        default=0.0,
+        description="Soma de amount das anomalias"
+    )
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
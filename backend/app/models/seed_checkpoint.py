@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class SeedCheckpoint(SQLModel, table=True):
+    """
+    Bloco do CSV já gravado pelo seed. É inserido na mesma transação
+    das linhas do bloco, então existir o checkpoint equivale a o bloco
+    estar no banco.
+    """
+
+    __tablename__ = "seed_checkpoints"
+
+    source_hash: str = Field(
+        primary_key=True,
+        description="SHA-256 do arquivo de origem"
+    )
+    start_row: int = Field(
+        primary_key=True,
+        description="Primeira linha do bloco (0 = primeira linha de dados)"
+    )
+    end_row: int = Field(description="Linha seguinte à última do bloco")
+    chunk_size: int
+    source_name: str
+
+    committed_at: datetime = Field(default_factory=datetime.utcnow)
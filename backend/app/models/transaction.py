@@ -2,6 +2,7 @@ from typing import Optional
 from datetime import datetime
 from enum import Enum
 
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field
 
 
@@ -15,6 +16,32 @@ class Transaction(SQLModel, table=True):
 
     __tablename__ = "transactions"
 
+    # Índices das listagens (ORDER BY created_at DESC, id DESC).
+    # Bancos já existentes recebem os mesmos índices via INDEX_UPGRADES
+    # (scripts/create_indexes.py).
+    __table_args__ = (
+        # Ordenação, keyset e filtros created_from/created_to
+        Index("ix_transactions_created_at_id", text("created_at DESC"), text("id DESC")),
+        # /anomalies e is_fraud=true (anomalias são ~0,2% das linhas)
+        Index(
+            "ix_transactions_anomalies_created_at_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("prediction = -1"),
+            sqlite_where=text("prediction = -1"),
+        ),
+        # Filtro por risk_level já na ordem da listagem
+        Index(
+            "ix_transactions_risk_level_created_at_id",
+            "risk_level",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        # Faixas de risk_score e amount
+        Index("ix_transactions_risk_score", "risk_score"),
+        Index("ix_transactions_amount", "amount"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     time: float = Field(description="Tempo da transação em segundos")
@@ -59,10 +86,16 @@ class Transaction(SQLModel, table=True):
         description="Score de risco da transação (0–1)"
     )
 
+    # Sem índice próprio: ix_transactions_risk_level_created_at_id cobre
+    # os filtros por risk_level
     risk_level: Optional[RiskLevel] = Field(
         default=None,
-        description="Nível de risco calculado",
-        index=True
+        description="Nível de risco calculado"
+    )
+
+    model_version: Optional[str] = Field(
+        default=None,
+        description="Versão do modelo que pontuou a transação"
     )
 
     created_at: datetime = Field(
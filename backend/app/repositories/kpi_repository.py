@@ -1,7 +1,40 @@
-from typing import Dict, List
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete, literal
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import kpi_cache
+from app.core.metrics import DB_OPERATION_SECONDS
+from app.models.daily_kpi import DailyKPI
+from app.models.transaction import Transaction, RiskLevel
+
+# risk_level -> coluna de contagem do rollup diário
+RISK_COLUMNS = {
+    RiskLevel.LOW.value: "low_risk",
+    RiskLevel.MEDIUM.value: "medium_risk",
+    RiskLevel.HIGH.value: "high_risk",
+    None: "unknown_risk",
+}
+
+# Colunas do rollup somadas a cada INSERT
+ROLLUP_COUNTERS = [
+    "total",
+    "anomalies",
+    "low_risk",
+    "medium_risk",
+    "high_risk",
+    "unknown_risk",
+    "amount_total",
+    "anomaly_amount",
+]
+
 
-from app.models.transaction import Transaction
+def _rate(anomalies: int, total: int) -> float:
+    return round((anomalies / total) * 100, 2) if total else 0.0
 
 
 class KPIRepository:
@@ -25,28 +58,59 @@ class KPIRepository:
 
     @staticmethod
     def anomaly_rate(session: Session) -> float:
-        total = KPIRepository.total_transactions(session)
-        if total == 0:
-            return 0.0
+        return KPIRepository.overview(session)["anomaly_rate"]
 
-        anomalies = KPIRepository.total_anomalies(session)
-        return round((anomalies / total) * 100, 2)
+    @staticmethod
+    def overview(session: Session) -> Dict[str, float]:
+        """
+        Totais somados do rollup diário em um único scan de daily_kpis.
+
+        total_transactions, total_anomalies e anomaly_rate cobrem só os
+        dias ainda em transactions (a partir da transação mais antiga):
+        batem com /anomalies e com a listagem. Os all_time_* incluem os
+        meses já arquivados (ver PartitionMaintainer).
+        """
+        oldest = session.exec(select(func.min(Transaction.created_at))).one()
+        live = DailyKPI.day >= (oldest.date() if oldest else date.max)
+
+        statement = select(
+            func.coalesce(func.sum(DailyKPI.total).filter(live), 0),
+            func.coalesce(func.sum(DailyKPI.anomalies).filter(live), 0),
+            func.coalesce(func.sum(DailyKPI.total), 0),
+            func.coalesce(func.sum(DailyKPI.anomalies), 0),
+        )
+
+        total, anomalies, all_time_total, all_time_anomalies = session.exec(statement).one()
+
+        return {
+            "total_transactions": total,
+            "total_anomalies": anomalies,
+            "anomaly_rate": _rate(anomalies, total),
+            "all_time_transactions": all_time_total,
+            "all_time_anomalies": all_time_anomalies,
+            "all_time_anomaly_rate": _rate(all_time_anomalies, all_time_total),
+        }
+
+    # ======================================================
+    # ROLLUP DIÁRIO (daily_kpis)
+    # ======================================================
 
     @staticmethod
     def risk_distribution(session: Session) -> Dict[str, int]:
-        statement = (
-            select(
-                Transaction.risk_level,
-                func.count(Transaction.id)
-            )
-            .group_by(Transaction.risk_level)
+        statement = select(
+            func.sum(DailyKPI.low_risk),
+            func.sum(DailyKPI.medium_risk),
+            func.sum(DailyKPI.high_risk),
+            func.sum(DailyKPI.unknown_risk),
         )
 
-        results = session.exec(statement).all()
+        counts = session.exec(statement).one()
+        labels = [RiskLevel.LOW.value, RiskLevel.MEDIUM.value, RiskLevel.HIGH.value, "UNKNOWN"]
 
         return {
-            (risk or "UNKNOWN"): count
-            for risk, count in results
+            label: count
+            for label, count in zip(labels, counts)
+            if count
         }
 
     @staticmethod
@@ -55,12 +119,9 @@ class KPIRepository:
         limit: int = 30
     ) -> List[dict]:
         statement = (
-            select(
-                func.date(Transaction.created_at).label("day"),
-                func.count(Transaction.id).label("count")
-            )
-            .group_by(func.date(Transaction.created_at))
-            .order_by(func.date(Transaction.created_at).desc())
+            select(DailyKPI.day, DailyKPI.total)
+            .where(DailyKPI.total > 0)
+            .order_by(DailyKPI.day.desc())
             .limit(limit)
         )
 
@@ -77,13 +138,9 @@ class KPIRepository:
         limit: int = 30
     ) -> List[dict]:
         statement = (
-            select(
-                func.date(Transaction.created_at).label("day"),
-                func.count(Transaction.id).label("count")
-            )
-            .where(Transaction.prediction == -1)
-            .group_by(func.date(Transaction.created_at))
-            .order_by(func.date(Transaction.created_at).desc())
+            select(DailyKPI.day, DailyKPI.anomalies)
+            .where(DailyKPI.anomalies > 0)
+            .order_by(DailyKPI.day.desc())
             .limit(limit)
         )
 
@@ -92,4 +149,159 @@ class KPIRepository:
         return [
             {"date": day, "count": count}
             for day, count in results
-        ]
\ No newline at end of file
+        ]
+
+    @staticmethod
+    def daily_deltas(rows: Iterable[dict]) -> Dict[date, Dict[str, float]]:
+        """Soma, por dia de created_at, o que as linhas acrescentam ao rollup."""
+        deltas: Dict[date, Dict[str, float]] = {}
+
+        for row in rows:
+            delta = deltas.setdefault(
+                row["created_at"].date(),
+                dict.fromkeys(ROLLUP_COUNTERS, 0)
+            )
+
+            risk_level = getattr(row.get("risk_level"), "value", row.get("risk_level"))
+
+            delta["total"] += 1
+            delta[RISK_COLUMNS[risk_level]] += 1
+            delta["amount_total"] += row["amount"]
+
+            if row["prediction"] == -1:
+                delta["anomalies"] += 1
+                delta["anomaly_amount"] += row["amount"]
+
+        return deltas
+
+    @staticmethod
+    def increment_daily(connection, rows: Iterable[dict]) -> None:
+        """
+        Soma as linhas ao rollup com um único UPSERT (ON CONFLICT DO
+        UPDATE). Deve rodar na mesma transação do INSERT das linhas:
+        Session.connection() ou a Connection de engine.begin().
+        """
+        deltas = KPIRepository.daily_deltas(rows)
+        if not deltas:
+            return
+
+        now = datetime.utcnow()
+        # Dias em ordem: transações concorrentes travam as linhas na
+        # mesma sequência
+        values = [
+            {"day": day, **delta, "updated_at": now}
+            for day, delta in sorted(deltas.items())
+        ]
+
+        if connection.dialect.name == "postgresql":
+            statement = postgresql_insert(DailyKPI).values(values)
+        else:
+            statement = sqlite_insert(DailyKPI).values(values)
+
+        table = DailyKPI.__table__
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.day],
+            set_={
+                **{
+                    column: table.c[column] + statement.excluded[column]
+                    for column in ROLLUP_COUNTERS
+                },
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+
+        connection.execute(statement)
+
+    @staticmethod
+    def rebuild_daily(session: Session, since: Optional[date] = None) -> int:
+        """
+        Recalcula o rollup a partir de transactions (todos os dias, ou a
+        partir de since) em uma única transação. Retorna os dias gravados.
+
+        Sem since, recalcula a partir da transação mais antiga: dias de
+        partições arquivadas não estão mais em transactions e ficam no
+        rollup como estão. Com since, o filtro em created_at permite ao
+        PostgreSQL podar as partições anteriores.
+        """
+        if since is None:
+            oldest = session.exec(select(func.min(Transaction.created_at))).one()
+            if oldest is None:
+                return 0
+            since = oldest.date()
+
+        day = func.date(Transaction.created_at)
+        is_anomaly = Transaction.prediction == -1
+
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        aggregate = select(
+            day,
+            func.count(),
+            count_where(is_anomaly),
+            count_where(Transaction.risk_level == RiskLevel.LOW),
+            count_where(Transaction.risk_level == RiskLevel.MEDIUM),
+            count_where(Transaction.risk_level == RiskLevel.HIGH),
+            count_where(Transaction.risk_level.is_(None)),
+            func.coalesce(func.sum(Transaction.amount), 0),
+            func.coalesce(
+                func.sum(case((is_anomaly, Transaction.amount), else_=0)), 0
+            ),
+            literal(datetime.utcnow()),
+        ).group_by(day)
+
+        aggregate = aggregate.where(
+            Transaction.created_at >= datetime.combine(since, datetime.min.time())
+        )
+        clear = delete(DailyKPI).where(DailyKPI.day >= since)
+
+        session.exec(clear)
+        session.exec(
+            DailyKPI.__table__.insert().from_select(
+                ["day", *ROLLUP_COUNTERS, "updated_at"],
+                aggregate
+            )
+        )
+        session.commit()
+        kpi_cache.invalidate()
+
+        statement = (
+            select(func.count())
+            .select_from(DailyKPI)
+            .where(DailyKPI.day >= since)
+        )
+        return session.exec(statement).one()
+
+    @staticmethod
+    def needs_backfill(session: Session) -> bool:
+        """Rollup vazio com transações já gravadas (banco anterior ao rollup)."""
+        has_rollup = session.exec(select(DailyKPI.day).limit(1)).first() is not None
+        if has_rollup:
+            return False
+
+        return session.exec(select(Transaction.id).limit(1)).first() is not None
+
+
+class AsyncKPIRepository:
+    """KPIs do dashboard sobre AsyncSession (ver AsyncTransactionsRepository)."""
+
+    @staticmethod
+    async def overview(session: AsyncSession) -> Dict[str, float]:
+        return await AsyncKPIRepository._run(session, KPIRepository.overview)
+
+    @staticmethod
+    async def risk_distribution(session: AsyncSession) -> Dict[str, int]:
+        return await AsyncKPIRepository._run(session, KPIRepository.risk_distribution)
+
+    @staticmethod
+    async def daily_transactions(session: AsyncSession, limit: int = 30) -> List[dict]:
+        return await AsyncKPIRepository._run(session, KPIRepository.daily_transactions, limit)
+
+    @staticmethod
+    async def daily_anomalies(session: AsyncSession, limit: int = 30) -> List[dict]:
+        return await AsyncKPIRepository._run(session, KPIRepository.daily_anomalies, limit)
+
+    @staticmethod
+    async def _run(session: AsyncSession, query, *args):
+        with DB_OPERATION_SECONDS.time(f"kpi.{query.__name__}"):
+            return await session.run_sync(query, *args)
@@ -0,0 +1,224 @@
+from datetime import date, datetime
+import re
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+
+from app.models.transaction import Transaction
+
+TABLE = Transaction.__tablename__
+LEGACY_TABLE = f"{TABLE}_unpartitioned"
+
+# Partições mensais: transactions_p2024_01 = [2024-01-01, 2024-02-01)
+PARTITION_PATTERN = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+class MonthlyPartition(NamedTuple):
+    name: str
+    month: date
+    attached: bool
+    # DETACH ... CONCURRENTLY interrompido: falta o FINALIZE
+    detach_pending: bool = False
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+class PartitionsRepository:
+    """
+    DDL do particionamento mensal de transactions por created_at
+    (PARTITION BY RANGE, só no PostgreSQL).
+
+    As funções recebem uma Connection: CREATE/DETACH/DROP rodam cada
+    uma na transação de quem chama (o DETACH CONCURRENTLY exige uma
+    Connection em AUTOCOMMIT). A tabela particionada tem chave
+    primária (id, created_at), exigência do PostgreSQL; o ORM continua
+    identificando as linhas só pelo id, que vem da mesma sequence.
+
+    Não há partição DEFAULT: com ela o PostgreSQL recusa o DETACH
+    CONCURRENTLY, e o arquivamento teria de bloquear a tabela. Uma
+    linha de um mês sem partição (por exemplo, o spill do write-behind
+    regravando um mês já arquivado) é recusada pelo INSERT.
+    """
+
+    @staticmethod
+    def is_partitioned(connection) -> bool:
+        if connection.dialect.name != "postgresql":
+            return False
+
+        return connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table))"
+            ),
+            {"table": TABLE},
+        ).scalar()
+
+    @staticmethod
+    def monthly_partitions(connection) -> List[MonthlyPartition]:
+        """
+        Tabelas mensais do schema de transactions, anexadas ou não
+        (uma partição desanexada fica órfã se o arquivamento for
+        interrompido antes do DROP).
+        """
+        # inhdetachpending só existe a partir do PostgreSQL 14
+        pending = (
+            "i.inhdetachpending IS TRUE"
+            if connection.dialect.server_version_info >= (14,)
+            else "false"
+        )
+
+        rows = connection.execute(
+            text(
+                f"SELECT c.relname, i.inhparent IS NOT NULL, {pending} "
+                "FROM pg_class c "
+                "LEFT JOIN pg_inherits i ON i.inhrelid = c.oid "
+                "WHERE c.relkind = 'r' "
+                "AND c.relnamespace = "
+                "(SELECT relnamespace FROM pg_class WHERE oid = to_regclass(:table))"
+            ),
+            {"table": TABLE},
+        ).all()
+
+        partitions = []
+        for name, attached, detach_pending in rows:
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                month = date(int(match.group(1)), int(match.group(2)), 1)
+                partitions.append(MonthlyPartition(name, month, attached, detach_pending))
+
+        return sorted(partitions, key=lambda partition: partition.month)
+
+    @staticmethod
+    def create_partition(connection, month: date) -> str:
+        name = partition_name(month)
+
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') "
+            f"TO ('{add_months(month, 1).isoformat()}')"
+        )
+        return name
+
+    @staticmethod
+    def has_default_partition(connection) -> bool:
+        """Partição DEFAULT anexada (criada pelo convert de versões anteriores)."""
+        return connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table) AND partdefid <> 0)"
+            ),
+            {"table": TABLE},
+        ).scalar()
+
+    @staticmethod
+    def supports_concurrent_detach(connection) -> bool:
+        """DETACH CONCURRENTLY: PostgreSQL 14+ e nenhuma partição DEFAULT."""
+        return (
+            connection.dialect.server_version_info >= (14,)
+            and not PartitionsRepository.has_default_partition(connection)
+        )
+
+    @staticmethod
+    def detach_partition(connection, name: str, concurrently: bool = True) -> None:
+        """
+        Desanexa a partição.
+
+        Com concurrently (o padrão), a Connection precisa estar em
+        AUTOCOMMIT: o PostgreSQL roda o DETACH em duas transações
+        próprias e só trava SHARE UPDATE EXCLUSIVE na tabela pai, sem
+        bloquear INSERTs e leituras. Sem concurrently, o DETACH trava
+        ACCESS EXCLUSIVE em transactions até o commit de quem chama.
+        """
+        suffix = " CONCURRENTLY" if concurrently else ""
+        connection.exec_driver_sql(f"ALTER TABLE {TABLE} DETACH PARTITION {name}{suffix}")
+
+    @staticmethod
+    def finalize_detach(connection, name: str) -> None:
+        """Conclui um DETACH CONCURRENTLY interrompido (AUTOCOMMIT)."""
+        connection.exec_driver_sql(f"ALTER TABLE {TABLE} DETACH PARTITION {name} FINALIZE")
+
+    @staticmethod
+    def drop_table(connection, name: str) -> None:
+        connection.exec_driver_sql(f"DROP TABLE {name}")
+
+    @staticmethod
+    def count_rows(connection, name: str) -> int:
+        return connection.exec_driver_sql(f"SELECT count(*) FROM {name}").scalar()
+
+    # ======================================================
+    # CONVERSÃO
+    # ======================================================
+
+    @staticmethod
+    def convert(connection, months_ahead: int, keep_old: bool = False) -> int:
+        """
+        Converte transactions em tabela particionada por mês, na
+        transação de quem chama (a tabela fica bloqueada até o commit).
+        Cria uma partição por mês desde a transação mais antiga até
+        months_ahead meses à frente. Retorna as linhas copiadas.
+
+        Com keep_old, a tabela original fica como transactions_unpartitioned
+        (sem índices) para conferência.
+        """
+        connection.exec_driver_sql(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+
+        # Os nomes dos índices e da PK passam para a tabela nova
+        for index in Transaction.__table__.indexes:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+
+        connection.exec_driver_sql(
+            f"ALTER TABLE {TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY_TABLE}_pkey"
+        )
+        connection.exec_driver_sql(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}")
+
+        connection.exec_driver_sql(
+            f"CREATE TABLE {TABLE} ("
+            f"LIKE {LEGACY_TABLE} INCLUDING DEFAULTS, "
+            f"CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, created_at)"
+            f") PARTITION BY RANGE (created_at)"
+        )
+
+        # A sequence do id passa a pertencer à tabela nova (sobrevive ao DROP)
+        sequence = connection.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"),
+            {"table": LEGACY_TABLE},
+        ).scalar()
+        if sequence:
+            connection.exec_driver_sql(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id")
+
+        oldest: Optional[datetime] = connection.exec_driver_sql(
+            f"SELECT min(created_at) FROM {LEGACY_TABLE}"
+        ).scalar()
+
+        current = month_start(datetime.utcnow().date())
+        month = month_start(oldest.date()) if oldest else current
+        while month <= add_months(current, months_ahead):
+            PartitionsRepository.create_partition(connection, month)
+            month = add_months(month, 1)
+
+        rows = connection.exec_driver_sql(
+            f"INSERT INTO {TABLE} SELECT * FROM {LEGACY_TABLE}"
+        ).rowcount
+
+        # Índices depois da carga: um build por partição, sem manutenção
+        # linha a linha durante o INSERT
+        for index in Transaction.__table__.indexes:
+            index.create(connection)
+
+        if not keep_old:
+            PartitionsRepository.drop_table(connection, LEGACY_TABLE)
+
+        connection.exec_driver_sql(f"ANALYZE {TABLE}")
+
+        return rows
@@ -1,7 +1,15 @@
-from typing import List, Optional
+from datetime import datetime
+import json
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import insert, tuple_
 from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.transaction import Transaction, RiskLevel
+from app.core.cache import kpi_cache
+from app.core.metrics import DB_OPERATION_SECONDS
+from app.repositories.kpi_repository import KPIRepository
 
 
 class TransactionsRepository:
@@ -10,10 +18,45 @@ class TransactionsRepository:
 
     def create(self, transaction: Transaction) -> Transaction:
         self.session.add(transaction)
-        self.session.commit()
+        KPIRepository.increment_daily(
+            self.session.connection(),
+            [transaction.model_dump()]
+        )
+        with DB_OPERATION_SECONDS.time("transactions.commit"):
+            self.session.commit()
+        kpi_cache.invalidate()
         self.session.refresh(transaction)
         return transaction
 
+    def create_many(self, rows: List[dict]) -> int:
+        """
+        Persiste várias transações com um único INSERT multi-linha
+        e um único commit. Não faz refresh dos objetos.
+        """
+        if not rows:
+            return 0
+
+        self.session.exec(insert(Transaction), params=rows)
+        KPIRepository.increment_daily(self.session.connection(), rows)
+        with DB_OPERATION_SECONDS.time("transactions.commit"):
+            self.session.commit()
+        kpi_cache.invalidate()
+        return len(rows)
+
+    def get(self, transaction_id: int) -> Optional[Transaction]:
+        return self.session.get(Transaction, transaction_id)
+
+    def list_anomalies(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[Union[Transaction, Dict]]:
+        statement = self.select_columns(columns).where(Transaction.prediction == -1)
+
+        return self._page(statement, limit, offset, cursor, columns)
+
     def list_with_filters(
         self,
         limit: int,
@@ -24,9 +67,69 @@ class TransactionsRepository:
         max_risk_score: Optional[float] = None,
         min_amount: Optional[float] = None,
         max_amount: Optional[float] = None,
-    ) -> tuple[int, List[Transaction]]:
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        count: str = "exact",
+        columns: Optional[Sequence[str]] = None,
+    ) -> tuple[Optional[int], List[Union[Transaction, Dict]]]:
+        """
+        Página de transações filtradas, mais recentes primeiro.
+
+        - cursor: (created_at, id) do último item da página anterior;
+          substitui o offset (keyset, custo constante em qualquer página)
+        - count: "exact" (COUNT(*)), "estimate" (estatísticas do
+          planner, só no PostgreSQL) ou "none" (total = None)
+        - columns: SELECT só dessas colunas; os itens vêm como dicts
+          em vez de entidades do ORM
+        """
+
+        statement = self.filter_statement(
+            columns=columns,
+            is_fraud=is_fraud,
+            risk_level=risk_level,
+            min_risk_score=min_risk_score,
+            max_risk_score=max_risk_score,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            created_from=created_from,
+            created_to=created_to,
+        )
+
+        total = None
+        if count == "estimate" and self.can_estimate:
+            total = self._estimate_count(statement)
+        elif count != "none":
+            total = self.session.exec(self.count_statement(statement)).one()
+
+        items = self._page(statement, limit, offset, cursor, columns)
+
+        return total, items
 
-        statement = select(Transaction)
+    # ======================================================
+    # QUERIES (usadas também por scripts/benchmark_query_plans.py)
+    # ======================================================
+
+    @staticmethod
+    def select_columns(columns: Optional[Sequence[str]] = None):
+        if not columns:
+            return select(Transaction)
+
+        return select(*(getattr(Transaction, name) for name in columns))
+
+    @staticmethod
+    def filter_statement(
+        columns: Optional[Sequence[str]] = None,
+        is_fraud: Optional[bool] = None,
+        risk_level: Optional[RiskLevel] = None,
+        min_risk_score: Optional[float] = None,
+        max_risk_score: Optional[float] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ):
+        statement = TransactionsRepository.select_columns(columns)
 
         if is_fraud is not None:
             statement = statement.where(
@@ -48,15 +151,120 @@ class TransactionsRepository:
         if max_amount is not None:
             statement = statement.where(Transaction.amount <= max_amount)
 
-        total = self.session.exec(
-            select(func.count()).select_from(statement.subquery())
-        ).one()
+        if created_from is not None:
+            statement = statement.where(Transaction.created_at >= created_from)
+
+        if created_to is not None:
+            statement = statement.where(Transaction.created_at < created_to)
 
-        items = self.session.exec(
+        return statement
+
+    @staticmethod
+    def count_statement(statement):
+        return select(func.count()).select_from(statement.subquery())
+
+    @staticmethod
+    def page_statement(
+        statement,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[Tuple[datetime, int]] = None,
+    ):
+        if cursor is not None:
+            # created_at <= ... é redundante com a comparação de tuplas,
+            # mas é o que o PostgreSQL usa para podar partições
+            statement = statement.where(
+                Transaction.created_at <= cursor[0],
+                tuple_(Transaction.created_at, Transaction.id) < tuple_(*cursor),
+            )
+        elif offset:
+            statement = statement.offset(offset)
+
+        return (
             statement
-            .order_by(Transaction.created_at.desc())
-            .offset(offset)
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
             .limit(limit)
+        )
+
+    @staticmethod
+    def iter_batches(connection, statement, batch_size: int) -> Iterator[List]:
+        """
+        Executa a query com cursor do lado do servidor (yield_per) e
+        devolve as linhas em lotes de batch_size.
+        """
+        result = connection.execution_options(yield_per=batch_size).execute(statement)
+        yield from result.partitions()
+
+    @property
+    def can_estimate(self) -> bool:
+        return self.session.get_bind().dialect.name == "postgresql"
+
+    def _page(self, statement, limit: int, offset: int, cursor, columns=None):
+        rows = self.session.exec(
+            self.page_statement(statement, limit, offset, cursor)
         ).all()
 
-        return total, items
\ No newline at end of file
+        if not columns:
+            return rows
+
+        return [row._asdict() for row in rows]
+
+    def _estimate_count(self, statement) -> int:
+        """Linhas estimadas pelo planner (EXPLAIN), sem executar a query."""
+        connection = self.session.connection()
+        # Valores dos filtros renderizados pelo SQLAlchemy (tipados e
+        # escapados), sem depender da adaptação de parâmetros do driver
+        compiled = statement.compile(
+            dialect=connection.dialect,
+            compile_kwargs={"literal_binds": True}
+        )
+
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}"
+        ).scalar()
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+
+class AsyncTransactionsRepository:
+    """
+    TransactionsRepository sobre AsyncSession, para as rotas async.
+
+    Cada método roda o equivalente síncrono com AsyncSession.run_sync:
+    as queries são as mesmas, e o event loop fica livre enquanto o
+    banco responde (o I/O do driver assíncrono é aguardado por baixo).
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, transaction: Transaction) -> Transaction:
+        return await self._run("create", transaction)
+
+    async def create_many(self, rows: List[dict]) -> int:
+        return await self._run("create_many", rows)
+
+    async def get(self, transaction_id: int) -> Optional[Transaction]:
+        return await self._run("get", transaction_id)
+
+    async def list_anomalies(self, *args, **kwargs) -> List[Union[Transaction, Dict]]:
+        return await self._run("list_anomalies", *args, **kwargs)
+
+    async def list_with_filters(
+        self, *args, **kwargs
+    ) -> tuple[Optional[int], List[Union[Transaction, Dict]]]:
+        return await self._run("list_with_filters", *args, **kwargs)
+
+    @property
+    def can_estimate(self) -> bool:
+        return self.session.bind.dialect.name == "postgresql"
+
+    async def _run(self, method: str, *args, **kwargs):
+        with DB_OPERATION_SECONDS.time(f"transactions.{method}"):
+            return await self.session.run_sync(
+                lambda session: getattr(TransactionsRepository(session), method)(*args, **kwargs)
+            )
@@ -6,6 +6,9 @@ class GlobalKPIsResponse(BaseModel):
     total_transactions: int
     total_anomalies: int
     anomaly_rate: float
+    all_time_transactions: int
+    all_time_anomalies: int
+    all_time_anomaly_rate: float
 
 
 class RiskDistributionResponse(BaseModel):
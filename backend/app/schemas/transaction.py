@@ -1,5 +1,5 @@
 ﻿from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from app.models.transaction import RiskLevel
@@ -49,6 +49,29 @@ class PredictionResponse(BaseModel):
     probability: float = Field(..., ge=0, le=1)
     risk_level: str
     message: str
+    model_version: Optional[str] = None
+
+class BatchPredictionRequest(BaseModel):
+    # Itens validados individualmente na rota, para que um item
+    # inválido não derrube o lote inteiro
+    transactions: List[Any] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Lista de transações no mesmo formato de TransactionInput",
+    )
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    success: bool
+    result: Optional[PredictionResponse] = None
+    errors: Optional[List[str]] = None
+
+class BatchPredictionResponse(BaseModel):
+    total: int
+    processed: int
+    failed: int
+    items: List[BatchPredictionItem]
 
 class TransactionRead(BaseModel):
     id: int
@@ -87,16 +110,34 @@ class TransactionRead(BaseModel):
     prediction: int
     risk_score: Optional[float]
     risk_level: Optional[RiskLevel]
+    model_version: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class TransactionSummary(BaseModel):
+    """Campos exibidos nas tabelas do dashboard (padrão das listagens)."""
+    id: int
+    amount: float
+    risk_score: Optional[float]
+    risk_level: Optional[RiskLevel]
+    created_at: datetime
+
+# Campos aceitos em ?fields= (todos os de TransactionRead)
+TRANSACTION_FIELDS = list(TransactionRead.model_fields)
+SUMMARY_FIELDS = list(TransactionSummary.model_fields)
+
 class PaginatedTransactionsResponse(BaseModel):
-    total: int
+    # None com count=none; aproximado com total_estimated=true
+    total: Optional[int]
+    total_estimated: bool = False
     limit: int
     offset: int
-    items: List[TransactionRead]
+    # Passe em ?cursor= para a próxima página (None na última)
+    next_cursor: Optional[str] = None
+    # Campos de TransactionSummary, ou os pedidos em ?fields=
+    items: List[Dict[str, Any]]
 
 class TransactionFilter(BaseModel):
     is_fraud: Optional[bool] = None
@@ -106,4 +147,8 @@ class TransactionFilter(BaseModel):
     max_risk_score: Optional[float] = Field(None, ge=0, le=1)
 
     min_amount: Optional[float] = None
-    max_amount: Optional[float] = None
\ No newline at end of file
+    max_amount: Optional[float] = None
+
+    # Intervalo de created_at: [created_from, created_to)
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
\ No newline at end of file
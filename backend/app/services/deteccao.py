@@ -1,70 +1,360 @@
+from collections import Counter
 from pathlib import Path
+import json
 import logging
-from typing import Dict
+import threading
+import time
+import warnings
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import joblib
 import numpy as np
-import pandas as pd
+
+from app.core.config import settings
+from app.core.metrics import (
+    FALLBACK_PREDICTIONS_TOTAL,
+    MODEL_STAGE_SECONDS,
+    PREDICTIONS_TOTAL,
+)
+from app.ml.compiled_forest import CompiledForest
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Features obrigatórias para persistir uma transação
+REQUIRED_FEATURES = ["time", "amount"] + [f"v{i}" for i in range(1, 29)]
 
-class FraudDetector:
+# Limiar de fraude e faixas de risco (mesmos valores do treino)
+FRAUD_THRESHOLD = 0.20
+RISK_BINS = [-0.01, 0.3, 0.7, 1.0]
+RISK_LABELS = ["LOW", "MEDIUM", "HIGH"]
+
+# Colunas do modelo que recebem o scaler -> feature de entrada
+SCALED_FEATURES = {"scaled_amount": "amount", "scaled_time": "time"}
+
+# Séries das etapas, resolvidas uma vez (observe direto no caminho quente)
+SINGLE_STAGES = {
+    stage: MODEL_STAGE_SECONDS.labels("single", stage)
+    for stage in ["validate", "assemble", "scale", "predict_proba", "risk_level", "fallback"]
+}
+DATAFRAME_STAGES = {
+    stage: MODEL_STAGE_SECONDS.labels("dataframe", stage)
+    for stage in ["assemble", "scale", "predict_proba", "risk_level", "fallback"]
+}
+
+
+def resolve_models_dir() -> Path:
+    """MODELS_DIR relativo é resolvido a partir de backend/."""
+    models_dir = Path(settings.MODELS_DIR)
+    if not models_dir.is_absolute():
+        models_dir = Path(__file__).resolve().parents[2] / models_dir
+    return models_dir
+
+
+class ModelBundle:
     """
-    Serviço responsável por aplicar o modelo de detecção de fraude
-    em transações financeiras.
+    Artefatos de uma versão do modelo (modelo, scaler, floresta
+    compilada, caminho rápido e limiar). Não muda depois de criado:
+    trocar de versão é trocar o bundle inteiro.
 
-    - Usa RandomForest + Scaler quando disponíveis
-    - Opera em modo fallback quando artefatos não existem
+    Sem modelo ou scaler, o bundle opera em modo fallback.
     """
 
-    def __init__(self) -> None:
-        self.model = None
-        self.scaler = None
-        self._load_artifacts()
+    def __init__(
+        self,
+        version: Optional[str] = None,
+        model=None,
+        scaler=None,
+        threshold: float = FRAUD_THRESHOLD,
+    ) -> None:
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.threshold = threshold
+        self.engine: Optional[CompiledForest] = None
+
+        # Caminho rápido (sem pandas) resolvido no load
+        self.fast_inputs: Optional[List[str]] = None
+        self.fast_scaled: Optional[np.ndarray] = None
+        self.scaler_center = 0.0
+        self.scaler_scale = 1.0
+
+        self._compile_model()
+        self._prepare_fast_path()
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None and self.scaler is not None
 
     # ======================================================
     # LOAD DE ARTEFATOS
     # ======================================================
 
-    def _load_artifacts(self) -> None:
+    @classmethod
+    def from_files(cls, version: str, models_dir: Optional[Path] = None) -> "ModelBundle":
         """
-        Carrega modelo e scaler a partir de:
-        backend/app/ml/artifacts
+        Carrega modelo e scaler de uma versão a partir de MODELS_DIR:
+        random_forest_<versão>.pkl, scaler_<versão>.pkl e, opcionalmente,
+        metadata_<versão>.json com o limiar ({"threshold": 0.2}).
         """
+        models_dir = models_dir or resolve_models_dir()
 
-        app_dir = Path(__file__).resolve().parents[1]
-        models_dir = app_dir / "ml" / "artifacts"
-
-        model_path = models_dir / "random_forest_v1.pkl"
-        scaler_path = models_dir / "scaler_v1.pkl"
+        model_path = models_dir / f"random_forest_{version}.pkl"
+        scaler_path = models_dir / f"scaler_{version}.pkl"
+        metadata_path = models_dir / f"metadata_{version}.json"
 
         logger.info(f"📂 Procurando artefatos em: {models_dir}")
 
+        model = None
+        scaler = None
+        threshold = FRAUD_THRESHOLD
+
         if model_path.exists():
-            self.model = joblib.load(model_path)
+            model = joblib.load(model_path)
             logger.info(f"✅ Modelo carregado: {model_path}")
         else:
             logger.warning(f"⚠️ Modelo não encontrado: {model_path}")
 
         if scaler_path.exists():
-            self.scaler = joblib.load(scaler_path)
+            scaler = joblib.load(scaler_path)
             logger.info(f"✅ Scaler carregado: {scaler_path}")
         else:
             logger.warning(f"⚠️ Scaler não encontrado: {scaler_path}")
 
+        if metadata_path.exists():
+            metadata = json.loads(metadata_path.read_text())
+            threshold = float(metadata.get("threshold", FRAUD_THRESHOLD))
+
+        return cls(version=version, model=model, scaler=scaler, threshold=threshold)
+
+    def _compile_model(self) -> None:
+        """
+        Compila a floresta em arrays contíguos. Se o modelo não for
+        suportado, segue usando o predict_proba do scikit-learn.
+        """
+        if self.model is None or not settings.USE_COMPILED_FOREST:
+            return
+
+        try:
+            self.engine = CompiledForest.from_sklearn(self.model)
+        except ValueError as exc:
+            logger.warning(f"⚠️ Floresta não compilada, usando sklearn: {exc}")
+
+    def _prepare_fast_path(self) -> None:
+        """
+        Resolve uma única vez a ordem das colunas do modelo e os
+        parâmetros do scaler, para que a predição unitária opere
+        direto sobre um vetor NumPy.
+
+        Se o scaler não for reconhecido, o caminho rápido fica
+        desabilitado e a predição unitária usa process_dataframe.
+        """
+        if not self.available:
+            return
+
+        params = self._scaler_params(self.scaler)
+        if params is None:
+            logger.warning("⚠️ Scaler não suportado no caminho rápido.")
+            return
+
+        inputs = []
+        for name in self.model.feature_names_in_:
+            if name in SCALED_FEATURES:
+                inputs.append(SCALED_FEATURES[name])
+            elif name.startswith("V"):
+                inputs.append(name.lower())
+            else:
+                logger.warning(f"⚠️ Feature desconhecida no modelo: {name}")
+                return
+
+        self.scaler_center, self.scaler_scale = params
+        self.fast_scaled = np.array(
+            [name in SCALED_FEATURES for name in self.model.feature_names_in_]
+        )
+        self.fast_inputs = inputs
+
+    @staticmethod
+    def _scaler_params(scaler) -> Optional[tuple]:
+        """
+        Extrai (centro, escala) de RobustScaler/StandardScaler ajustados
+        em uma única coluna. Retorna None para outros scalers.
+        """
+        if getattr(scaler, "n_features_in_", None) != 1:
+            return None
+
+        if hasattr(scaler, "center_") or hasattr(scaler, "with_centering"):
+            centered = scaler.with_centering
+            scaled = scaler.with_scaling
+            center = getattr(scaler, "center_", None)
+        elif hasattr(scaler, "mean_") or hasattr(scaler, "with_mean"):
+            centered = scaler.with_mean
+            scaled = scaler.with_std
+            center = getattr(scaler, "mean_", None)
+        else:
+            return None
+
+        scale = getattr(scaler, "scale_", None)
+
+        return (
+            float(center[0]) if centered and center is not None else 0.0,
+            float(scale[0]) if scaled and scale is not None else 1.0,
+        )
+
+
+class FraudDetector:
+    """
+    Serviço responsável por aplicar o modelo de detecção de fraude
+    em transações financeiras.
+
+    - Usa RandomForest + Scaler quando disponíveis
+    - Opera em modo fallback quando artefatos não existem
+    - Pode ser criado sem carregar nada (load=False) e carregado
+      depois em background com load()
+
+    A versão ativa fica em um ModelBundle. Cada predição lê o bundle
+    uma única vez no início, então trocar de versão (activate) é
+    atômico: predições em andamento terminam no bundle antigo.
+    """
+
+    def __init__(self, load: bool = True) -> None:
+        self._bundle = ModelBundle()
+
+        # Pool de processos (ScoringPool) quando ativo
+        self.scoring_pool = None
+
+        self._buffers = threading.local()
+
+        # not_loaded -> loading -> warming_up -> ready | failed
+        self.status = "not_loaded"
+        self._ready = threading.Event()
+
+        # Versão trocada por activate(): um load() em andamento (startup
+        # em background) não a sobrescreve
+        self._swap_lock = threading.Lock()
+        self._activated = False
+
+        if load:
+            self.load()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def bundle(self) -> ModelBundle:
+        return self._bundle
+
+    @property
+    def model(self):
+        return self._bundle.model
+
+    @property
+    def scaler(self):
+        return self._bundle.scaler
+
+    @property
+    def engine(self) -> Optional[CompiledForest]:
+        return self._bundle.engine
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._bundle.version
+
+    def load(self, version: Optional[str] = None) -> None:
+        """
+        Carrega os artefatos da versão (ACTIVE_MODEL_VERSION por padrão),
+        prepara os caminhos de inferência e aquece o modelo. Só então o
+        detector passa a ficar pronto.
+
+        Não faz nada se uma versão já foi ativada por activate(), nem
+        antes nem durante o load.
+        """
+        if self._activated:
+            logger.info("⏭️ Load ignorado: versão já ativada pelo registro")
+            return
+
+        self.status = "loading"
+
+        try:
+            bundle = ModelBundle.from_files(version or settings.ACTIVE_MODEL_VERSION)
+
+            self.status = "warming_up"
+            self.warm_up(bundle)
+        except Exception:
+            if not self._activated:
+                self.status = "failed"
+            logger.exception("❌ Falha ao carregar o detector")
+            raise
+
+        with self._swap_lock:
+            if self._activated:
+                logger.info(
+                    f"⏭️ Load de {bundle.version} descartado: "
+                    f"versão {self._bundle.version} já ativada pelo registro"
+                )
+                return
+
+            self._bundle = bundle
+            self.status = "ready"
+            self._ready.set()
+
+    def activate(self, bundle: ModelBundle) -> ModelBundle:
+        """
+        Troca a versão ativa e devolve a anterior. O bundle já vem
+        aquecido e validado (ModelRegistry), então o detector fica pronto.
+        """
+        with self._swap_lock:
+            previous = self._bundle
+            self._bundle = bundle
+            self._activated = True
+
+            self.status = "ready"
+            self._ready.set()
+
+        return previous
+
+    def warm_up(self, bundle: Optional[ModelBundle] = None) -> None:
+        """
+        Executa predições descartáveis para importar pandas/sklearn,
+        trazer as páginas do modelo para a memória e alocar os buffers
+        antes da primeira requisição real.
+        """
+        bundle = bundle or self._bundle
+        if not bundle.available:
+            return
+
+        dummy = {name: 0.0 for name in REQUIRED_FEATURES}
+
+        self._predict_single(dummy, bundle)
+        # Lote acima de VECTORIZED_MAX_BATCH cobre também o outro caminho
+        self._predict_batch([dummy] * 32, bundle)
+
+        logger.info(f"🔥 Modelo aquecido (versão {bundle.version})")
+
     # ======================================================
     # PROCESSAMENTO
     # ======================================================
 
-    def process_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df.columns = [c.lower() for c in df.columns]
+    def process_dataframe(
+        self,
+        df: "pd.DataFrame",
+        bundle: Optional[ModelBundle] = None
+    ) -> "pd.DataFrame":
+        import pandas as pd
+
+        bundle = bundle or self._bundle
+        start = time.perf_counter()
+
+        # Sem cópia das colunas de entrada (views de um FeatureStore
+        # continuam apontando para o arquivo)
+        df = df.rename(columns=str.lower)
 
         # --------------------------
         # FALLBACK (SEM ML)
         # --------------------------
-        if self.model is None or self.scaler is None:
+        if not bundle.available:
             logger.warning("⚠️ Detector em modo fallback (sem ML).")
 
             if "amount" not in df.columns:
@@ -72,6 +362,7 @@ class FraudDetector:
 
             df["risk_score"] = np.clip(df["amount"] / 5000, 0, 1)
             df["prediction"] = np.where(df["risk_score"] >= 0.7, -1, 1)
+            start = _observe(DATAFRAME_STAGES["fallback"], start)
 
         # --------------------------
         # MODELO REAL
@@ -82,38 +373,40 @@ class FraudDetector:
             if missing:
                 raise ValueError(f"Features faltando: {missing}")
 
-            features = pd.DataFrame()
-
-            # V1..V28 exatamente como no treino
-            for i in range(1, 29):
-                features[f"V{i}"] = df[f"v{i}"]
+            # Matriz na ordem exata do treino: V1..V28 como vieram,
+            # Amount / Time depois, pelo scaler
+            names = bundle.model.feature_names_in_
+            features = np.empty((len(df), len(names)), dtype=np.float64)
 
-            # Amount
-            features["scaled_amount"] = self.scaler.transform(
-                df["amount"].values.reshape(-1, 1)
-            )
-
-            # Time
-            features["scaled_time"] = self.scaler.transform(
-                df["time"].values.reshape(-1, 1)
-            )
+            for position, name in enumerate(names):
+                if name not in SCALED_FEATURES:
+                    features[:, position] = df[name.lower()].to_numpy()
+            start = _observe(DATAFRAME_STAGES["assemble"], start)
 
-            # Ordem exata
-            features = features[self.model.feature_names_in_]
+            for position, name in enumerate(names):
+                if name in SCALED_FEATURES:
+                    features[:, position] = bundle.scaler.transform(
+                        df[SCALED_FEATURES[name]].to_numpy().reshape(-1, 1)
+                    ).ravel()
+            start = _observe(DATAFRAME_STAGES["scale"], start)
 
-            probs = self.model.predict_proba(features)[:, 1]
+            probs = self._predict_proba(features, bundle)[:, 1]
 
             df["risk_score"] = probs
-            df["prediction"] = np.where(probs >= 0.20, -1, 1)
+            df["prediction"] = np.where(probs >= bundle.threshold, -1, 1)
+            start = _observe(DATAFRAME_STAGES["predict_proba"], start)
 
         # --------------------------
         # RISK LEVEL
         # --------------------------
         df["risk_level"] = pd.cut(
             df["risk_score"],
-            bins=[-0.01, 0.3, 0.7, 1.0],
-            labels=["LOW", "MEDIUM", "HIGH"]
+            bins=RISK_BINS,
+            labels=RISK_LABELS
         )
+        _observe(DATAFRAME_STAGES["risk_level"], start)
+
+        df["model_version"] = bundle.version
 
         return df
 
@@ -121,27 +414,195 @@ class FraudDetector:
     # PREDIÇÃO UNITÁRIA (POST /predict)
     # ======================================================
 
-    def predict_transaction(self, features: Dict) -> Dict:
-        df = pd.DataFrame([features])
-        df = self.process_dataframe(df)
+    def predict_transaction(
+        self,
+        features: Dict,
+        bundle: Optional[ModelBundle] = None
+    ) -> Dict:
+        bundle = bundle or self._bundle
+        result = self._predict_single(features, bundle)
+
+        _count_predictions([result["risk_level"]], bundle)
+        return result
+
+    def validate_features(self, features: Dict) -> Dict:
+        """
+        Normaliza as chaves para minúsculas e valida as features
+        obrigatórias no modo atual (modelo real ou fallback).
+        """
+        return self._validate_features(features, self._bundle)
+
+    @staticmethod
+    def _validate_features(features: Dict, bundle: ModelBundle) -> Dict:
+        features = {key.lower(): value for key, value in features.items()}
+
+        if not bundle.available:
+            if "amount" not in features:
+                raise ValueError("Campo 'amount' é obrigatório")
+        else:
+            missing = [f"v{i}" for i in range(1, 29) if f"v{i}" not in features]
+            if missing:
+                raise ValueError(f"Features faltando: {missing}")
+
+        return features
+
+    def _predict_single(self, features: Dict, bundle: ModelBundle) -> Dict:
+        """
+        Caminho rápido da predição unitária: monta o vetor de features
+        direto em um buffer NumPy pré-alocado (um por thread), sem
+        DataFrame. Produz exatamente o mesmo resultado de
+        process_dataframe para uma linha.
+        """
+        if bundle.available and bundle.fast_inputs is None:
+            import pandas as pd
+
+            row = self.process_dataframe(pd.DataFrame([features]), bundle).iloc[0]
+            return self._build_result(
+                row["prediction"], row["risk_score"], row["risk_level"], bundle.version
+            )
+
+        start = time.perf_counter()
+        features = self._validate_features(features, bundle)
+        start = _observe(SINGLE_STAGES["validate"], start)
+
+        # Fallback (sem ML)
+        if not bundle.available:
+            risk_score = float(np.clip(np.float64(features["amount"]) / 5000, 0, 1))
+            prediction = -1 if risk_score >= 0.7 else 1
+            risk_level = self._risk_label(risk_score)
+            _observe(SINGLE_STAGES["fallback"], start)
+
+            return self._build_result(prediction, risk_score, risk_level, bundle.version)
+
+        vector = self._feature_buffer(len(bundle.fast_inputs))
+        for position, name in enumerate(bundle.fast_inputs):
+            vector[0, position] = features[name]
+        start = _observe(SINGLE_STAGES["assemble"], start)
+
+        scaled = vector[0, bundle.fast_scaled]
+        if bundle.scaler_center != 0.0:
+            scaled -= bundle.scaler_center
+        if bundle.scaler_scale != 1.0:
+            scaled /= bundle.scaler_scale
+        vector[0, bundle.fast_scaled] = scaled
+        start = _observe(SINGLE_STAGES["scale"], start)
+
+        risk_score = float(self._predict_proba(vector, bundle)[0, 1])
+        start = _observe(SINGLE_STAGES["predict_proba"], start)
+
+        prediction = -1 if risk_score >= bundle.threshold else 1
+        risk_level = self._risk_label(risk_score)
+        _observe(SINGLE_STAGES["risk_level"], start)
+
+        return self._build_result(prediction, risk_score, risk_level, bundle.version)
+
+    def _predict_proba(self, X: np.ndarray, bundle: ModelBundle) -> np.ndarray:
+        """
+        Probabilidades por classe para um array já na ordem
+        de feature_names_in_.
+        """
+        pool = self.scoring_pool
+        if pool is not None:
+            proba = pool.predict_proba(X, bundle.version)
+            if proba is not None:
+                return proba
+
+        if bundle.engine is not None:
+            return bundle.engine.predict_proba(X)
+
+        with warnings.catch_warnings():
+            # O modelo foi treinado com nomes de colunas; aqui a ordem
+            # já foi resolvida
+            warnings.simplefilter("ignore", UserWarning)
+            return bundle.model.predict_proba(X)
+
+    def _feature_buffer(self, n_features: int) -> np.ndarray:
+        buffer = getattr(self._buffers, "vector", None)
+        if buffer is None or buffer.shape[1] != n_features:
+            buffer = np.empty((1, n_features), dtype=np.float64)
+            self._buffers.vector = buffer
+        return buffer
+
+    @staticmethod
+    def _risk_label(risk_score: float) -> Optional[str]:
+        # Equivalente ao pd.cut com intervalos fechados à direita
+        for low, high, label in zip(RISK_BINS, RISK_BINS[1:], RISK_LABELS):
+            if low < risk_score <= high:
+                return label
+        return None
+
+    # ======================================================
+    # PREDIÇÃO EM LOTE (POST /predict/batch)
+    # ======================================================
+
+    def predict_batch(
+        self,
+        transactions: List[Dict],
+        bundle: Optional[ModelBundle] = None
+    ) -> List[Dict]:
+        """
+        Pontua N transações com uma única chamada ao modelo.
+        Os resultados são retornados na mesma ordem da entrada.
+        """
+        bundle = bundle or self._bundle
+        results = self._predict_batch(transactions, bundle)
+
+        _count_predictions([result["risk_level"] for result in results], bundle)
+        return results
+
+    def _predict_batch(self, transactions: List[Dict], bundle: ModelBundle) -> List[Dict]:
+        if not transactions:
+            return []
 
-        row = df.iloc[0]
-        is_fraud = row["prediction"] == -1
+        import pandas as pd
+
+        df = self.process_dataframe(pd.DataFrame(transactions), bundle)
+
+        return [
+            self._build_result(prediction, risk_score, risk_level, bundle.version)
+            for prediction, risk_score, risk_level in zip(
+                df["prediction"], df["risk_score"], df["risk_level"]
+            )
+        ]
+
+    @staticmethod
+    def _build_result(prediction, risk_score, risk_level, version=None) -> Dict:
+        is_fraud = prediction == -1
 
         return {
             "is_fraud": bool(is_fraud),
-            "probability": float(row["risk_score"]),
-            "risk_level": row["risk_level"],
+            "probability": float(risk_score),
+            "risk_level": risk_level,
             "message": (
                 "Fraude detectada"
                 if is_fraud
                 else "Transação legítima"
             ),
+            "model_version": version,
         }
 
 
+def _observe(series, start: float) -> float:
+    """Registra a etapa que começou em start e devolve o início da próxima."""
+    now = time.perf_counter()
+    series.observe(now - start)
+    return now
+
+
+def _count_predictions(risk_levels: List[Optional[str]], bundle: ModelBundle) -> None:
+    for risk_level, count in Counter(risk_levels).items():
+        # Fora das faixas: None (caminho rápido) ou NaN (pd.cut)
+        label = risk_level if isinstance(risk_level, str) else "UNKNOWN"
+        PREDICTIONS_TOTAL.inc(label, amount=count)
+
+    if not bundle.available:
+        FALLBACK_PREDICTIONS_TOTAL.inc(amount=len(risk_levels))
+
+
 # ======================================================
 # SINGLETON
 # ======================================================
 
-detector = FraudDetector()
\ No newline at end of file
+# Com MODEL_BACKGROUND_LOADING o import fica leve (sem pandas/sklearn)
+# e o load acontece no startup, em background
+detector = FraudDetector(load=not settings.MODEL_BACKGROUND_LOADING)
\ No newline at end of file
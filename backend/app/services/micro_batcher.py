@@ -0,0 +1,309 @@
+import asyncio
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.services.deteccao import FraudDetector, detector
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores dos buckets de tamanho de lote
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+class SchedulerOverloadedError(Exception):
+    """Fila de predição cheia: a requisição foi rejeitada."""
+
+
+@dataclass
+class _PendingPrediction:
+    features: Dict
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class MicroBatchMetrics:
+    """
+    Métricas do agendador: tamanho dos lotes e espera na fila.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.batch_size_buckets = {bound: 0 for bound in BATCH_SIZE_BUCKETS}
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def record_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+
+    def record_rejected(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timed_out += 1
+
+    def record_batch(self, size: int, waits: List[float]) -> None:
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.max_batch_size = max(self.max_batch_size, size)
+
+            for bound in BATCH_SIZE_BUCKETS:
+                if size <= bound:
+                    self.batch_size_buckets[bound] += 1
+                    break
+
+            self.queue_wait_total += sum(waits)
+            self.queue_wait_max = max([self.queue_wait_max, *waits])
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "batches": self.batches,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "batch_size_buckets": {
+                    f"le_{bound}": count
+                    for bound, count in self.batch_size_buckets.items()
+                },
+                "avg_queue_wait_ms": (
+                    round(self.queue_wait_total / self.items * 1000, 3)
+                    if self.items else 0.0
+                ),
+                "max_queue_wait_ms": round(self.queue_wait_max * 1000, 3),
+            }
+
+
+class MicroBatcher:
+    """
+    Agrupa predições unitárias concorrentes em lotes.
+
+    As requisições que chegam dentro da janela (max_wait_ms) ou até
+    completar max_batch_size são pontuadas com uma única chamada ao
+    modelo, e cada chamador recebe o próprio resultado.
+
+    A janela é adaptativa: quando os lotes recentes têm uma única
+    transação (baixa concorrência) e a fila está vazia, o lote é
+    despachado na hora, sem somar a espera à latência.
+    """
+
+    def __init__(
+        self,
+        fraud_detector: FraudDetector,
+        max_batch_size: int = 128,
+        max_wait_ms: float = 2.0,
+        max_queue_size: int = 10_000,
+        timeout_ms: float = 1_000.0,
+    ) -> None:
+        self.detector = fraud_detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout_ms / 1000
+
+        self.metrics = MicroBatchMetrics()
+
+        self._queue: "queue.Queue[Optional[_PendingPrediction]]" = queue.Queue(max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._recent_batch_size = 1.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ======================================================
+    # CICLO DE VIDA
+    # ======================================================
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="micro-batcher",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"📦 Micro-batching ativo (lote={self.max_batch_size}, "
+            f"janela={self.max_wait * 1000:.1f}ms)"
+        )
+
+    def stop(self) -> None:
+        """Processa o que já está na fila e encerra a thread."""
+        if not self.running:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    # ======================================================
+    # SUBMISSÃO
+    # ======================================================
+
+    def submit(self, features: Dict) -> Dict:
+        """
+        Enfileira uma transação e bloqueia até o resultado.
+
+        Levanta ValueError para features inválidas (antes de enfileirar),
+        SchedulerOverloadedError se a fila estiver cheia e TimeoutError
+        se o resultado não sair dentro do timeout.
+        """
+        pending = self._enqueue(features)
+
+        try:
+            return pending.future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Se ainda não entrou em um lote, não será processada
+            pending.future.cancel()
+            self.metrics.record_timeout()
+            raise
+
+    async def submit_async(self, features: Dict) -> Dict:
+        """
+        submit() para rotas async: aguarda o resultado sem ocupar uma
+        thread. O scoring roda na thread do agendador, fora do event loop.
+        """
+        pending = self._enqueue(features)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(pending.future),
+                timeout=self.timeout
+            )
+        except TimeoutError:
+            pending.future.cancel()
+            self.metrics.record_timeout()
+            raise
+
+    def _enqueue(self, features: Dict) -> _PendingPrediction:
+        pending = _PendingPrediction(self.detector.validate_features(features))
+
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            self.metrics.record_rejected()
+            raise SchedulerOverloadedError("Fila de predição cheia")
+
+        self.metrics.record_submit()
+        return pending
+
+    # ======================================================
+    # PROCESSAMENTO
+    # ======================================================
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch, stop = self._collect(first)
+            self._process(batch)
+
+            if stop:
+                self._drain()
+                return
+
+    def _collect(self, first: _PendingPrediction) -> tuple:
+        batch = [first]
+
+        # Baixa concorrência: não vale a pena esperar
+        if self._recent_batch_size < 1.5 and self._queue.empty():
+            return batch, False
+
+        deadline = first.enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                self._process([item])
+
+    def _process(self, batch: List[_PendingPrediction]) -> None:
+        # Descarta requisições que já desistiram por timeout
+        batch = [
+            item for item in batch
+            if item.future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        started_at = time.monotonic()
+        self.metrics.record_batch(
+            len(batch),
+            [started_at - item.enqueued_at for item in batch]
+        )
+        self._recent_batch_size = 0.8 * self._recent_batch_size + 0.2 * len(batch)
+
+        try:
+            if len(batch) == 1:
+                results = [self.detector.predict_transaction(batch[0].features)]
+            else:
+                results = self.detector.predict_batch([item.features for item in batch])
+        except Exception:
+            # Um item inválido não pode derrubar o lote inteiro
+            self._process_individually(batch)
+            return
+
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+
+    def _process_individually(self, batch: List[_PendingPrediction]) -> None:
+        for item in batch:
+            try:
+                item.future.set_result(self.detector.predict_transaction(item.features))
+            except Exception as exc:
+                item.future.set_exception(exc)
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+scheduler = MicroBatcher(
+    detector,
+    max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=settings.MICRO_BATCH_MAX_WAIT_MS,
+    max_queue_size=settings.MICRO_BATCH_QUEUE_SIZE,
+    timeout_ms=settings.MICRO_BATCH_TIMEOUT_MS,
+)
@@ -0,0 +1,194 @@
+import logging
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.deteccao import (
+    FraudDetector,
+    ModelBundle,
+    REQUIRED_FEATURES,
+    detector,
+    resolve_models_dir,
+)
+from app.services.scoring_pool import ScoringPool, scoring_pool
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE_PATTERN = re.compile(r"^random_forest_(?P<version>.+)\.pkl$")
+
+# Lote sintético usado para validar uma versão antes da troca
+VALIDATION_ROWS = 64
+VALIDATION_SEED = 42
+
+
+class ModelActivationError(Exception):
+    """Versão inexistente ou já em processo de ativação."""
+
+
+class ModelRegistry:
+    """
+    Versões do modelo disponíveis em MODELS_DIR e troca da versão
+    ativa sem derrubar a API.
+
+    A ativação roda em background: carrega os artefatos, compila,
+    aquece e valida a nova versão enquanto a anterior continua
+    atendendo. Só então o bundle do detector é trocado. A versão
+    anterior fica em memória para permitir rollback imediato.
+    """
+
+    def __init__(
+        self,
+        fraud_detector: FraudDetector,
+        pool: Optional[ScoringPool] = None,
+    ) -> None:
+        self.detector = fraud_detector
+        self.pool = pool
+
+        self.previous: Optional[ModelBundle] = None
+        self.activating: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.activated_at: Optional[datetime] = None
+
+        self._lock = threading.Lock()
+
+    # ======================================================
+    # CONSULTA
+    # ======================================================
+
+    def available_versions(self) -> List[str]:
+        models_dir = resolve_models_dir()
+        if not models_dir.exists():
+            return []
+
+        versions = []
+        for path in models_dir.iterdir():
+            match = MODEL_FILE_PATTERN.match(path.name)
+            if match and (models_dir / f"scaler_{match['version']}.pkl").exists():
+                versions.append(match["version"])
+
+        return sorted(versions)
+
+    def status(self) -> Dict:
+        return {
+            "active_version": self.detector.version,
+            "previous_version": self.previous.version if self.previous else None,
+            "activating": self.activating,
+            "last_error": self.last_error,
+            "activated_at": self.activated_at,
+            "available_versions": self.available_versions(),
+        }
+
+    # ======================================================
+    # ATIVAÇÃO
+    # ======================================================
+
+    def activate(self, version: str) -> None:
+        """
+        Agenda a ativação da versão em background.
+        Levanta ModelActivationError se a versão não existir ou se
+        outra ativação ainda estiver em andamento.
+        """
+        if version not in self.available_versions():
+            raise ModelActivationError(f"Versão não encontrada: {version}")
+
+        with self._lock:
+            if self.activating is not None:
+                raise ModelActivationError(
+                    f"Ativação em andamento: {self.activating}"
+                )
+            self.activating = version
+
+        threading.Thread(
+            target=self._activate,
+            args=(version,),
+            name=f"model-activate-{version}",
+            daemon=True
+        ).start()
+
+    def _activate(self, version: str) -> None:
+        logger.info(f"🔄 Ativando modelo {version}")
+
+        bundle = None
+        try:
+            bundle = ModelBundle.from_files(version)
+            self.validate(bundle)
+        except Exception as exc:
+            bundle = None
+            self.last_error = f"{version}: {exc}"
+            logger.exception(f"❌ Modelo {version} rejeitado")
+
+        # A troca acontece sob o mesmo lock do rollback
+        with self._lock:
+            try:
+                if bundle is not None:
+                    self._swap(bundle)
+                    self.last_error = None
+                    logger.info(f"✅ Modelo {version} ativo")
+            finally:
+                self.activating = None
+
+    def rollback(self) -> str:
+        """Volta para a versão anterior, que continua em memória."""
+        with self._lock:
+            if self.activating is not None:
+                raise ModelActivationError(
+                    f"Ativação em andamento: {self.activating}"
+                )
+            if self.previous is None:
+                raise ModelActivationError("Nenhuma versão anterior em memória")
+
+            self._swap(self.previous)
+
+        logger.info(f"↩️ Rollback para o modelo {self.detector.version}")
+        return self.detector.version
+
+    def _swap(self, bundle: ModelBundle) -> None:
+        """Chamado com self._lock: detector, previous e pool mudam juntos."""
+        self.previous = self.detector.activate(bundle)
+        self.activated_at = datetime.utcnow()
+
+        if self.pool is not None:
+            self.pool.reload()
+
+    # ======================================================
+    # VALIDAÇÃO
+    # ======================================================
+
+    def validate(self, bundle: ModelBundle) -> None:
+        """
+        Aquece a nova versão e confere, em um lote sintético, que as
+        probabilidades são finitas, ficam em [0, 1] e que o caminho
+        unitário concorda com o caminho em lote.
+        """
+        if not bundle.available:
+            raise ValueError("Modelo ou scaler ausente")
+
+        self.detector.warm_up(bundle)
+
+        rng = np.random.default_rng(VALIDATION_SEED)
+        rows = [
+            dict(zip(REQUIRED_FEATURES, values))
+            for values in rng.normal(size=(VALIDATION_ROWS, len(REQUIRED_FEATURES)))
+        ]
+
+        # Caminhos internos, como no warm_up: o lote sintético não entra
+        # em predictions_total
+        batch = self.detector._predict_batch(rows, bundle)
+        probs = np.array([result["probability"] for result in batch])
+
+        if not np.all(np.isfinite(probs)) or probs.min() < 0 or probs.max() > 1:
+            raise ValueError("Probabilidades fora de [0, 1]")
+
+        single = self.detector._predict_single(rows[0], bundle)
+        if not np.isclose(single["probability"], batch[0]["probability"]):
+            raise ValueError("Predição unitária diverge da predição em lote")
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+registry = ModelRegistry(detector, pool=scoring_pool)
@@ -0,0 +1,319 @@
+from datetime import datetime
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import MetaData, select, text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.transaction import Transaction
+from app.repositories.partitions_repository import (
+    MonthlyPartition,
+    PartitionsRepository,
+    add_months,
+    month_start,
+    partition_name,
+)
+from app.services.export import arrow_schema
+
+logger = logging.getLogger(__name__)
+
+# Uma única instância faz a manutenção por vez (vários workers do uvicorn)
+ADVISORY_LOCK_KEY = "transactions_partition_maintenance"
+
+# Linhas lidas do banco e gravadas por row group no Parquet
+ARCHIVE_BATCH_ROWS = 50_000
+
+# DETACH bloqueante (--blocking-detach): espera no máximo isso pelo
+# ACCESS EXCLUSIVE; enquanto espera, INSERTs e leituras ficam na fila
+BLOCKING_DETACH_LOCK_TIMEOUT = "5s"
+
+
+class PartitionMaintainer:
+    """
+    Manutenção periódica de transactions particionada por mês.
+
+    A cada interval_seconds:
+    - Cria as partições do mês corrente e dos months_ahead seguintes
+    - Com retention_months > 0, arquiva os meses anteriores à janela:
+      desanexa a partição com DETACH CONCURRENTLY (sem bloquear
+      /predict nem o dashboard), exporta para Parquet (zstd) em
+      archive_dir e só então faz o DROP, depois de conferir o número
+      de linhas
+
+    Sem DETACH CONCURRENTLY (PostgreSQL < 14, ou uma partição DEFAULT
+    de um convert antigo), o DETACH trava a tabela inteira: a
+    manutenção periódica não arquiva e só o script, com
+    --blocking-detach, o faz em janela de manutenção.
+
+    Não faz nada se a tabela não for particionada (ver
+    scripts/partition_transactions.py). O rollup diário (daily_kpis)
+    mantém os dias arquivados nos totais all_time_* e nos gráficos.
+    """
+
+    def __init__(
+        self,
+        months_ahead: int = 3,
+        retention_months: int = 0,
+        archive_dir: Optional[Path] = None,
+        interval_seconds: float = 3_600.0,
+    ) -> None:
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.archive_dir = archive_dir
+        self.interval = interval_seconds
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ======================================================
+    # CICLO DE VIDA
+    # ======================================================
+
+    def start(self) -> None:
+        if self.running or self.interval <= 0:
+            return
+
+        if engine.dialect.name != "postgresql":
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="partition-maintenance",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:
+                logger.error(f"❌ Falha na manutenção das partições: {exc}")
+
+            self._stop.wait(self.interval)
+
+    # ======================================================
+    # MANUTENÇÃO
+    # ======================================================
+
+    def run_once(self, blocking_detach: bool = False) -> Dict[str, List[str]]:
+        """
+        Cria as partições futuras e arquiva as expiradas. Com
+        blocking_detach, arquiva mesmo sem DETACH CONCURRENTLY.
+        """
+        result = {"created": [], "archived": []}
+
+        with engine.connect() as lock_connection:
+            if not PartitionsRepository.is_partitioned(lock_connection):
+                return result
+
+            acquired = lock_connection.execute(
+                text("SELECT pg_try_advisory_lock(hashtext(:key))"),
+                {"key": ADVISORY_LOCK_KEY},
+            ).scalar()
+            # O lock é de sessão: sem este commit a conexão ficaria
+            # "idle in transaction" e o DETACH CONCURRENTLY esperaria por ela
+            lock_connection.commit()
+            if not acquired:
+                return result
+
+            try:
+                result["created"] = self.ensure_partitions()
+
+                if self.retention_months > 0:
+                    result["archived"] = self.archive_expired(blocking_detach)
+            finally:
+                lock_connection.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:key))"),
+                    {"key": ADVISORY_LOCK_KEY},
+                )
+                lock_connection.commit()
+
+        return result
+
+    def ensure_partitions(self) -> List[str]:
+        current = month_start(datetime.utcnow().date())
+
+        with engine.connect() as connection:
+            existing = {
+                partition.month
+                for partition in PartitionsRepository.monthly_partitions(connection)
+            }
+
+        created = []
+        for offset in range(self.months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+
+            try:
+                with engine.begin() as connection:
+                    created.append(PartitionsRepository.create_partition(connection, month))
+            except Exception as exc:
+                logger.error(f"❌ Falha ao criar {partition_name(month)}: {exc}")
+                continue
+
+            logger.info(f"🗓️ Partição {created[-1]} criada")
+
+        return created
+
+    def archive_expired(self, blocking_detach: bool = False) -> List[str]:
+        cutoff = add_months(month_start(datetime.utcnow().date()), -self.retention_months)
+
+        with engine.connect() as connection:
+            expired = [
+                partition
+                for partition in PartitionsRepository.monthly_partitions(connection)
+                if partition.month < cutoff
+            ]
+            concurrent = PartitionsRepository.supports_concurrent_detach(connection)
+
+        if not concurrent and not blocking_detach:
+            blocked = [
+                partition.name
+                for partition in expired
+                if partition.attached and not partition.detach_pending
+            ]
+            if blocked:
+                logger.error(
+                    f"❌ DETACH CONCURRENTLY indisponível (PostgreSQL < 14 ou "
+                    f"partição DEFAULT): {', '.join(blocked)} não arquivadas. Rode "
+                    f"scripts/partition_transactions.py maintain --blocking-detach "
+                    f"em janela de manutenção"
+                )
+            expired = [partition for partition in expired if partition.name not in blocked]
+
+        archived = []
+        for partition in expired:
+            path = self.archive(partition, concurrent)
+            archived.append(partition.name)
+            logger.info(f"📦 Partição {partition.name} arquivada em {path}")
+
+        return archived
+
+    def archive(self, partition: MonthlyPartition, concurrently: bool = True) -> Path:
+        """
+        Desanexa (se ainda anexada), exporta e remove a partição. Se a
+        exportação falhar, a tabela desanexada fica no banco e é
+        retomada na próxima execução; um DETACH CONCURRENTLY
+        interrompido é concluído com FINALIZE.
+        """
+        if self.archive_dir is None:
+            raise ValueError("PARTITION_ARCHIVE_DIR não configurado")
+
+        if partition.detach_pending:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                PartitionsRepository.finalize_detach(connection, partition.name)
+        elif partition.attached and concurrently:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                PartitionsRepository.detach_partition(connection, partition.name)
+        elif partition.attached:
+            with engine.begin() as connection:
+                connection.exec_driver_sql(
+                    f"SET LOCAL lock_timeout = '{BLOCKING_DETACH_LOCK_TIMEOUT}'"
+                )
+                PartitionsRepository.detach_partition(
+                    connection, partition.name, concurrently=False
+                )
+
+        path = self.archive_dir / f"{partition.name}.parquet"
+
+        with engine.connect() as connection:
+            expected = PartitionsRepository.count_rows(connection, partition.name)
+            written = _export_parquet(connection, partition.name, path)
+
+        if written != expected:
+            raise RuntimeError(
+                f"{partition.name}: {written} linhas exportadas, esperado {expected}"
+            )
+
+        with engine.begin() as connection:
+            PartitionsRepository.drop_table(connection, partition.name)
+
+        return path
+
+
+# ======================================================
+# EXPORTAÇÃO
+# ======================================================
+
+def _export_parquet(connection, table_name: str, path: Path) -> int:
+    """
+    Grava a tabela em Parquet (zstd) lendo em blocos com cursor do
+    lado do servidor. O arquivo é gravado com outro nome e renomeado
+    depois do fsync: um Parquet em path está sempre completo.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    # Mesmas colunas de Transaction, lidas da tabela da partição
+    source = Transaction.__table__.to_metadata(MetaData(), name=table_name)
+    schema = arrow_schema(source.columns)
+
+    result = connection.execution_options(stream_results=True).execute(
+        select(source).order_by(source.c.created_at, source.c.id)
+    )
+
+    rows = 0
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as parquet:
+        for batch in result.partitions(ARCHIVE_BATCH_ROWS):
+            columns = list(zip(*batch))
+            parquet.write_table(
+                pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema,
+                )
+            )
+            rows += len(batch)
+
+    with open(tmp_path, "rb") as archive:
+        os.fsync(archive.fileno())
+
+    if pq.ParquetFile(tmp_path).metadata.num_rows != rows:
+        raise RuntimeError(f"Parquet incompleto: {tmp_path}")
+
+    os.replace(tmp_path, path)
+    return rows
+
+
+def _resolve_archive_dir() -> Optional[Path]:
+    if not settings.PARTITION_ARCHIVE_DIR:
+        return None
+
+    # Caminho relativo é resolvido a partir de backend/
+    archive_dir = Path(settings.PARTITION_ARCHIVE_DIR)
+    if not archive_dir.is_absolute():
+        archive_dir = Path(__file__).resolve().parents[2] / archive_dir
+    return archive_dir
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+partition_maintainer = PartitionMaintainer(
+    months_ahead=settings.PARTITION_MONTHS_AHEAD,
+    retention_months=settings.PARTITION_RETENTION_MONTHS,
+    archive_dir=_resolve_archive_dir(),
+    interval_seconds=settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+)
@@ -0,0 +1,273 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+from pathlib import Path
+import shutil
+import tempfile
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml import scoring_worker
+from app.ml.compiled_forest import CompiledForest
+from app.services.deteccao import FraudDetector, detector
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringPool:
+    """
+    Pool de processos para o scoring do modelo, fora do GIL.
+
+    No start, a floresta compilada é gravada (sem compressão) em um
+    diretório temporário e cada worker a abre com mmap_mode="r". Com
+    load_trees (o padrão), cada worker também carrega os objetos Tree,
+    uma cópia privada usada nos blocos grandes: a memória cresce com o
+    número de workers. Sem load_trees, os N processos só leem as
+    páginas compartilhadas do mmap, com um scoring mais lento (ver
+    scoring_worker).
+
+    Enquanto o pool está ativo, o FraudDetector envia para ele todas as
+    chamadas de predict_proba (/predict, /predict/batch, seed). A montagem
+    das features, o limiar e os níveis de risco continuam no processo
+    principal, então o resultado é o mesmo do scoring local.
+
+    A reciclagem é feita trocando o executor inteiro depois de
+    max_tasks_per_child * workers tarefas: o executor antigo termina o
+    que já recebeu e encerra seus processos. O parâmetro equivalente do
+    ProcessPoolExecutor trava no Python 3.11 quando um worker sai.
+
+    Na troca de versão do modelo, reload() exporta a nova floresta e
+    troca o executor do mesmo jeito. O pool só atende predições da
+    versão que ele carregou; as demais usam o scoring local. A versão
+    e o executor mudam juntos, sob o mesmo lock em que predict_proba
+    confere a versão e envia os blocos.
+
+    O arquivo de um modelo só é removido quando nenhum executor (ativo
+    ou aposentado) o usa mais: um worker ainda não iniciado de um
+    executor aposentado abre o arquivo no init_worker.
+    """
+
+    def __init__(
+        self,
+        fraud_detector: FraudDetector,
+        workers: int,
+        max_tasks_per_child: Optional[int] = None,
+        chunk_rows: int = 512,
+        load_trees: bool = True,
+    ) -> None:
+        self.detector = fraud_detector
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.chunk_rows = chunk_rows
+        self.load_trees = load_trees
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tmp_dir: Optional[Path] = None
+        self._model_path: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._tasks = 0
+        self._exports = 0
+
+        # Executores aposentados ainda encerrando, e quantos executores
+        # usam cada arquivo de modelo
+        self._retiring: List[threading.Thread] = []
+        self._path_users: Counter = Counter()
+
+        # Versão do modelo carregada nos workers
+        self.version: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    # ======================================================
+    # CICLO DE VIDA
+    # ======================================================
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        if self.detector.model is None:
+            logger.warning("⚠️ Pool de scoring não iniciado: modelo não carregado")
+            return
+
+        bundle = self.detector.bundle
+        self._tmp_dir = Path(tempfile.mkdtemp(prefix="fraud-scoring-"))
+        self._model_path = self._export(bundle)
+
+        self._executor = self._new_executor(self._model_path)
+        self._tasks = 0
+        self.version = bundle.version
+
+        self.detector.scoring_pool = self
+
+        logger.info(
+            f"⚙️ Pool de scoring ativo: {self.workers} workers, "
+            f"modelo em {self._model_path}"
+        )
+
+    def reload(self) -> None:
+        """Carrega nos workers a versão ativa do detector."""
+        if not self.running:
+            return
+
+        bundle = self.detector.bundle
+        if bundle.model is None or bundle.version == self.version:
+            return
+
+        model_path = self._export(bundle)
+
+        with self._lock:
+            retired, retired_path = self._executor, self._model_path
+            self._executor = self._new_executor(model_path)
+            self._model_path = model_path
+            self.version = bundle.version
+            self._tasks = 0
+
+        self._retire(retired, retired_path)
+
+        logger.info(f"♻️ Pool de scoring recarregado com o modelo {bundle.version}")
+
+    def _export(self, bundle) -> Path:
+        engine = bundle.engine or CompiledForest.from_sklearn(bundle.model)
+
+        # Nome novo a cada exportação: workers aposentados da mesma
+        # versão podem estar com o arquivo anterior aberto
+        self._exports += 1
+        model_path = self._tmp_dir / f"forest_{bundle.version}_{self._exports}.joblib"
+        engine.save(model_path)
+        return model_path
+
+    def _new_executor(self, model_path: Path) -> ProcessPoolExecutor:
+        self._path_users[model_path] += 1
+
+        # "spawn": workers não herdam o modelo do sklearn do processo pai
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=scoring_worker.init_worker,
+            initargs=(str(model_path), self.load_trees),
+        )
+
+    def _retire(self, executor: ProcessPoolExecutor, model_path: Path) -> None:
+        """
+        Encerra o executor em background: as tarefas já enviadas
+        terminam e, depois que os processos saem, o arquivo do modelo
+        é removido se nenhum outro executor o usa.
+        """
+        def shutdown() -> None:
+            executor.shutdown(wait=True)
+
+            with self._lock:
+                self._path_users[model_path] -= 1
+                unused = (
+                    self._path_users[model_path] <= 0
+                    and model_path != self._model_path
+                )
+                if unused:
+                    del self._path_users[model_path]
+
+            if unused:
+                model_path.unlink(missing_ok=True)
+                CompiledForest.trees_path(model_path).unlink(missing_ok=True)
+
+        thread = threading.Thread(
+            target=shutdown,
+            name="scoring-pool-retire",
+            daemon=True
+        )
+        with self._lock:
+            self._retiring = [t for t in self._retiring if t.is_alive()] + [thread]
+        thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+
+        self.detector.scoring_pool = None
+
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            self.version = None
+            retiring = self._retiring
+            self._retiring = []
+
+        executor.shutdown(wait=True)
+        for thread in retiring:
+            thread.join()
+
+        self._model_path = None
+        self._path_users.clear()
+
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        self._tmp_dir = None
+
+        logger.info("⚙️ Pool de scoring encerrado")
+
+    # ======================================================
+    # SCORING
+    # ======================================================
+
+    def predict_proba(self, X: np.ndarray, version: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Divide o lote em blocos de chunk_rows, pontua os blocos em
+        paralelo e devolve as probabilidades na ordem original.
+
+        Devolve None se os workers não estiverem com o modelo `version`
+        (pool parado ou em troca de versão): o chamador pontua localmente.
+        Todos os blocos vão para o mesmo executor.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        chunks = [
+            X[start:start + self.chunk_rows]
+            for start in range(0, len(X), self.chunk_rows)
+        ] or [X]
+
+        retired = None
+
+        with self._lock:
+            executor = self._executor
+            if executor is None or version != self.version:
+                return None
+
+            futures = [
+                executor.submit(scoring_worker.predict_proba, chunk)
+                for chunk in chunks
+            ]
+
+            self._tasks += len(chunks)
+            if (
+                self.max_tasks_per_child
+                and self._tasks >= self.max_tasks_per_child * self.workers
+            ):
+                retired, retired_path = executor, self._model_path
+                self._executor = self._new_executor(self._model_path)
+                self._tasks = 0
+
+        if retired is not None:
+            # Tarefas já enviadas terminam antes dos processos saírem
+            self._retire(retired, retired_path)
+            logger.info("♻️ Workers do pool de scoring reciclados")
+
+        if len(futures) == 1:
+            return futures[0].result()
+        return np.concatenate([future.result() for future in futures])
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+scoring_pool = ScoringPool(
+    detector,
+    workers=settings.SCORING_POOL_WORKERS,
+    max_tasks_per_child=settings.SCORING_POOL_MAX_TASKS_PER_CHILD,
+    chunk_rows=settings.SCORING_POOL_CHUNK_ROWS,
+    load_trees=settings.SCORING_POOL_LOAD_TREES,
+)
@@ -0,0 +1,423 @@
+from datetime import datetime
+import json
+import logging
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import DB_OPERATION_SECONDS
+from app.repositories.transactions_repository import TransactionsRepository
+
+logger = logging.getLogger(__name__)
+
+# Chave, nas linhas do spill, com quantas regravações já falharam
+REPLAY_ATTEMPTS_KEY = "_replay_attempts"
+
+
+class PersistenceQueueFullError(Exception):
+    """Fila de persistência cheia: a transação não foi aceita."""
+
+
+class WriteBehindMetrics:
+    """
+    Contadores do writer: linhas aceitas, gravadas e desviadas para disco.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.spilled_rows = 0
+        self.replayed_rows = 0
+        self.quarantined_rows = 0
+
+    def record(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "failed_flushes": self.failed_flushes,
+                "spilled_rows": self.spilled_rows,
+                "replayed_rows": self.replayed_rows,
+                "quarantined_rows": self.quarantined_rows,
+            }
+
+
+class WriteBehindWriter:
+    """
+    Persistência assíncrona das transações pontuadas.
+
+    As rotas enfileiram as linhas e respondem sem esperar o commit.
+    Uma thread grava a fila em INSERTs multi-linha a cada flush_size
+    linhas ou flush_interval_ms, o que vier primeiro.
+
+    - Backpressure: com a fila cheia, enqueue espera até
+      enqueue_timeout_ms e então levanta PersistenceQueueFullError.
+      enqueue_many é tudo ou nada: reserva espaço para o lote inteiro
+      ou não enfileira nenhuma linha (um retry do cliente não duplica)
+    - Se o banco falhar, o lote é anexado (com fsync) ao arquivo de
+      spill em JSON Lines e regravado no próximo flush bem-sucedido
+    - Linhas do spill que falham sozinhas (com o banco no ar) em
+      max_replay_attempts regravações vão para o arquivo de quarentena
+      e deixam de bloquear o restante
+    - stop() grava tudo o que ainda está na fila antes de encerrar
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10_000,
+        flush_size: int = 500,
+        flush_interval_ms: float = 200.0,
+        enqueue_timeout_ms: float = 100.0,
+        spill_path: Optional[Path] = None,
+        max_replay_attempts: int = 3,
+    ) -> None:
+        self.max_queue_size = max_queue_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self.spill_path = spill_path
+        self.max_replay_attempts = max_replay_attempts
+
+        self.metrics = WriteBehindMetrics()
+
+        # Cada item é um lote (lista de linhas) de um enqueue_many; o
+        # limite em linhas é controlado por _queued_rows
+        self._queue: "queue.Queue[Optional[List[Dict]]]" = queue.Queue()
+        self._queued_rows = 0
+        self._space = threading.Condition()
+
+        self._thread: Optional[threading.Thread] = None
+        self._spill_lock = threading.Lock()
+
+    @property
+    def quarantine_path(self) -> Optional[Path]:
+        if self.spill_path is None:
+            return None
+        return self.spill_path.with_name(f"{self.spill_path.stem}.quarantine.jsonl")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ======================================================
+    # CICLO DE VIDA
+    # ======================================================
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="write-behind",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"💾 Write-behind ativo (lote={self.flush_size}, "
+            f"intervalo={self.flush_interval * 1000:.0f}ms)"
+        )
+
+    def stop(self) -> None:
+        """Grava o que ainda está na fila e encerra a thread."""
+        if not self.running:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        logger.info("💾 Write-behind encerrado")
+
+    # ======================================================
+    # ENFILEIRAMENTO
+    # ======================================================
+
+    def enqueue(self, row: Dict) -> None:
+        self.enqueue_many([row])
+
+    def enqueue_many(self, rows: List[Dict]) -> None:
+        """
+        Enfileira todas as linhas ou nenhuma: espera até enqueue_timeout
+        por espaço para o lote inteiro e só então o coloca na fila.
+        """
+        if not rows:
+            return
+
+        def has_space() -> bool:
+            return self._queued_rows + len(rows) <= self.max_queue_size
+
+        with self._space:
+            if len(rows) > self.max_queue_size or not self._space.wait_for(
+                has_space, timeout=self.enqueue_timeout
+            ):
+                self.metrics.record(rejected=len(rows))
+                raise PersistenceQueueFullError("Fila de persistência cheia")
+
+            self._queued_rows += len(rows)
+            self._queue.put(list(rows))
+
+        self.metrics.record(enqueued=len(rows))
+
+    def _release(self, batch: List[Dict]) -> None:
+        """Libera na fila o espaço das linhas retiradas pela thread."""
+        with self._space:
+            self._queued_rows -= len(batch)
+            self._space.notify_all()
+
+    # ======================================================
+    # GRAVAÇÃO
+    # ======================================================
+
+    def _run(self) -> None:
+        self._replay_spill()
+
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._drain()
+                return
+
+            self._release(first)
+            batch, stop = self._collect(first)
+            self._flush_all(batch)
+
+            if stop:
+                self._drain()
+                return
+
+    def _collect(self, first: List[Dict]) -> tuple:
+        batch = list(first)
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.flush_size:
+            remaining = deadline - time.monotonic()
+
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                return batch, True
+
+            self._release(item)
+            batch.extend(item)
+
+        return batch, False
+
+    def _drain(self) -> None:
+        batch = []
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._release(item)
+                batch.extend(item)
+
+        self._flush_all(batch)
+
+    def _flush_all(self, rows: List[Dict]) -> None:
+        # Um lote de enqueue_many pode passar de flush_size
+        for start in range(0, len(rows), self.flush_size):
+            self._flush(rows[start:start + self.flush_size])
+
+    def _flush(self, rows: List[Dict]) -> None:
+        try:
+            self._insert(rows)
+        except Exception as exc:
+            logger.error(f"❌ Falha ao gravar {len(rows)} transações: {exc}")
+            self.metrics.record(failed_flushes=1)
+            self._spill(rows)
+            return
+
+        self.metrics.record(flushes=1, flushed_rows=len(rows))
+
+        # Banco voltou: regrava o que ficou em disco
+        if self.spill_path is not None and self.spill_path.exists():
+            self._replay_spill()
+
+    @staticmethod
+    def _insert(rows: List[Dict]) -> None:
+        with DB_OPERATION_SECONDS.time("write_behind.flush"):
+            with Session(engine) as session:
+                TransactionsRepository(session).create_many(rows)
+
+    @staticmethod
+    def _database_available() -> bool:
+        try:
+            with engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+        except Exception:
+            return False
+        return True
+
+    # ======================================================
+    # SPILL EM DISCO
+    # ======================================================
+
+    def _spill(self, rows: List[Dict]) -> None:
+        if self.spill_path is None:
+            logger.critical(f"❌ {len(rows)} transações descartadas (sem spill)")
+            return
+
+        with self._spill_lock:
+            _append_rows(self.spill_path, rows)
+
+        self.metrics.record(spilled_rows=len(rows))
+        logger.warning(f"⚠️ {len(rows)} transações gravadas em {self.spill_path}")
+
+    def _replay_spill(self) -> None:
+        """
+        Regrava no banco as linhas do arquivo de spill, em lotes de
+        flush_size. Se um lote falha:
+
+        - com o banco fora (SELECT 1 falha), para e mantém no arquivo
+          o que não foi inserido, sem contar tentativa
+        - com o banco no ar, insere o lote linha a linha; cada linha que
+          falha ganha uma tentativa e, ao chegar a max_replay_attempts,
+          vai para o arquivo de quarentena
+
+        O arquivo é reescrito só com as linhas que ainda faltam.
+        """
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+
+        with self._spill_lock:
+            with open(self.spill_path, encoding="utf-8") as spill:
+                rows = [_parse_row(line) for line in spill if line.strip()]
+
+            # Tentativas anteriores de cada linha (fora do INSERT)
+            attempts = {id(row): row.pop(REPLAY_ATTEMPTS_KEY, 0) for row in rows}
+
+            pending: List[Dict] = []
+            quarantined: List[Dict] = []
+            replayed = 0
+
+            for start in range(0, len(rows), self.flush_size):
+                chunk = rows[start:start + self.flush_size]
+
+                try:
+                    self._insert(chunk)
+                    replayed += len(chunk)
+                    continue
+                except Exception as exc:
+                    error = exc
+
+                if not self._database_available():
+                    logger.error(f"❌ Falha ao regravar o spill: {error}")
+                    pending.extend(rows[start:])
+                    break
+
+                for row in chunk:
+                    try:
+                        self._insert([row])
+                        replayed += 1
+                    except Exception as exc:
+                        attempts[id(row)] += 1
+                        if attempts[id(row)] >= self.max_replay_attempts:
+                            logger.error(f"❌ Transação do spill em quarentena: {exc}")
+                            quarantined.append(row)
+                        else:
+                            pending.append(row)
+
+            def with_attempts(rows: List[Dict]) -> List[Dict]:
+                return [
+                    {**row, REPLAY_ATTEMPTS_KEY: attempts[id(row)]} if attempts[id(row)] else row
+                    for row in rows
+                ]
+
+            if quarantined:
+                _append_rows(self.quarantine_path, with_attempts(quarantined))
+
+            if pending:
+                _rewrite_rows(self.spill_path, with_attempts(pending))
+            else:
+                self.spill_path.unlink()
+
+        self.metrics.record(replayed_rows=replayed, quarantined_rows=len(quarantined))
+        if replayed:
+            logger.info(f"✅ {replayed} transações regravadas a partir do spill")
+        if quarantined:
+            logger.warning(
+                f"⚠️ {len(quarantined)} transações movidas para {self.quarantine_path}"
+            )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _parse_row(line: str) -> Dict:
+    row = json.loads(line)
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+def _append_rows(path: Path, rows: List[Dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "a", encoding="utf-8") as output:
+        for row in rows:
+            output.write(json.dumps(row, default=_json_default) + "\n")
+        output.flush()
+        os.fsync(output.fileno())
+
+
+def _rewrite_rows(path: Path, rows: List[Dict]) -> None:
+    """Substitui o arquivo de uma vez (arquivo temporário + rename)."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    _append_rows(tmp_path, rows)
+    os.replace(tmp_path, path)
+
+
+def _resolve_spill_path() -> Optional[Path]:
+    if not settings.WRITE_BEHIND_SPILL_PATH:
+        return None
+
+    # Caminho relativo é resolvido a partir de backend/
+    spill_path = Path(settings.WRITE_BEHIND_SPILL_PATH)
+    if not spill_path.is_absolute():
+        spill_path = Path(__file__).resolve().parents[2] / spill_path
+    return spill_path
+
+
+# ======================================================
+# SINGLETON
+# ======================================================
+
+writer = WriteBehindWriter(
+    max_queue_size=settings.WRITE_BEHIND_QUEUE_SIZE,
+    flush_size=settings.WRITE_BEHIND_FLUSH_SIZE,
+    flush_interval_ms=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS,
+    enqueue_timeout_ms=settings.WRITE_BEHIND_ENQUEUE_TIMEOUT_MS,
+    spill_path=_resolve_spill_path(),
+    max_replay_attempts=settings.WRITE_BEHIND_REPLAY_MAX_ATTEMPTS,
+)
@@ -0,0 +1,103 @@
+"""
+Configuração comum dos testes.
+
+Os testes rodam a partir de backend/ (python -m pytest -q) sem
+PostgreSQL: as variáveis POSTGRES_* só precisam existir para o Settings
+ser criado (os engines não conectam até o primeiro uso). Testes que
+precisam de um PostgreSQL real usam TEST_POSTGRES_URL e são pulados
+sem ela.
+"""
+
+from datetime import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH E AMBIENTE (tests/ -> backend/)
+# ==========================================================
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_ROOT))
+
+for name, value in {
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+}.items():
+    os.environ.setdefault(name, value)
+# ==========================================================
+
+
+@pytest.fixture
+def postgres_engine():
+    """
+    Engine de TEST_POSTGRES_URL (postgresql+psycopg://...) em um schema
+    descartável, criado e removido a cada teste. Sem a variável, o
+    teste é pulado.
+    """
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL não definida")
+
+    from sqlalchemy import create_engine
+
+    schema = f"test_{os.getpid()}"
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        connection.exec_driver_sql(f"CREATE SCHEMA {schema}")
+
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.connect() as connection:
+            connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        admin.dispose()
+
+
+@pytest.fixture(scope="session")
+def detector():
+    """Detector com os artefatos de MODELS_DIR já carregados."""
+    from app.services.deteccao import FraudDetector
+
+    loaded = FraudDetector(load=True)
+    if not loaded.bundle.available:
+        pytest.skip("Artefatos do modelo não encontrados em MODELS_DIR")
+    return loaded
+
+
+# ==========================================================
+# LINHAS DE TRANSACTIONS
+# ==========================================================
+
+def transaction_rows(
+    n_rows: int,
+    created_at: datetime = datetime(2024, 1, 1, 12, 0, 0),
+    anomalies: int = 0,
+    start: int = 0,
+):
+    """
+    Linhas prontas para INSERT em transactions: amount = start + i e as
+    `anomalies` primeiras com prediction = -1.
+    """
+    return [
+        {
+            "time": 0.0,
+            "amount": float(start + i),
+            **{f"v{k}": 0.0 for k in range(1, 29)},
+            "prediction": -1 if i < anomalies else 1,
+            "created_at": created_at,
+        }
+        for i in range(n_rows)
+    ]
+
+
+@pytest.fixture
+def make_rows():
+    return transaction_rows
@@ -0,0 +1,163 @@
+"""
+Paridade da floresta compilada (CompiledForest) com o predict_proba do
+RandomForestClassifier: resultados idênticos (np.array_equal) nos dois
+caminhos de travessia, na instância carregada com mmap e com valores
+exatamente sobre os limiares.
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.ml.compiled_forest import CompiledForest
+
+# O modelo foi treinado com nomes de colunas; aqui os arrays já estão
+# na ordem de feature_names_in_
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+SMALL = CompiledForest.VECTORIZED_MAX_BATCH
+LARGE = 2_000
+
+
+@pytest.fixture(scope="module")
+def trained():
+    """Floresta pequena treinada aqui (não depende dos artefatos)."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2_000, 8))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=2_000) > 0.5).astype(int)
+
+    return RandomForestClassifier(n_estimators=25, max_depth=12, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope="module", params=["trained", "artifact"])
+def model(request, trained):
+    if request.param == "trained":
+        return trained
+    return request.getfixturevalue("detector").model
+
+
+@pytest.fixture(scope="module")
+def engine(model):
+    return CompiledForest.from_sklearn(model)
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["mmap", "mmap+trees"])
+def loaded(request, engine, tmp_path_factory):
+    path = tmp_path_factory.mktemp("forest") / "forest.joblib"
+    engine.save(path)
+    return CompiledForest.load(path, mmap_mode="r", with_trees=request.param)
+
+
+def random_features(model, n_rows: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(scale=3, size=(n_rows, model.n_features_in_))
+
+
+def threshold_features(model, n_rows: int, seed: int = 2) -> np.ndarray:
+    """
+    Linhas com uma feature exatamente sobre um limiar do sklearn
+    (float64), sobre o limiar arredondado para float32 e nos float32
+    vizinhos: os casos que _float32_thresholds precisa preservar.
+    """
+    rng = np.random.default_rng(seed)
+    X = random_features(model, n_rows, seed)
+
+    splits = [
+        (feature, threshold)
+        for estimator in model.estimators_
+        for feature, threshold in zip(estimator.tree_.feature, estimator.tree_.threshold)
+        if feature >= 0
+    ]
+
+    for row in X:
+        feature, threshold = splits[rng.integers(len(splits))]
+        rounded = np.float32(threshold)
+        row[feature] = rng.choice([
+            threshold,
+            float(rounded),
+            float(np.nextafter(rounded, np.float32(-np.inf))),
+            float(np.nextafter(rounded, np.float32(np.inf))),
+        ])
+
+    return X
+
+
+# ==========================================================
+# CAMINHOS DE TRAVESSIA
+# ==========================================================
+
+@pytest.mark.parametrize("n_rows", [1, 2, SMALL])
+def test_vectorized_path(model, engine, n_rows):
+    X = random_features(model, n_rows)
+    assert np.array_equal(engine.predict_proba(X), model.predict_proba(X))
+
+
+@pytest.mark.parametrize("n_rows", [SMALL + 1, LARGE])
+def test_tree_apply_path(model, engine, n_rows):
+    X = random_features(model, n_rows)
+    assert np.array_equal(engine.predict_proba(X), model.predict_proba(X))
+
+
+def test_paths_reach_the_same_leaves(model, engine):
+    X = random_features(model, LARGE)
+    X32 = np.ascontiguousarray(X, dtype=np.float32)
+
+    assert np.array_equal(engine.apply(X), engine._apply_vectorized(X32))
+
+
+# ==========================================================
+# INSTÂNCIA CARREGADA (mmap)
+# ==========================================================
+
+def test_loaded_arrays_are_memory_mapped(loaded):
+    assert isinstance(loaded.threshold, np.memmap)
+    assert isinstance(loaded.value, np.memmap)
+
+
+def test_trees_loaded_only_on_request(engine, tmp_path):
+    path = tmp_path / "forest.joblib"
+    engine.save(path)
+
+    assert CompiledForest.trees_path(path).exists()
+    assert CompiledForest.load(path)._trees is None
+    assert len(CompiledForest.load(path, with_trees=True)._trees) == engine.n_estimators
+
+
+@pytest.mark.parametrize("n_rows", [1, SMALL, SMALL + 1, LARGE])
+def test_loaded_matches_sklearn(model, loaded, n_rows):
+    X = random_features(model, n_rows)
+    assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+
+# ==========================================================
+# VALORES SOBRE OS LIMIARES
+# ==========================================================
+
+@pytest.mark.parametrize("chunk", [SMALL, LARGE])
+def test_values_on_float32_thresholds(model, engine, loaded, chunk):
+    X = threshold_features(model, LARGE)
+    expected = model.predict_proba(X)
+
+    # Em blocos de `chunk` linhas: SMALL passa só pela travessia vetorizada
+    for forest in (engine, loaded):
+        actual = np.concatenate([
+            forest.predict_proba(X[start:start + chunk])
+            for start in range(0, LARGE, chunk)
+        ])
+        assert np.array_equal(actual, expected)
+
+
+def test_float32_thresholds_keep_every_decision():
+    rng = np.random.default_rng(3)
+    threshold = rng.normal(scale=1e3, size=10_000)
+    rounded = CompiledForest._float32_thresholds(threshold)
+
+    # Candidatos float32 em volta de cada limiar
+    x = threshold.astype(np.float32)
+    for candidate in [x, np.nextafter(x, np.float32(-np.inf)), np.nextafter(x, np.float32(np.inf))]:
+        assert np.array_equal(candidate <= rounded, candidate.astype(np.float64) <= threshold)
+
+
+def test_rejects_wrong_shape(engine, model):
+    with pytest.raises(ValueError):
+        engine.predict_proba(np.zeros((3, model.n_features_in_ + 1)))
@@ -0,0 +1,189 @@
+"""
+Equivalência do caminho rápido da predição unitária (predict_transaction,
+sem pandas) com o caminho em DataFrame (process_dataframe / predict_batch):
+probabilidades idênticas bit a bit e as mesmas faixas de risco.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from app.services.deteccao import (
+    FRAUD_THRESHOLD,
+    REQUIRED_FEATURES,
+    ModelBundle,
+    FraudDetector,
+)
+
+N_ROWS = 500
+
+
+def random_rows(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_rows):
+        row = {
+            "time": float(rng.uniform(0, 172_800)),
+            # Valores pequenos e grandes (o scaler é o mesmo nos dois)
+            "amount": float(rng.exponential(100) * rng.choice([1, 50])),
+        }
+        for j in range(1, 29):
+            row[f"v{j}"] = float(rng.normal(0, 3))
+        rows.append(row)
+    return rows
+
+
+def dataframe_result(detector: FraudDetector, features, bundle=None):
+    row = detector.process_dataframe(pd.DataFrame([features]), bundle).iloc[0]
+    return detector._build_result(
+        row["prediction"], row["risk_score"], row["risk_level"], row["model_version"]
+    )
+
+
+def assert_same(fast, slow):
+    assert fast == slow
+    # Mesmo float, não apenas próximo
+    assert np.float64(fast["probability"]).tobytes() == np.float64(slow["probability"]).tobytes()
+    assert type(fast["risk_level"]) is type(slow["risk_level"])
+
+
+# ==========================================================
+# LINHAS ALEATÓRIAS
+# ==========================================================
+
+def test_random_rows_match_process_dataframe(detector):
+    for features in random_rows(N_ROWS):
+        assert_same(detector.predict_transaction(features), dataframe_result(detector, features))
+
+
+def test_random_rows_match_predict_batch(detector):
+    rows = random_rows(N_ROWS, seed=1)
+
+    batch = detector.predict_batch(rows)
+    single = [detector.predict_transaction(features) for features in rows]
+
+    assert len(batch) == len(single)
+    for fast, slow in zip(single, batch):
+        assert_same(fast, slow)
+
+
+# ==========================================================
+# CHAVES
+# ==========================================================
+
+def test_mixed_case_keys(detector):
+    for i, features in enumerate(random_rows(50, seed=2)):
+        mixed = {
+            (key.upper() if (i + position) % 2 else key): value
+            for position, (key, value) in enumerate(features.items())
+        }
+        expected = detector.predict_transaction(features)
+
+        assert_same(detector.predict_transaction(mixed), expected)
+        assert_same(dataframe_result(detector, mixed), expected)
+
+
+@pytest.mark.parametrize("missing", ["v1", "v17", "v28"])
+def test_missing_feature_fails_in_both_paths(detector, missing):
+    features = random_rows(1, seed=3)[0]
+    del features[missing]
+
+    with pytest.raises(ValueError) as fast:
+        detector.predict_transaction(features)
+    with pytest.raises(ValueError) as slow:
+        detector.process_dataframe(pd.DataFrame([features]))
+
+    assert str(fast.value) == str(slow.value)
+
+
+def test_extra_keys_are_ignored(detector):
+    features = random_rows(1, seed=4)[0]
+    extra = {**features, "merchant": "loja", "Class": 1}
+
+    assert_same(detector.predict_transaction(extra), detector.predict_transaction(features))
+
+
+# ==========================================================
+# SCALER
+# ==========================================================
+
+def fitted(scaler, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    return scaler.fit(rng.uniform(0, 172_800, size=(1_000, 1)))
+
+
+def test_unsupported_scaler_uses_dataframe_path(detector):
+    bundle = ModelBundle(
+        version="minmax", model=detector.model, scaler=fitted(MinMaxScaler())
+    )
+    assert bundle.available
+    assert bundle.fast_inputs is None
+
+    for features in random_rows(50, seed=6):
+        assert_same(
+            detector.predict_transaction(features, bundle),
+            dataframe_result(detector, features, bundle),
+        )
+
+
+@pytest.mark.parametrize("scaler", [
+    StandardScaler(),
+    StandardScaler(with_mean=False),
+    StandardScaler(with_std=False),
+])
+def test_standard_scaler_fast_path(detector, scaler):
+    bundle = ModelBundle(version="standard", model=detector.model, scaler=fitted(scaler))
+    assert bundle.fast_inputs is not None
+
+    for features in random_rows(50, seed=7):
+        assert_same(
+            detector.predict_transaction(features, bundle),
+            dataframe_result(detector, features, bundle),
+        )
+
+
+# ==========================================================
+# BORDAS DAS FAIXAS DE RISCO
+# ==========================================================
+
+EDGE_PROBABILITIES = [
+    0.0,
+    FRAUD_THRESHOLD,
+    np.nextafter(FRAUD_THRESHOLD, 0),
+    0.3,
+    np.nextafter(0.3, 0),
+    np.nextafter(0.3, 1),
+    0.7,
+    np.nextafter(0.7, 0),
+    np.nextafter(0.7, 1),
+    1.0,
+]
+
+
+@pytest.mark.parametrize("probability", EDGE_PROBABILITIES)
+def test_risk_bin_edges(detector, monkeypatch, probability):
+    def fixed_proba(X, bundle):
+        return np.tile([1.0 - probability, probability], (len(X), 1))
+
+    monkeypatch.setattr(detector, "_predict_proba", fixed_proba)
+    features = random_rows(1, seed=8)[0]
+
+    fast = detector.predict_transaction(features)
+    assert fast["probability"] == probability
+
+    assert_same(fast, dataframe_result(detector, features))
+    assert_same(fast, detector.predict_batch([features] * 20)[0])
+
+
+@pytest.mark.parametrize("amount", [0.0, 1_500.0, 1_499.99, 3_500.0, 3_500.01, 5_000.0, 9_000.0])
+def test_fallback_risk_bin_edges(amount):
+    detector = FraudDetector(load=False)
+    assert not detector.bundle.available
+
+    features = {name: 0.0 for name in REQUIRED_FEATURES}
+    features["amount"] = amount
+
+    fast = detector.predict_transaction(features)
+    assert_same(fast, dataframe_result(detector, features))
+    assert_same(fast, detector.predict_batch([features])[0])
@@ -0,0 +1,59 @@
+"""
+Feature store colunar: valores do CSV preservados em float64, scores
+idênticos em float32 e lossless indicando se o store serve ao seed.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.feature_store import FeatureStore
+
+N_ROWS = 300
+
+
+@pytest.fixture(scope="module")
+def csv_path(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    data = {"Time": rng.uniform(0, 172_792, N_ROWS)}
+    for i in range(1, 29):
+        data[f"V{i}"] = rng.normal(0, 3, N_ROWS)
+    data["Amount"] = rng.lognormal(3, 1.5, N_ROWS)
+    data["Class"] = rng.integers(0, 2, N_ROWS)
+
+    path = tmp_path_factory.mktemp("raw") / "creditcard.csv"
+    pd.DataFrame(data).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="module", params=["float32", "float64"])
+def store(request, csv_path, tmp_path_factory):
+    path = tmp_path_factory.mktemp("processed") / "creditcard"
+    return FeatureStore.from_csv(csv_path, path, chunk_size=64, dtype=request.param)
+
+
+def test_lossless_only_in_float64(store):
+    assert store.lossless == (store.metadata["columns"]["v1"] == "float64")
+
+
+def test_values_match_csv(store, csv_path):
+    expected = pd.read_csv(csv_path).rename(columns=str.lower)
+    frame = store.frame()
+
+    assert len(store) == N_ROWS
+    # Time, Amount e Class sempre exatos
+    for name in ["time", "amount", "class"]:
+        assert np.array_equal(frame[name].to_numpy(), expected[name].to_numpy())
+
+    v1 = frame["v1"].to_numpy()
+    if store.lossless:
+        assert np.array_equal(v1, expected["v1"].to_numpy())
+    else:
+        assert np.array_equal(v1, expected["v1"].to_numpy().astype(np.float32))
+
+
+def test_scores_match_csv(store, csv_path, detector):
+    expected = detector.process_dataframe(pd.read_csv(csv_path))
+    actual = detector.process_dataframe(store.frame())
+
+    assert np.array_equal(actual["risk_score"].to_numpy(), expected["risk_score"].to_numpy())
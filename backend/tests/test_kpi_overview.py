@@ -0,0 +1,63 @@
+"""
+/kpis/overview em SQLite: os totais "live" cobrem só os dias ainda em
+transactions e batem com a contagem da tabela; all_time_* incluem os
+dias que só existem no rollup (meses arquivados).
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel
+
+from app.models.daily_kpi import DailyKPI
+from app.models.transaction import Transaction
+from app.repositories.kpi_repository import KPIRepository
+
+
+
+def test_overview_separates_live_and_all_time(tmp_path, make_rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kpis.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        # Dia arquivado: só no rollup
+        connection.execute(
+            DailyKPI.__table__.insert(),
+            [{"day": date(2024, 1, 10), "total": 40, "anomalies": 4, "updated_at": datetime.utcnow()}],
+        )
+        for created_at, n_rows, anomalies in [
+            (datetime(2024, 3, 1, 9), 10, 1),
+            (datetime(2024, 3, 2, 18), 15, 2),
+        ]:
+            rows = make_rows(n_rows, created_at, anomalies)
+            connection.execute(Transaction.__table__.insert(), rows)
+            KPIRepository.increment_daily(connection, rows)
+
+    with Session(engine) as session:
+        overview = KPIRepository.overview(session)
+        live = (
+            KPIRepository.total_transactions(session),
+            KPIRepository.total_anomalies(session),
+        )
+
+    assert (overview["total_transactions"], overview["total_anomalies"]) == live == (25, 3)
+    assert overview["anomaly_rate"] == 12.0
+    assert (overview["all_time_transactions"], overview["all_time_anomalies"]) == (65, 7)
+    assert overview["all_time_anomaly_rate"] == round(7 / 65 * 100, 2)
+
+
+def test_overview_of_empty_table_counts_only_archived(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kpis.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        connection.execute(
+            DailyKPI.__table__.insert(),
+            [{"day": date(2024, 1, 10), "total": 40, "anomalies": 4, "updated_at": datetime.utcnow()}],
+        )
+
+    with Session(engine) as session:
+        overview = KPIRepository.overview(session)
+
+    assert (overview["total_transactions"], overview["total_anomalies"], overview["anomaly_rate"]) == (0, 0, 0.0)
+    assert overview["all_time_transactions"] == 40
@@ -0,0 +1,158 @@
+"""
+Troca de versão do modelo: load() em background não sobrescreve uma
+versão ativada pelo registro, e o pool de scoring só atende a versão
+que seus workers carregaram.
+"""
+
+import numpy as np
+import pytest
+
+from app.core.metrics import FALLBACK_PREDICTIONS_TOTAL, PREDICTIONS_TOTAL
+from app.services.deteccao import FraudDetector, ModelBundle
+from app.services.model_registry import ModelRegistry
+from app.services.scoring_pool import ScoringPool
+
+
+@pytest.fixture(scope="module")
+def bundles(detector):
+    """Duas "versões" com os mesmos artefatos e rótulos diferentes."""
+    model, scaler = detector.model, detector.scaler
+    return (
+        ModelBundle(version="v1", model=model, scaler=scaler),
+        ModelBundle(version="v2", model=model, scaler=scaler),
+    )
+
+
+# ==========================================================
+# DETECTOR
+# ==========================================================
+
+def test_load_after_activation_is_noop(bundles):
+    _, v2 = bundles
+    fraud_detector = FraudDetector(load=False)
+
+    fraud_detector.activate(v2)
+    fraud_detector.load()
+
+    assert fraud_detector.version == "v2"
+    assert fraud_detector.ready
+
+
+def test_load_finishing_after_activation_is_discarded(bundles, monkeypatch):
+    _, v2 = bundles
+    fraud_detector = FraudDetector(load=False)
+    warm_up = fraud_detector.warm_up
+
+    def activate_while_warming_up(bundle=None):
+        # O registro ativa v2 enquanto o load do startup aquece v1
+        fraud_detector.activate(v2)
+        warm_up(bundle)
+
+    monkeypatch.setattr(fraud_detector, "warm_up", activate_while_warming_up)
+    fraud_detector.load()
+
+    assert fraud_detector.version == "v2"
+    assert fraud_detector.status == "ready"
+
+
+def test_activation_and_rollback_keep_previous_in_sync(bundles):
+    v1, v2 = bundles
+    fraud_detector = FraudDetector(load=False)
+    fraud_detector.activate(v1)
+
+    registry = ModelRegistry(fraud_detector)
+    with registry._lock:
+        registry._swap(v2)
+
+    assert (fraud_detector.version, registry.previous.version) == ("v2", "v1")
+    assert registry.rollback() == "v1"
+    assert registry.previous.version == "v2"
+
+
+def test_validation_does_not_count_predictions(bundles):
+    _, v2 = bundles
+    registry = ModelRegistry(FraudDetector(load=False))
+    before = (PREDICTIONS_TOTAL.samples(), FALLBACK_PREDICTIONS_TOTAL.samples())
+
+    registry.validate(v2)
+
+    assert (PREDICTIONS_TOTAL.samples(), FALLBACK_PREDICTIONS_TOTAL.samples()) == before
+
+
+# ==========================================================
+# POOL DE SCORING
+# ==========================================================
+
+@pytest.fixture
+def pool(bundles):
+    v1, _ = bundles
+    fraud_detector = FraudDetector(load=False)
+    fraud_detector.activate(v1)
+
+    scoring_pool = ScoringPool(fraud_detector, workers=1, chunk_rows=64)
+    scoring_pool.start()
+    yield scoring_pool
+    scoring_pool.stop()
+
+
+def test_pool_serves_only_its_version(pool, detector):
+    X = np.random.default_rng(0).normal(size=(100, detector.model.n_features_in_))
+
+    assert np.array_equal(pool.predict_proba(X, "v1"), detector.engine.predict_proba(X))
+    assert pool.predict_proba(X, "v2") is None
+
+
+def test_reload_swaps_version_and_removes_old_file_after_shutdown(pool, bundles, detector):
+    _, v2 = bundles
+    X = np.random.default_rng(1).normal(size=(100, detector.model.n_features_in_))
+
+    old_path = pool._model_path
+    pool.detector.activate(v2)
+    pool.reload()
+
+    assert pool.version == "v2"
+    assert pool.predict_proba(X, "v1") is None
+    assert np.array_equal(pool.predict_proba(X, "v2"), detector.engine.predict_proba(X))
+
+    for thread in list(pool._retiring):
+        thread.join(timeout=60)
+
+    assert not old_path.exists()
+    assert pool._model_path.exists()
+    assert dict(pool._path_users) == {pool._model_path: 1}
+
+
+def test_recycled_executor_keeps_model_file(bundles, detector):
+    v1, _ = bundles
+    fraud_detector = FraudDetector(load=False)
+    fraud_detector.activate(v1)
+
+    scoring_pool = ScoringPool(fraud_detector, workers=1, max_tasks_per_child=1, chunk_rows=64)
+    scoring_pool.start()
+    try:
+        X = np.random.default_rng(2).normal(size=(10, detector.model.n_features_in_))
+        for _ in range(2):
+            assert scoring_pool.predict_proba(X, "v1") is not None
+
+        for thread in list(scoring_pool._retiring):
+            thread.join(timeout=60)
+
+        # O arquivo ainda é o da versão ativa: reciclar não o remove
+        assert scoring_pool._model_path.exists()
+        assert scoring_pool.predict_proba(X, "v1") is not None
+    finally:
+        scoring_pool.stop()
+
+
+def test_mmap_only_workers_match_local_scoring(bundles, detector):
+    v1, _ = bundles
+    fraud_detector = FraudDetector(load=False)
+    fraud_detector.activate(v1)
+
+    scoring_pool = ScoringPool(fraud_detector, workers=1, chunk_rows=64, load_trees=False)
+    scoring_pool.start()
+    try:
+        X = np.random.default_rng(3).normal(size=(200, detector.model.n_features_in_))
+        assert np.array_equal(scoring_pool.predict_proba(X, "v1"), detector.engine.predict_proba(X))
+    finally:
+        scoring_pool.stop()
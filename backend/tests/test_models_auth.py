@@ -0,0 +1,45 @@
+"""
+POST /models/... (ativação e rollback) exige um X-Admin-Token válido e
+fica fechado sem MODELS_ADMIN_SECRET; GET /models continua aberto.
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiling import sign_profile_token
+from app.main import create_app
+
+SECRET = "segredo-de-teste"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def configure(secret: str) -> TestClient:
+        monkeypatch.setattr(settings, "MODELS_ADMIN_SECRET", secret)
+        return TestClient(create_app())
+
+    return configure
+
+
+def test_writes_refused_without_secret(client):
+    api = client("")
+    token = sign_profile_token("qualquer", int(time.time()) + 60)
+
+    assert api.get("/api/v1/models").status_code == 200
+    assert api.post("/api/v1/models/rollback", headers={"X-Admin-Token": token}).status_code == 403
+    assert api.post("/api/v1/models/v2/activate", headers={"X-Admin-Token": token}).status_code == 403
+
+
+def test_writes_require_valid_token(client):
+    api = client(SECRET)
+
+    assert api.post("/api/v1/models/rollback").status_code == 403
+    assert api.post("/api/v1/models/nao-existe/activate", headers={"X-Admin-Token": "invalido"}).status_code == 403
+
+    # Token válido: a rota roda (sem versão anterior / versão inexistente)
+    headers = {"X-Admin-Token": sign_profile_token(SECRET, int(time.time()) + 60)}
+    assert api.post("/api/v1/models/rollback", headers=headers).status_code == 409
+    assert api.post("/api/v1/models/nao-existe/activate", headers=headers).status_code == 404
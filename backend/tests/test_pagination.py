@@ -0,0 +1,23 @@
+"""
+limit/offset fora dos limites são rejeitados com 422 antes de chegar
+ao banco, e uma página vazia nunca gera next_cursor.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.transactions import next_cursor
+from app.main import create_app
+
+
+@pytest.mark.parametrize("path", ["/api/v1/anomalies", "/api/v1/transactions"])
+@pytest.mark.parametrize("query", ["limit=0", "limit=-1", "offset=-1"])
+def test_out_of_range_pagination_is_rejected(path, query):
+    client = TestClient(create_app())
+
+    assert client.get(f"{path}?{query}").status_code == 422
+
+
+def test_empty_page_has_no_cursor():
+    assert next_cursor([], 0) is None
+    assert next_cursor([], 20) is None
@@ -0,0 +1,87 @@
+"""
+Índices de INDEX_UPGRADES em um PostgreSQL real (TEST_POSTGRES_URL):
+o startup não os constrói, create_indexes cria os ausentes, reconstrói
+os INVALID, remove os redundantes e não roda em paralelo com outro
+processo.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from app.core.database import (
+    INDEX_UPGRADES,
+    SCHEMA_LOCK,
+    apply_schema_upgrades,
+    create_indexes,
+    index_states,
+    obsolete_indexes,
+)
+
+
+def states(engine):
+    with engine.connect() as connection:
+        return index_states(connection)
+
+
+@pytest.fixture
+def legacy_engine(postgres_engine):
+    """transactions sem os índices de INDEX_UPGRADES (banco antigo)."""
+    SQLModel.metadata.create_all(postgres_engine)
+
+    with postgres_engine.begin() as connection:
+        for name in INDEX_UPGRADES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    return postgres_engine
+
+
+def test_startup_only_reports_missing_indexes(legacy_engine, caplog):
+    apply_schema_upgrades(legacy_engine)
+
+    assert set(states(legacy_engine).values()) == {"missing"}
+    assert "scripts/create_indexes.py" in caplog.text
+
+
+def test_create_indexes_builds_missing_and_rebuilds_invalid(legacy_engine):
+    assert set(create_indexes(legacy_engine).values()) == {"created"}
+    assert set(states(legacy_engine).values()) == {"valid"}
+
+    # Simula um CREATE INDEX CONCURRENTLY interrompido (requer superusuário)
+    name = "ix_transactions_amount"
+    with legacy_engine.begin() as connection:
+        connection.execute(
+            text("UPDATE pg_index SET indisvalid = false WHERE indexrelid = to_regclass(:name)"),
+            {"name": name},
+        )
+    assert states(legacy_engine)[name] == "invalid"
+
+    actions = create_indexes(legacy_engine)
+    assert actions[name] == "rebuilt"
+    assert set(states(legacy_engine).values()) == {"valid"}
+
+
+def test_create_indexes_refuses_concurrent_run(legacy_engine):
+    with legacy_engine.connect() as holder:
+        holder.execute(text("SELECT pg_advisory_lock(hashtext(:lock))"), {"lock": SCHEMA_LOCK})
+        try:
+            with pytest.raises(RuntimeError):
+                create_indexes(legacy_engine)
+        finally:
+            holder.execute(text("SELECT pg_advisory_unlock(hashtext(:lock))"), {"lock": SCHEMA_LOCK})
+
+    assert set(states(legacy_engine).values()) == {"missing"}
+
+
+def test_create_indexes_drops_redundant_risk_level_index(legacy_engine):
+    with legacy_engine.begin() as connection:
+        connection.exec_driver_sql("CREATE INDEX ix_transactions_risk_level ON transactions (risk_level)")
+        assert obsolete_indexes(connection) == ["ix_transactions_risk_level"]
+
+    apply_schema_upgrades(legacy_engine)
+
+    actions = create_indexes(legacy_engine)
+    assert actions["ix_transactions_risk_level"] == "dropped"
+    assert states(legacy_engine)["ix_transactions_risk_level_created_at_id"] == "valid"
+
+    with legacy_engine.connect() as connection:
+        assert obsolete_indexes(connection) == []
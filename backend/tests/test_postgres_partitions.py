@@ -0,0 +1,180 @@
+"""
+Arquivamento de partições em um PostgreSQL real (TEST_POSTGRES_URL):
+DETACH CONCURRENTLY não bloqueia INSERTs nem leituras, um DETACH
+interrompido é concluído com FINALIZE e, com uma partição DEFAULT, só
+o --blocking-detach arquiva.
+"""
+
+from datetime import datetime, timedelta
+import threading
+import time
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel
+
+from app.models.transaction import Transaction
+from app.repositories.kpi_repository import KPIRepository
+from app.repositories.partitions_repository import (
+    PartitionsRepository,
+    add_months,
+    month_start,
+    partition_name,
+)
+from app.services import partition_maintenance
+from app.services.partition_maintenance import PartitionMaintainer
+
+CURRENT_MONTH = month_start(datetime.utcnow().date())
+EXPIRED_MONTH = add_months(CURRENT_MONTH, -4)
+EXPIRED = partition_name(EXPIRED_MONTH)
+
+
+
+def insert(connection, rows):
+    connection.execute(Transaction.__table__.insert(), rows)
+    KPIRepository.increment_daily(connection, rows)
+
+
+@pytest.fixture
+def partitioned_engine(postgres_engine, monkeypatch, make_rows):
+    """transactions particionada com um mês expirado e o mês corrente."""
+    SQLModel.metadata.create_all(postgres_engine)
+
+    with postgres_engine.begin() as connection:
+        insert(connection, make_rows(30, datetime.combine(EXPIRED_MONTH, datetime.min.time()), anomalies=3))
+        PartitionsRepository.convert(connection, months_ahead=1)
+        insert(connection, make_rows(20, datetime.utcnow() - timedelta(minutes=1), anomalies=1))
+
+    monkeypatch.setattr(partition_maintenance, "engine", postgres_engine)
+    return postgres_engine
+
+
+@pytest.fixture
+def maintainer(tmp_path):
+    return PartitionMaintainer(months_ahead=1, retention_months=3, archive_dir=tmp_path)
+
+
+def partitions(engine):
+    with engine.connect() as connection:
+        return {partition.name: partition for partition in PartitionsRepository.monthly_partitions(connection)}
+
+
+def wait_for_lock(engine, pid: int) -> None:
+    """Espera o backend pid ficar bloqueado (DETACH esperando o leitor)."""
+    with engine.connect() as connection:
+        for _ in range(200):
+            waiting = connection.execute(
+                text("SELECT wait_event_type = 'Lock' FROM pg_stat_activity WHERE pid = :pid"),
+                {"pid": pid},
+            ).scalar()
+            if waiting:
+                return
+            time.sleep(0.05)
+    raise AssertionError("DETACH não chegou a esperar o leitor")
+
+
+def test_archive_detaches_exports_and_keeps_overview_consistent(partitioned_engine, maintainer):
+    with partitioned_engine.connect() as connection:
+        assert PartitionsRepository.supports_concurrent_detach(connection)
+
+    assert maintainer.run_once()["archived"] == [EXPIRED]
+    assert EXPIRED not in partitions(partitioned_engine)
+    assert pq.ParquetFile(maintainer.archive_dir / f"{EXPIRED}.parquet").metadata.num_rows == 30
+
+    with Session(partitioned_engine) as session:
+        overview = KPIRepository.overview(session)
+        live = (
+            KPIRepository.total_transactions(session),
+            KPIRepository.total_anomalies(session),
+        )
+
+    # Totais "live" batem com a tabela; all_time_* mantêm o mês arquivado
+    assert (overview["total_transactions"], overview["total_anomalies"]) == live == (20, 1)
+    assert (overview["all_time_transactions"], overview["all_time_anomalies"]) == (50, 4)
+
+
+def test_concurrent_detach_does_not_block_inserts(partitioned_engine, make_rows):
+    reader = partitioned_engine.connect()
+    detacher = partitioned_engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    errors = []
+
+    def detach():
+        try:
+            PartitionsRepository.detach_partition(detacher, EXPIRED)
+        except Exception as exc:
+            errors.append(exc)
+
+    try:
+        # Uma leitura longa em andamento: o DETACH espera por ela
+        reader.execute(text("SELECT count(*) FROM transactions")).scalar()
+        pid = detacher.execute(text("SELECT pg_backend_pid()")).scalar()
+
+        thread = threading.Thread(target=detach)
+        thread.start()
+        wait_for_lock(partitioned_engine, pid)
+
+        # Um DETACH sem CONCURRENTLY deixaria o INSERT na fila atrás do
+        # ACCESS EXCLUSIVE até o lock_timeout
+        with partitioned_engine.begin() as writer:
+            writer.exec_driver_sql("SET LOCAL lock_timeout = '2s'")
+            insert(writer, make_rows(5, datetime.utcnow()))
+            # Consultas novas já não veem a partição em DETACH
+            assert writer.execute(text("SELECT count(*) FROM transactions")).scalar() == 25
+
+        reader.commit()
+        thread.join(timeout=30)
+    finally:
+        reader.close()
+        detacher.close()
+
+    assert not errors
+    assert not partitions(partitioned_engine)[EXPIRED].attached
+
+
+def test_interrupted_detach_is_finalized(partitioned_engine, maintainer):
+    reader = partitioned_engine.connect()
+    detacher = partitioned_engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    errors = []
+
+    def detach():
+        try:
+            PartitionsRepository.detach_partition(detacher, EXPIRED)
+        except Exception as exc:
+            errors.append(exc)
+
+    try:
+        reader.execute(text("SELECT count(*) FROM transactions")).scalar()
+        pid = detacher.execute(text("SELECT pg_backend_pid()")).scalar()
+
+        thread = threading.Thread(target=detach)
+        thread.start()
+        wait_for_lock(partitioned_engine, pid)
+
+        # Cancela o DETACH na segunda fase: a partição fica "detach pending"
+        with partitioned_engine.connect() as admin:
+            admin.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": pid})
+        thread.join(timeout=30)
+        reader.commit()
+    finally:
+        reader.close()
+        detacher.close()
+
+    assert errors
+    assert partitions(partitioned_engine)[EXPIRED].detach_pending
+
+    assert maintainer.run_once()["archived"] == [EXPIRED]
+    assert EXPIRED not in partitions(partitioned_engine)
+
+
+def test_default_partition_requires_blocking_detach(partitioned_engine, maintainer, caplog):
+    with partitioned_engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+        assert not PartitionsRepository.supports_concurrent_detach(connection)
+
+    assert maintainer.run_once()["archived"] == []
+    assert partitions(partitioned_engine)[EXPIRED].attached
+    assert "--blocking-detach" in caplog.text
+
+    assert maintainer.run_once(blocking_detach=True)["archived"] == [EXPIRED]
+    assert EXPIRED not in partitions(partitioned_engine)
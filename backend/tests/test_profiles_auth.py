@@ -0,0 +1,53 @@
+"""
+GET /profiles (SQL e caminhos do código) só existe com PROFILING_SECRET
+e sempre exige um X-Profile-Token válido.
+"""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.profiles import require_profile_token
+from app.core.config import settings
+from app.core.profiling import profiler, sign_profile_token
+from app.main import create_app
+
+SECRET = "segredo-de-teste"
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiler, "directory", tmp_path)
+
+    def configure(secret: str) -> TestClient:
+        monkeypatch.setattr(settings, "PROFILING_SECRET", secret)
+        monkeypatch.setattr(profiler, "secret", secret)
+        return TestClient(create_app())
+
+    return configure
+
+
+def test_profiles_not_served_without_secret(profiling, caplog):
+    client = profiling("")
+
+    assert client.get("/profiles").status_code == 404
+    assert "PROFILING_SECRET vazio" in caplog.text
+
+
+def test_profiles_require_valid_token(profiling):
+    client = profiling(SECRET)
+
+    assert client.get("/profiles").status_code == 403
+    assert client.get("/profiles", headers={"X-Profile-Token": "invalido"}).status_code == 403
+
+    token = sign_profile_token(SECRET, int(time.time()) + 60)
+    assert client.get("/profiles", headers={"X-Profile-Token": token}).status_code == 200
+
+
+def test_token_check_fails_closed_without_secret(profiling):
+    profiling("")
+    with pytest.raises(HTTPException):
+        require_profile_token(sign_profile_token("qualquer", int(time.time()) + 60))
@@ -0,0 +1,91 @@
+"""
+Pools de leitura e escrita com dois arquivos SQLite no lugar do banco
+principal e da réplica (aiosqlite): /predict grava só no principal, e
+listagens, anomalias e KPIs leem só da réplica.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, create_engine
+
+from app.core import database
+from app.core.cache import kpi_cache
+from app.main import create_app
+from app.models.transaction import Transaction
+from app.repositories.kpi_repository import KPIRepository
+
+FEATURES = {"time": 0.0, "amount": 10.0, **{f"v{i}": 0.0 for i in range(1, 29)}}
+
+
+
+def amounts(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as connection:
+        rows = connection.execute(Transaction.__table__.select()).all()
+    engine.dispose()
+    return sorted(row.amount for row in rows)
+
+
+def checkouts(name, engine):
+    return database.pool_metrics[name].snapshot(engine.pool)["checkouts"]
+
+
+@pytest.fixture
+def stand_ins(tmp_path, monkeypatch, detector, make_rows):
+    """primary.db e replica.db, cada um atrás do seu pool assíncrono."""
+    paths = {"primary": tmp_path / "primary.db", "replica": tmp_path / "replica.db"}
+
+    for path in paths.values():
+        engine = create_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(engine)
+        engine.dispose()
+
+    # Uma linha só na réplica: é o que as leituras devem devolver
+    replica = create_engine(f"sqlite:///{paths['replica']}")
+    with replica.begin() as connection:
+        rows = make_rows(1, anomalies=1, start=999)
+        connection.execute(Transaction.__table__.insert(), rows)
+        KPIRepository.increment_daily(connection, rows)
+    replica.dispose()
+
+    write = database.create_pooled_engine(
+        f"sqlite:///{paths['primary']}", "test_async_write", 1, 0, is_async=True
+    )
+    read = database.create_pooled_engine(
+        f"sqlite:///{paths['replica']}", "test_async_read", 1, 0, is_async=True
+    )
+    monkeypatch.setattr(database, "async_engine", write)
+    monkeypatch.setattr(database, "async_read_engine", read)
+    monkeypatch.setattr("app.api.v1.routes.prediction.detector", detector)
+    kpi_cache.invalidate()
+
+    yield paths
+
+    kpi_cache.invalidate()
+
+
+def test_reads_use_read_pool_and_writes_use_write_pool(stand_ins):
+    # Sem lifespan: nada de startup, write-behind ou micro-batching
+    client = TestClient(create_app())
+
+    response = client.post("/api/v1/predict", json={"features": FEATURES})
+    assert response.status_code == 200
+
+    assert amounts(stand_ins["primary"]) == [10.0]
+    assert amounts(stand_ins["replica"]) == [999.0]
+    assert checkouts("test_async_read", database.async_read_engine) == 0
+    writes = checkouts("test_async_write", database.async_engine)
+
+    listing = client.get("/api/v1/transactions?limit=10").json()
+    assert [row["amount"] for row in listing["items"]] == [999.0]
+
+    anomalies = client.get("/api/v1/anomalies?limit=10").json()
+    assert [row["amount"] for row in anomalies["data"]] == [999.0]
+    assert anomalies["total_transactions"] == 1
+
+    overview = client.get("/api/v1/kpis/overview").json()
+    assert (overview["total_transactions"], overview["total_anomalies"]) == (1, 1)
+
+    # As leituras não tocaram o pool de escrita
+    assert checkouts("test_async_write", database.async_engine) == writes
+    assert checkouts("test_async_read", database.async_read_engine) >= 3
@@ -0,0 +1,159 @@
+"""
+Write-behind: enfileiramento tudo ou nada do lote e quarentena das
+linhas do spill que falham repetidamente. O banco é substituído por
+um _insert falso.
+"""
+
+import json
+
+import pytest
+
+from app.services.write_behind import (
+    REPLAY_ATTEMPTS_KEY,
+    PersistenceQueueFullError,
+    WriteBehindWriter,
+)
+
+
+
+class FakeDatabase:
+    """Grava as linhas em memória; falha com linhas "envenenadas"."""
+
+    def __init__(self, poison=(), available=True):
+        self.rows = []
+        self.poison = set(poison)
+        self.available = available
+
+    def insert(self, rows):
+        if not self.available or any(row["amount"] in self.poison for row in rows):
+            raise RuntimeError("INSERT falhou")
+        self.rows.extend(rows)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    fake = FakeDatabase()
+    monkeypatch.setattr(WriteBehindWriter, "_insert", staticmethod(fake.insert))
+    monkeypatch.setattr(
+        WriteBehindWriter, "_database_available", staticmethod(lambda: fake.available)
+    )
+    return fake
+
+
+# ==========================================================
+# ENFILEIRAMENTO
+# ==========================================================
+
+def test_enqueue_many_is_all_or_nothing(database, make_rows):
+    writer = WriteBehindWriter(max_queue_size=10, enqueue_timeout_ms=10)
+
+    writer.enqueue_many(make_rows(6))
+    with pytest.raises(PersistenceQueueFullError):
+        writer.enqueue_many(make_rows(6, start=100))
+
+    # Nenhuma linha do lote recusado ficou na fila
+    assert writer._queued_rows == 6
+    assert writer.metrics.snapshot()["rejected"] == 6
+
+    writer.start()
+    writer.stop()
+
+    assert [row["amount"] for row in database.rows] == [float(i) for i in range(6)]
+
+
+def test_batch_larger_than_queue_is_rejected(database, make_rows):
+    writer = WriteBehindWriter(max_queue_size=10, enqueue_timeout_ms=1_000)
+
+    with pytest.raises(PersistenceQueueFullError):
+        writer.enqueue_many(make_rows(11))
+    assert writer._queued_rows == 0
+
+
+def test_space_is_released_as_batches_are_consumed(database, make_rows):
+    writer = WriteBehindWriter(max_queue_size=10, flush_interval_ms=5, enqueue_timeout_ms=2_000)
+    writer.start()
+
+    try:
+        for start in range(0, 100, 10):
+            writer.enqueue_many(make_rows(10, start=start))
+    finally:
+        writer.stop()
+
+    assert len(database.rows) == 100
+    assert writer._queued_rows == 0
+
+
+def test_large_batch_is_flushed_in_flush_size_chunks(database, monkeypatch, make_rows):
+    sizes = []
+    insert = database.insert
+    monkeypatch.setattr(
+        WriteBehindWriter, "_insert", staticmethod(lambda rows: (sizes.append(len(rows)), insert(rows)))
+    )
+
+    writer = WriteBehindWriter(max_queue_size=1_000, flush_size=100)
+    writer.start()
+    writer.enqueue_many(make_rows(250))
+    writer.stop()
+
+    assert max(sizes) <= 100
+    assert len(database.rows) == 250
+
+
+# ==========================================================
+# SPILL E QUARENTENA
+# ==========================================================
+
+def write_spill(path, rows):
+    path.write_text(
+        "".join(json.dumps({**row, "created_at": row["created_at"].isoformat()}) + "\n" for row in rows),
+        encoding="utf-8",
+    )
+
+
+def read_spill(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_poison_row_is_quarantined_after_max_attempts(database, tmp_path, make_rows):
+    database.poison = {2.0}
+    spill_path = tmp_path / "transactions.jsonl"
+    write_spill(spill_path, make_rows(5))
+
+    writer = WriteBehindWriter(flush_size=2, spill_path=spill_path, max_replay_attempts=3)
+
+    writer._replay_spill()
+    assert sorted(row["amount"] for row in database.rows) == [0.0, 1.0, 3.0, 4.0]
+    assert [(row["amount"], row[REPLAY_ATTEMPTS_KEY]) for row in read_spill(spill_path)] == [(2.0, 1)]
+
+    writer._replay_spill()
+    writer._replay_spill()
+
+    assert not spill_path.exists()
+    quarantined = read_spill(writer.quarantine_path)
+    assert [(row["amount"], row[REPLAY_ATTEMPTS_KEY]) for row in quarantined] == [(2.0, 3)]
+
+    snapshot = writer.metrics.snapshot()
+    assert snapshot["replayed_rows"] == 4
+    assert snapshot["quarantined_rows"] == 1
+
+
+def test_database_down_keeps_spill_without_counting_attempts(database, tmp_path, make_rows):
+    database.available = False
+    spill_path = tmp_path / "transactions.jsonl"
+    write_spill(spill_path, make_rows(5))
+
+    writer = WriteBehindWriter(flush_size=2, spill_path=spill_path, max_replay_attempts=1)
+    for _ in range(3):
+        writer._replay_spill()
+
+    rows = read_spill(spill_path)
+    assert [row["amount"] for row in rows] == [float(i) for i in range(5)]
+    assert all(REPLAY_ATTEMPTS_KEY not in row for row in rows)
+    assert not writer.quarantine_path.exists()
+
+    database.available = True
+    writer._replay_spill()
+
+    assert not spill_path.exists()
+    assert len(database.rows) == 5
+    assert all(REPLAY_ATTEMPTS_KEY not in row for row in database.rows)
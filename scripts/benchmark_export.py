@@ -0,0 +1,137 @@
+"""
+Benchmark de extração de transações: paginação vs exportação.
+
+Mede, contra o banco de DATABASE_URL (use um banco com seed), quanto
+tempo leva para baixar todas as transações com todas as features:
+- paginação: GET /transactions?limit=100&fields=all&count=none,
+  seguindo o next_cursor até a última página
+- exportação: GET /transactions/export em NDJSON, CSV e Parquet,
+  com e sem gzip
+
+As requisições rodam em processo (TestClient), sem rede, e o corpo
+das exportações é lido em streaming (sem acumular no cliente).
+
+Execução:
+    python scripts/benchmark_export.py [--max-pages N]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+PAGE_SIZE = 100  # máximo aceito por /transactions
+FORMATS = ["ndjson", "csv", "parquet"]
+# ==========================================================
+
+
+def run_paging(client: TestClient, max_pages: Optional[int]) -> tuple:
+    """Retorna (linhas, bytes, segundos)."""
+    rows = size = pages = 0
+    cursor = None
+
+    start = time.perf_counter()
+    while max_pages is None or pages < max_pages:
+        params = {"limit": PAGE_SIZE, "fields": "all", "count": "none"}
+        if cursor:
+            params["cursor"] = cursor
+
+        response = client.get("/api/v1/transactions", params=params)
+        response.raise_for_status()
+
+        body = response.json()
+        rows += len(body["items"])
+        size += len(response.content)
+        pages += 1
+
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    return rows, size, time.perf_counter() - start
+
+
+def run_export(client: TestClient, format: str, gzip: bool) -> tuple:
+    """Retorna (bytes, segundos)."""
+    size = 0
+
+    start = time.perf_counter()
+    with client.stream(
+        "GET",
+        "/api/v1/transactions/export",
+        params={"format": format, "gzip": str(gzip).lower()},
+    ) as response:
+        response.raise_for_status()
+        # Bytes como vieram do servidor (comprimidos, com gzip)
+        for chunk in response.iter_raw():
+            size += len(chunk)
+
+    return size, time.perf_counter() - start
+
+
+def run_benchmark(max_pages: Optional[int]) -> None:
+    client = TestClient(app)
+
+    print(f"{'modo':>18} | {'linhas':>9} | {'MB':>8} | {'tempo (s)':>9} | "
+          f"{'linhas/s':>10} | {'ganho':>6}")
+
+    rows, size, paging_seconds = run_paging(client, max_pages)
+    paging_rate = rows / paging_seconds
+    print(
+        f"{'paginação':>18} | {rows:>9} | {size / 2**20:>8.1f} | "
+        f"{paging_seconds:>9.2f} | {paging_rate:>10,.0f} | {1.0:>5.1f}x"
+    )
+
+    if max_pages is not None:
+        print(f"(paginação limitada a {max_pages} páginas; a exportação lê tudo)")
+
+    # Total do rollup: mesmo número de linhas da exportação completa
+    total = client.get("/api/v1/kpis/overview").json()["total_transactions"]
+
+    for format in FORMATS:
+        for gzip in (False, True):
+            size, seconds = run_export(client, format, gzip)
+            rate = total / seconds
+            label = f"{format}{' + gzip' if gzip else ''}"
+
+            print(
+                f"{label:>18} | {total:>9} | {size / 2**20:>8.1f} | "
+                f"{seconds:>9.2f} | {rate:>10,.0f} | {rate / paging_rate:>5.1f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de exportação vs paginação")
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=None,
+        help="Para a paginação após N páginas (a taxa em linhas/s é comparável)",
+    )
+    args = parser.parse_args()
+
+    run_benchmark(args.max_pages)
+
+
+if __name__ == "__main__":
+    main()
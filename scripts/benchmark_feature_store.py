@@ -0,0 +1,118 @@
+"""
+Benchmark de leitura do dataset: CSV vs feature store colunar.
+
+Cada cenário roda em um processo novo, medindo o tempo de leitura e o
+pico de memória (RSS máximo) do processo:
+- full: todas as colunas, materializadas em um DataFrame
+- projected: apenas Time e Amount
+- chunked: todas as colunas em blocos de 50 mil linhas
+
+O feature store é gerado (scripts/build_feature_store.py) se ainda
+não existir.
+
+Execução:
+    python scripts/benchmark_feature_store.py
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT / "backend"))
+sys.path.append(str(PROJECT_ROOT / "scripts"))
+# ==========================================================
+
+from app.ml.feature_store import FeatureStore
+from build_feature_store import CSV_FILE_PATH, FEATURE_STORE_PATH, build_feature_store
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+CHUNK_SIZE = 50_000
+
+# Cada cenário soma todas as colunas lidas para forçar a leitura
+# das páginas do store (que é preguiçosa)
+SCENARIOS = {
+    "csv full": (
+        "df = pd.read_csv(CSV)\n"
+        "df.sum()"
+    ),
+    "store full": (
+        "df = FeatureStore.open(STORE).frame()\n"
+        "df.sum()"
+    ),
+    "csv projected": (
+        "df = pd.read_csv(CSV, usecols=['Time', 'Amount'])\n"
+        "df.sum()"
+    ),
+    "store projected": (
+        "df = FeatureStore.open(STORE).frame(['time', 'amount'])\n"
+        "df.sum()"
+    ),
+    "csv chunked": (
+        f"for df in pd.read_csv(CSV, chunksize={CHUNK_SIZE}):\n"
+        "    df.sum()"
+    ),
+    "store chunked": (
+        f"for df in FeatureStore.open(STORE).iter_chunks({CHUNK_SIZE}):\n"
+        "    df.sum()"
+    ),
+}
+
+RUNNER = """
+import json, resource, sys, time
+sys.path.append({backend!r})
+import pandas as pd
+from app.ml.feature_store import FeatureStore
+CSV = {csv!r}
+STORE = {store!r}
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "rss_mb": peak / 1024, "delta_mb": (peak - baseline) / 1024}}))
+"""
+# ==========================================================
+
+
+def run_scenario(code: str) -> dict:
+    script = RUNNER.format(
+        backend=str(PROJECT_ROOT / "backend"),
+        csv=str(CSV_FILE_PATH),
+        store=str(FEATURE_STORE_PATH),
+        code=code,
+    )
+    output = subprocess.check_output([sys.executable, "-c", script])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def run_benchmark() -> None:
+    if not FeatureStore.exists(FEATURE_STORE_PATH):
+        build_feature_store()
+
+    print(f"{'cenário':>16} | {'tempo (s)':>9} | {'RSS pico (MB)':>13} | {'Δ RSS (MB)':>10}")
+
+    for name, code in SCENARIOS.items():
+        result = run_scenario(code)
+        print(
+            f"{name:>16} | {result['seconds']:>9.3f} | "
+            f"{result['rss_mb']:>13.1f} | {result['delta_mb']:>10.1f}"
+        )
+
+
+def main() -> None:
+    run_benchmark()
+
+
+if __name__ == "__main__":
+    main()
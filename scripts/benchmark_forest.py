@@ -0,0 +1,143 @@
+"""
+Benchmark da floresta compilada (CompiledForest) contra o
+predict_proba do scikit-learn.
+
+Este script:
+- Monta a matriz de features igual ao process_dataframe
+  (usa data/raw/creditcard.csv se existir, senão dados sintéticos)
+- Verifica a paridade das probabilidades e das predições
+- Mede latência e throughput nos tamanhos de lote 1, 64 e 10k
+
+Execução:
+    python scripts/benchmark_forest.py
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import warnings
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+
+from app.ml.compiled_forest import CompiledForest
+from app.services.deteccao import detector, FRAUD_THRESHOLD
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+CSV_FILE_PATH = PROJECT_ROOT / "data" / "raw" / "creditcard.csv"
+PARITY_ROWS = 50_000
+BATCH_SIZES = [1, 64, 10_000]
+MIN_SECONDS = 1.0  # tempo mínimo de medição por cenário
+# ==========================================================
+
+
+def load_dataset(n_rows: int) -> pd.DataFrame:
+    """Lê o dataset real ou gera um sintético com a mesma forma."""
+    if CSV_FILE_PATH.exists():
+        print(f"📥 Usando dataset real: {CSV_FILE_PATH}")
+        df = pd.read_csv(CSV_FILE_PATH, nrows=n_rows)
+        df.columns = [c.lower() for c in df.columns]
+        return df
+
+    print("🧪 Dataset real não encontrado, usando dados sintéticos")
+    rng = np.random.default_rng(42)
+    data = {
+        "time": rng.uniform(0, 172_792, n_rows),
+        "amount": rng.lognormal(3.0, 1.5, n_rows),
+    }
+    for i in range(1, 29):
+        data[f"v{i}"] = rng.normal(0, 1.5, n_rows)
+    return pd.DataFrame(data)
+
+
+def build_features(df: pd.DataFrame) -> np.ndarray:
+    """Mesma matriz que o process_dataframe entrega ao modelo."""
+    features = pd.DataFrame({f"V{i}": df[f"v{i}"] for i in range(1, 29)})
+    features["scaled_amount"] = detector.scaler.transform(df[["amount"]].values)
+    features["scaled_time"] = detector.scaler.transform(df[["time"]].values)
+    return features[detector.model.feature_names_in_].to_numpy()
+
+
+def check_parity(model, engine: CompiledForest, X: np.ndarray) -> None:
+    expected = model.predict_proba(X)
+    actual = engine.predict_proba(X)
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    mismatches = int(np.sum(
+        (expected[:, 1] >= FRAUD_THRESHOLD) != (actual[:, 1] >= FRAUD_THRESHOLD)
+    ))
+
+    print(f"🔎 Paridade em {len(X)} linhas: "
+          f"diferença máxima={max_diff:.3e}, predições divergentes={mismatches}")
+
+    if max_diff > 1e-12 or mismatches:
+        raise AssertionError("Floresta compilada diverge do scikit-learn")
+
+
+def measure(predict, X: np.ndarray) -> float:
+    """Retorna a latência média (s) por chamada."""
+    predict(X)  # aquecimento
+
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        predict(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / calls
+
+
+def run_benchmark() -> None:
+    if detector.model is None or detector.scaler is None:
+        raise RuntimeError("Modelo ou scaler não carregados")
+
+    model = detector.model
+    engine = detector.engine or CompiledForest.from_sklearn(model)
+
+    df = load_dataset(max(PARITY_ROWS, max(BATCH_SIZES)))
+    X = build_features(df)
+
+    check_parity(model, engine, X[:PARITY_ROWS])
+
+    print()
+    print(f"{'lote':>8} | {'sklearn (ms)':>12} | {'compilada (ms)':>14} | "
+          f"{'sklearn (linhas/s)':>18} | {'compilada (linhas/s)':>20} | {'ganho':>6}")
+
+    for batch_size in BATCH_SIZES:
+        batch = X[:batch_size]
+
+        sklearn_latency = measure(model.predict_proba, batch)
+        engine_latency = measure(engine.predict_proba, batch)
+
+        print(
+            f"{batch_size:>8} | {sklearn_latency * 1e3:>12.3f} | "
+            f"{engine_latency * 1e3:>14.3f} | "
+            f"{batch_size / sklearn_latency:>18,.0f} | "
+            f"{batch_size / engine_latency:>20,.0f} | "
+            f"{sklearn_latency / engine_latency:>5.1f}x"
+        )
+
+
+def main() -> None:
+    # Matriz sem nomes de colunas: a ordem já segue feature_names_in_
+    warnings.filterwarnings("ignore", category=UserWarning)
+    run_benchmark()
+
+
+if __name__ == "__main__":
+    main()
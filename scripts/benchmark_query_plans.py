@@ -0,0 +1,279 @@
+"""
+Benchmark de planos de consulta do GET /transactions (PostgreSQL).
+
+Este script:
+- Cria o schema descartável bench_query_plans no banco de
+  DATABASE_URL (nada do schema public é tocado)
+- Grava N transações sintéticas com COPY e roda ANALYZE
+- Para cada combinação de filtros do list_with_filters, roda
+  EXPLAIN (ANALYZE, FORMAT JSON) na página (ORDER BY created_at DESC,
+  id DESC LIMIT) e no COUNT(*)
+- Mede tudo duas vezes: sem os índices de Transaction.__table_args__
+  e com eles
+- Reporta o tempo de execução e os nós de acesso de cada plano
+  (Seq Scan, Index Scan <índice>, ...)
+
+Execução:
+    python scripts/benchmark_query_plans.py [--rows N] [--keep]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT / "backend"))
+sys.path.append(str(PROJECT_ROOT / "scripts"))
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.core.database import create_db_and_tables
+from app.models.transaction import RiskLevel, Transaction
+from app.repositories.transactions_repository import TransactionsRepository
+from seed_data import COPY_COLUMNS, copy_chunk
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+SCHEMA = "bench_query_plans"
+ROWS = 1_000_000
+CHUNK_SIZE = 100_000
+PAGE_SIZE = 50
+DAYS = 180  # created_at distribuído nos últimos DAYS dias
+FRAUD_RATE = 0.01
+
+NOW = datetime.utcnow()
+
+# Índices avaliados (os demais, de index=True, existem nos dois cenários)
+BENCH_INDEXES = [
+    index for index in Transaction.__table__.indexes
+    if index.name in {
+        "ix_transactions_created_at_id",
+        "ix_transactions_anomalies_created_at_id",
+        "ix_transactions_risk_level_created_at_id",
+        "ix_transactions_risk_score",
+        "ix_transactions_amount",
+    }
+]
+
+# Valor de cada filtro quando ativo; cada combinação liga um subconjunto
+FILTERS = {
+    "fraude": {"is_fraud": True},
+    "risco": {"risk_level": RiskLevel.HIGH},
+    "score": {"min_risk_score": 0.7, "max_risk_score": 1.0},
+    "valor": {"min_amount": 100.0, "max_amount": 500.0},
+    "período": {
+        "created_from": NOW - timedelta(days=7),
+        "created_to": NOW,
+    },
+}
+# ==========================================================
+
+
+def synthetic_chunks(rows: int, seed: int = 42) -> Iterator[pd.DataFrame]:
+    """Transações sintéticas nas colunas (e na ordem) do COPY do seed."""
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, rows, CHUNK_SIZE):
+        n = min(CHUNK_SIZE, rows - start)
+
+        fraud = rng.random(n) < FRAUD_RATE
+        risk_score = np.where(fraud, rng.uniform(0.5, 1.0, n), rng.beta(1, 20, n))
+
+        df = pd.DataFrame({
+            "time": rng.uniform(0, 172_792, n),
+            "amount": rng.lognormal(3.5, 1.5, n).round(2),
+            **{f"v{i}": rng.standard_normal(n) for i in range(1, 29)},
+            "prediction": np.where(fraud, -1, 1),
+            "risk_score": risk_score,
+            "risk_level": pd.cut(
+                risk_score,
+                bins=[-np.inf, 0.3, 0.7, np.inf],
+                labels=[level.value for level in RiskLevel],
+            ).astype(str),
+            "model_version": "v1",
+            "created_at": NOW - pd.to_timedelta(rng.uniform(0, DAYS, n), unit="D"),
+        })
+
+        yield df[COPY_COLUMNS]
+
+
+def prepare_schema(engine, rows: int) -> None:
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        connection.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+
+    create_db_and_tables(engine)
+
+    print(f"📥 Gravando {rows} transações sintéticas em {SCHEMA}...")
+    for df in synthetic_chunks(rows):
+        with engine.begin() as connection:
+            copy_chunk(connection, df)
+
+
+def set_indexes(engine, enabled: bool) -> None:
+    with engine.begin() as connection:
+        for index in BENCH_INDEXES:
+            index.drop(connection, checkfirst=True)
+            if enabled:
+                index.create(connection)
+
+        connection.exec_driver_sql(f"ANALYZE {Transaction.__tablename__}")
+
+
+# ==========================================================
+# EXPLAIN
+# ==========================================================
+
+def combinations() -> Iterator[tuple]:
+    names = list(FILTERS)
+
+    for size in range(len(names) + 1):
+        for combo in itertools.combinations(names, size):
+            filters: Dict = {}
+            for name in combo:
+                filters.update(FILTERS[name])
+            yield " + ".join(combo) or "(nenhum)", filters
+
+
+def explain(engine, statement) -> Dict:
+    sql = statement.compile(
+        dialect=engine.dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"
+        ).scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return {
+        "ms": plan[0]["Execution Time"],
+        "access": sorted(set(access_nodes(plan[0]["Plan"]))),
+    }
+
+
+def access_nodes(node: Dict) -> List[str]:
+    """Nós que leem a tabela: Seq Scan, Index Scan <índice>, ..."""
+    found = []
+
+    if node["Node Type"].endswith("Scan") and node.get("Relation Name", node.get("Index Name")):
+        index_name = node.get("Index Name")
+        found.append(
+            f"{node['Node Type']} {index_name}" if index_name else node["Node Type"]
+        )
+
+    for child in node.get("Plans", []):
+        found.extend(access_nodes(child))
+
+    return found
+
+
+def run_queries(engine) -> Dict:
+    results = {}
+
+    for label, filters in combinations():
+        statement = TransactionsRepository.filter_statement(**filters)
+
+        results[label] = {
+            "página": explain(
+                engine, TransactionsRepository.page_statement(statement, PAGE_SIZE)
+            ),
+            "count": explain(
+                engine, TransactionsRepository.count_statement(statement)
+            ),
+        }
+
+    return results
+
+
+# ==========================================================
+# BENCHMARK
+# ==========================================================
+
+def run_benchmark(rows: int, keep: bool) -> None:
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        raise SystemExit("❌ EXPLAIN ANALYZE requer PostgreSQL (DATABASE_URL)")
+
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"options": f"-csearch_path={SCHEMA}"},
+    )
+
+    try:
+        prepare_schema(engine, rows)
+
+        print("🔍 Sem índices...")
+        set_indexes(engine, enabled=False)
+        before = run_queries(engine)
+
+        print("🔍 Com índices...")
+        set_indexes(engine, enabled=True)
+        after = run_queries(engine)
+    finally:
+        if not keep:
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        engine.dispose()
+
+    print(
+        f"\n{'filtros':>40} | {'consulta':>8} | {'sem (ms)':>9} | "
+        f"{'com (ms)':>9} | acesso (com índices)"
+    )
+
+    for label in before:
+        for query in ("página", "count"):
+            old, new = before[label][query], after[label][query]
+            print(
+                f"{label:>40} | {query:>8} | {old['ms']:>9.2f} | "
+                f"{new['ms']:>9.2f} | {', '.join(new['access'])}"
+            )
+
+    seq_scans = [
+        f"{label} ({query})"
+        for label, queries in after.items()
+        for query, result in queries.items()
+        if "Seq Scan" in result["access"]
+    ]
+    if seq_scans:
+        print(f"\n⚠️ Seq Scan com índices em: {', '.join(seq_scans)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de planos do list_with_filters")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=ROWS,
+        help="Transações sintéticas gravadas antes das medições",
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help=f"Mantém o schema {SCHEMA} no final (para inspeção manual)",
+    )
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark da serialização das listagens (/transactions e /anomalies).
+
+Compara, sem banco e sem HTTP, o custo de transformar uma página de
+linhas em bytes JSON:
+- pydantic + json (ORM): caminho antigo. Entidades do ORM validadas
+  por PaginatedTransactionsResponse / TransactionRead (from_attributes)
+  e codificadas com json.dumps, como o FastAPI faz com response_model
+- jsonable + json (ORM): caminho antigo do /anomalies, sem
+  response_model (jsonable_encoder em cada entidade)
+- pydantic + json (dicts): linhas já projetadas em dicts, ainda
+  revalidadas pelo response_model (FAST_JSON_RESPONSES=false)
+- orjson (dicts): caminho rápido (FAST_JSON_RESPONSES=true)
+
+Cada cenário é medido com o resumo padrão e com fields=all. Os
+caminhos com ORM sempre serializam o vetor completo, como antes do
+resumo existir.
+
+Execução:
+    python scripts/benchmark_serialization.py
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+import numpy as np
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import ORJSON_OPTIONS
+from app.models.transaction import RiskLevel, Transaction
+from app.schemas.transaction import (
+    SUMMARY_FIELDS,
+    TRANSACTION_FIELDS,
+    PaginatedTransactionsResponse,
+    TransactionRead,
+)
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+PAGE_SIZES = [10, 50, 100, 500]
+MIN_SECONDS = 0.5  # tempo mínimo de medição por cenário
+# ==========================================================
+
+
+class LegacyPaginatedResponse(PaginatedTransactionsResponse):
+    """response_model do /transactions antes do resumo e do fields=."""
+    items: List[TransactionRead]
+
+
+def synthetic_transactions(n: int, seed: int = 42) -> List[Transaction]:
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+
+    return [
+        Transaction(
+            id=index + 1,
+            time=float(rng.uniform(0, 172_792)),
+            amount=float(rng.lognormal(3.5, 1.5)),
+            **{f"v{i}": float(rng.standard_normal()) for i in range(1, 29)},
+            prediction=-1 if rng.random() < 0.01 else 1,
+            risk_score=float(rng.random()),
+            risk_level=RiskLevel.LOW,
+            model_version="v1",
+            created_at=now - timedelta(seconds=index),
+        )
+        for index in range(n)
+    ]
+
+
+def project(transactions: List[Transaction], fields: List[str]) -> List[Dict]:
+    """Equivalente aos dicts devolvidos pelo SELECT só das colunas."""
+    return [
+        {name: getattr(transaction, name) for name in fields}
+        for transaction in transactions
+    ]
+
+
+def page(items) -> Dict:
+    return {
+        "total": 1_000_000,
+        "total_estimated": False,
+        "limit": len(items),
+        "offset": 0,
+        "next_cursor": "cursor",
+        "items": items,
+    }
+
+
+def anomalies_page(items) -> Dict:
+    return {
+        "total_transactions": 1_000_000,
+        "total_anomalies": 1_700,
+        "percentage": "0.17%",
+        "next_cursor": "cursor",
+        "data": items,
+    }
+
+
+# ==========================================================
+# CAMINHOS DE SERIALIZAÇÃO
+# ==========================================================
+
+def render_json(content) -> bytes:
+    """JSONResponse.render do FastAPI."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def pydantic_orm(transactions: List[Transaction]) -> bytes:
+    validated = LegacyPaginatedResponse.model_validate(page(transactions))
+    return render_json(validated.model_dump(mode="json"))
+
+
+def jsonable_orm(transactions: List[Transaction]) -> bytes:
+    return render_json(jsonable_encoder(anomalies_page(transactions)))
+
+
+def pydantic_dicts(items: List[Dict]) -> bytes:
+    validated = PaginatedTransactionsResponse.model_validate(page(items))
+    return render_json(validated.model_dump(mode="json"))
+
+
+def orjson_dicts(items: List[Dict], wrap=page) -> bytes:
+    return orjson.dumps(wrap(items), default=jsonable_encoder, option=ORJSON_OPTIONS)
+
+
+def measure(encode: Callable[[], bytes]) -> float:
+    """Retorna a latência média (s) por página."""
+    encode()  # aquecimento
+
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        encode()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / calls
+
+
+def run_benchmark() -> None:
+    transactions = synthetic_transactions(max(PAGE_SIZES))
+
+    print(f"{'endpoint':>13} | {'linhas':>6} | {'campos':>7} | {'caminho':>24} | "
+          f"{'µs/página':>10} | {'KB':>7} | {'ganho':>6}")
+
+    for size in PAGE_SIZES:
+        rows = transactions[:size]
+
+        for label, fields in (("resumo", SUMMARY_FIELDS), ("all", TRANSACTION_FIELDS)):
+            items = project(rows, fields)
+
+            scenarios = {
+                "/transactions": [
+                    ("pydantic + json (ORM)", lambda: pydantic_orm(rows)),
+                    ("pydantic + json (dicts)", lambda: pydantic_dicts(items)),
+                    ("orjson (dicts)", lambda: orjson_dicts(items)),
+                ],
+                "/anomalies": [
+                    ("jsonable + json (ORM)", lambda: jsonable_orm(rows)),
+                    ("orjson (dicts)", lambda: orjson_dicts(items, anomalies_page)),
+                ],
+            }
+
+            for endpoint, paths in scenarios.items():
+                baseline = None
+
+                for name, encode in paths:
+                    latency = measure(encode)
+                    baseline = baseline or latency
+
+                    print(
+                        f"{endpoint:>13} | {size:>6} | {label:>7} | {name:>24} | "
+                        f"{latency * 1e6:>10.1f} | {len(encode()) / 1024:>7.1f} | "
+                        f"{baseline / latency:>5.1f}x"
+                    )
+
+
+def main() -> None:
+    run_benchmark()
+
+
+if __name__ == "__main__":
+    main()
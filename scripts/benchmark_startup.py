@@ -0,0 +1,152 @@
+"""
+Benchmark de cold start da API.
+
+Para cada modo de carga do modelo (eager e background) este script mede:
+- Tempo de `import app.main` em um processo novo
+- Tempo até o servidor responder (GET /health)
+- Tempo até o modelo ficar pronto (GET /health/ready == 200)
+- Latência da primeira predição (POST /api/v1/predict)
+
+A primeira predição grava no banco, então o PostgreSQL configurado
+no .env precisa estar acessível para que ela retorne 200.
+
+Execução:
+    python scripts/benchmark_startup.py
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = PROJECT_ROOT / "backend"
+# ==========================================================
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+MODES = {"eager": "false", "background": "true"}
+TIMEOUT_SECONDS = 60
+POLL_INTERVAL = 0.01
+
+SAMPLE_FEATURES = {"time": 45000, "amount": 3200.5}
+SAMPLE_FEATURES.update({f"v{i}": 0.0 for i in range(1, 29)})
+# ==========================================================
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(url: str, payload: dict | None = None) -> int:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(
+        url,
+        data=data,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=TIMEOUT_SECONDS) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def wait_for(url: str, start: float, expected: int | None = None) -> float:
+    """Espera o endpoint responder (com o status esperado, se dado)."""
+    while time.perf_counter() - start < TIMEOUT_SECONDS:
+        try:
+            status = request(url)
+            if expected is None or status == expected:
+                return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(POLL_INTERVAL)
+
+    raise TimeoutError(f"Sem resposta de {url}")
+
+
+def measure_import(env: dict) -> float:
+    code = (
+        "import time; start = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        stderr=subprocess.DEVNULL,
+    )
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_server(env: dict) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        listening = wait_for(f"{base_url}/health", start)
+        ready = wait_for(f"{base_url}/health/ready", start, expected=200)
+
+        predict_start = time.perf_counter()
+        status = request(f"{base_url}/api/v1/predict", {"features": SAMPLE_FEATURES})
+        first_predict = time.perf_counter() - predict_start
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "listening": listening,
+        "ready": ready,
+        "first_predict": first_predict,
+        "predict_status": status,
+    }
+
+
+def run_benchmark() -> None:
+    print(f"{'modo':>10} | {'import (s)':>10} | {'escutando (s)':>13} | "
+          f"{'pronto (s)':>10} | {'1ª predição (ms)':>16} | status")
+
+    for mode, flag in MODES.items():
+        env = {**os.environ, "MODEL_BACKGROUND_LOADING": flag}
+
+        import_time = measure_import(env)
+        server = measure_server(env)
+
+        print(
+            f"{mode:>10} | {import_time:>10.3f} | {server['listening']:>13.3f} | "
+            f"{server['ready']:>10.3f} | {server['first_predict'] * 1e3:>16.1f} | "
+            f"{server['predict_status']}"
+        )
+
+
+def main() -> None:
+    run_benchmark()
+
+
+if __name__ == "__main__":
+    main()
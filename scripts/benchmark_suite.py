@@ -0,0 +1,624 @@
+"""
+Suíte de benchmarks do scoring, dos repositories e da API, com
+baselines em JSON e detecção de regressões.
+
+Este script:
+- scoring: mede FraudDetector.process_dataframe em lotes de 1 a 1M
+  linhas, predict_batch (lista de dicts, como no /predict/batch) até
+  10k linhas e predict_transaction, com features sintéticas fixas
+  (seed 42)
+- db: mede os repositories síncronos (página de transações, anomalias,
+  KPIs) direto no banco, sem HTTP
+- api: mede /predict, /predict/batch, /transactions, /anomalies e
+  /kpis/* com o TestClient do FastAPI (em processo, sem servidor e sem
+  o startup: sem micro-batching nem write-behind, e o /predict grava
+  na hora). O cache de KPIs fica desligado: toda chamada vai ao banco
+
+O banco é local e descartável, semeado com --rows transações
+sintéticas e reaproveitado enquanto o volume não mudar:
+- padrão: SQLite em data/benchmarks/bench_<rows>.db (requer aiosqlite
+  para as rotas async)
+- --postgres: schema bench_suite no banco de DATABASE_URL (nada do
+  schema public é tocado; remova com DROP SCHEMA bench_suite CASCADE)
+As linhas gravadas pelo /predict são apagadas no final.
+
+Cada cenário roda até --min-seconds (e ao menos MIN_CALLS vezes); a
+métrica comparada é a mediana por chamada. O resultado vai para
+--output em JSON; com --baseline, ou com o comando compare, cenários
+mais lentos que a baseline além de --threshold são marcados como
+regressão e o script sai com código 1 (para uso em CI).
+
+Execução:
+    python scripts/benchmark_suite.py run [--only scoring,db,api]
+        [--sizes 1,100,10000,1000000] [--rows N] [--postgres]
+        [--min-seconds S] [--output arquivo.json]
+        [--baseline arquivo.json] [--threshold 0.10]
+    python scripts/benchmark_suite.py compare BASELINE ATUAL [--threshold 0.10]
+
+Exemplo:
+    python scripts/benchmark_suite.py run --output data/benchmarks/baseline.json
+    (alterações no código)
+    python scripts/benchmark_suite.py run --baseline data/benchmarks/baseline.json
+
+Baselines só são comparáveis na mesma máquina e com os mesmos
+parâmetros (o ambiente fica gravado no JSON e diferenças são
+avisadas). Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+sys.path.append(str(PROJECT_ROOT / "scripts"))
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+import sklearn
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import kpi_cache
+from app.core.config import settings
+from app.core.database import (
+    create_db_and_tables,
+    create_pooled_engine,
+    get_async_read_session,
+    get_async_session,
+)
+from app.main import app
+from app.models.transaction import RiskLevel, Transaction
+from app.repositories.kpi_repository import KPIRepository
+from app.repositories.transactions_repository import TransactionsRepository
+from app.services.deteccao import REQUIRED_FEATURES, detector
+from benchmark_query_plans import synthetic_chunks
+from seed_data import copy_chunk
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+BENCH_DIR = PROJECT_ROOT / "data" / "benchmarks"
+DEFAULT_OUTPUT = BENCH_DIR / "latest.json"
+SCHEMA = "bench_suite"
+
+GROUPS = ["scoring", "db", "api"]
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+DICT_BATCH_MAX = 10_000  # predict_batch monta um dict por linha
+API_BATCH_SIZE = 100     # itens por chamada ao /predict/batch
+PAGE_SIZE = 50
+
+ROWS = 100_000           # transações semeadas no banco
+MIN_SECONDS = 1.0        # tempo mínimo de medição por cenário
+MIN_CALLS = 3
+THRESHOLD = 0.10         # +10% na mediana = regressão
+
+# Campos do ambiente que tornam duas execuções incomparáveis
+ENVIRONMENT_KEYS = ["machine", "processor", "cpu_count", "python", "database", "rows"]
+# ==========================================================
+
+
+# ==========================================================
+# DADOS SINTÉTICOS
+# ==========================================================
+
+def synthetic_features(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Features com a forma do creditcard.csv (como no benchmark_forest)."""
+    rng = np.random.default_rng(seed)
+    data = {
+        "time": rng.uniform(0, 172_792, n_rows),
+        "amount": rng.lognormal(3.0, 1.5, n_rows),
+    }
+    for i in range(1, 29):
+        data[f"v{i}"] = rng.normal(0, 1.5, n_rows)
+    return pd.DataFrame(data)
+
+
+def feature_dicts(df: pd.DataFrame) -> List[Dict[str, float]]:
+    return df[REQUIRED_FEATURES].to_dict("records")
+
+
+# ==========================================================
+# MEDIÇÃO
+# ==========================================================
+
+def measure(call: Callable[[], object], min_seconds: float) -> List[float]:
+    """Tempos (s) de cada chamada, depois de uma chamada de aquecimento."""
+    # Lixo dos cenários anteriores (ex.: o lote de 1M) não entra na medição
+    gc.collect()
+    call()
+
+    times: List[float] = []
+    start = time.perf_counter()
+
+    while len(times) < MIN_CALLS or time.perf_counter() - start < min_seconds:
+        call_start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - call_start)
+
+    return times
+
+
+def summarize(times: List[float], rows: Optional[int] = None) -> Dict:
+    values = np.array(times) * 1000
+    median = float(np.median(values))
+
+    stats = {
+        "calls": len(times),
+        "median_ms": round(median, 4),
+        "mean_ms": round(float(values.mean()), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "min_ms": round(float(values.min()), 4),
+    }
+    if rows:
+        stats["rows_per_second"] = round(rows / (median / 1000), 1)
+    return stats
+
+
+def run_case(results: Dict, name: str, call: Callable[[], object],
+             min_seconds: float, rows: Optional[int] = None) -> None:
+    stats = summarize(measure(call, min_seconds), rows)
+    results[name] = stats
+
+    throughput = (
+        f" | {stats['rows_per_second']:>12,.0f} linhas/s"
+        if "rows_per_second" in stats else ""
+    )
+    print(
+        f"   {name:<45} | mediana {stats['median_ms']:>10.3f} ms | "
+        f"p95 {stats['p95_ms']:>10.3f} ms{throughput}"
+    )
+
+
+# ==========================================================
+# SCORING
+# ==========================================================
+
+def bench_scoring(results: Dict, sizes: List[int], min_seconds: float) -> None:
+    print("🧮 Scoring (FraudDetector)")
+    df = synthetic_features(max(sizes))
+
+    run_case(
+        results,
+        "scoring.predict_transaction",
+        lambda row=feature_dicts(df.iloc[:1])[0]: detector.predict_transaction(row),
+        min_seconds,
+        rows=1,
+    )
+
+    for size in sizes:
+        batch = df.iloc[:size]
+
+        # Cópia rasa: process_dataframe acrescenta colunas ao frame
+        run_case(
+            results,
+            f"scoring.process_dataframe[{size}]",
+            lambda batch=batch: detector.process_dataframe(batch.copy(deep=False)),
+            min_seconds,
+            rows=size,
+        )
+
+    for size in sizes:
+        if size > DICT_BATCH_MAX:
+            continue
+
+        rows = feature_dicts(df.iloc[:size])
+        run_case(
+            results,
+            f"scoring.predict_batch[{size}]",
+            lambda rows=rows: detector.predict_batch(rows),
+            min_seconds,
+            rows=size,
+        )
+
+
+# ==========================================================
+# BANCO
+# ==========================================================
+
+class BenchDatabase:
+    """
+    Engines (síncrono e async) do banco de benchmark, semeado com
+    rows transações sintéticas.
+    """
+
+    def __init__(self, rows: int, postgres: bool) -> None:
+        self.rows = rows
+        self.postgres = postgres
+
+        if postgres:
+            url = settings.DATABASE_URL
+            connect_args = {"options": f"-csearch_path={SCHEMA}"}
+            self.label = f"postgresql (schema {SCHEMA})"
+        else:
+            if importlib.util.find_spec("aiosqlite") is None:
+                raise SystemExit(
+                    "❌ As rotas async no SQLite requerem aiosqlite "
+                    "(pip install aiosqlite) ou use --postgres"
+                )
+            BENCH_DIR.mkdir(parents=True, exist_ok=True)
+            path = BENCH_DIR / f"bench_{rows}.db"
+            url = f"sqlite:///{path}"
+            connect_args = {"check_same_thread": False}
+            self.label = f"sqlite ({path.name})"
+
+        self.engine = create_pooled_engine(
+            url, "bench", 5, 5, connect_args=connect_args
+        )
+        self.async_engine = create_pooled_engine(
+            url, "bench_async", 5, 5, is_async=True, connect_args=connect_args
+        )
+        self.seeded_max_id = 0
+
+    def prepare(self) -> None:
+        """Semeia o banco se ele não tiver exatamente rows transações."""
+        if self.postgres:
+            with self.engine.begin() as connection:
+                connection.exec_driver_sql(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+
+        create_db_and_tables(self.engine)
+
+        with Session(self.engine) as session:
+            existing = session.exec(select(func.count(Transaction.id))).one()
+
+        if existing != self.rows:
+            self._seed()
+
+        with Session(self.engine) as session:
+            self.seeded_max_id = session.exec(select(func.max(Transaction.id))).one() or 0
+
+    def _seed(self) -> None:
+        print(f"📥 Semeando {self.rows:,} transações sintéticas em {self.label}...")
+        start = time.perf_counter()
+
+        with self.engine.begin() as connection:
+            connection.execute(delete(Transaction))
+
+        for df in synthetic_chunks(self.rows):
+            with self.engine.begin() as connection:
+                copy_chunk(connection, df)
+
+        with Session(self.engine) as session:
+            KPIRepository.rebuild_daily(session)
+
+        print(f"   ✅ Banco pronto em {time.perf_counter() - start:.1f}s")
+
+    def cleanup(self) -> None:
+        """Remove as linhas gravadas pelo /predict e refaz o rollup."""
+        with self.engine.begin() as connection:
+            removed = connection.execute(
+                delete(Transaction).where(Transaction.id > self.seeded_max_id)
+            ).rowcount
+
+        if removed:
+            with Session(self.engine) as session:
+                KPIRepository.rebuild_daily(session)
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+
+def bench_db(results: Dict, database: BenchDatabase, min_seconds: float) -> None:
+    print("🗄️ Repositories")
+
+    with Session(database.engine) as session:
+        repo = TransactionsRepository(session)
+        ids = itertools.cycle(range(1, database.seeded_max_id + 1, 997))
+
+        cases = {
+            "db.transactions.get": lambda: repo.get(next(ids)),
+            "db.transactions.list_with_filters": lambda: repo.list_with_filters(
+                limit=PAGE_SIZE, offset=0
+            ),
+            "db.transactions.list_with_filters[risk_level]": lambda: repo.list_with_filters(
+                limit=PAGE_SIZE, offset=0, risk_level=RiskLevel.HIGH
+            ),
+            "db.transactions.list_anomalies": lambda: repo.list_anomalies(limit=PAGE_SIZE),
+            "db.kpi.overview": lambda: KPIRepository.overview(session),
+            "db.kpi.risk_distribution": lambda: KPIRepository.risk_distribution(session),
+            "db.kpi.daily_transactions": lambda: KPIRepository.daily_transactions(session, 30),
+        }
+
+        for name, call in cases.items():
+            run_case(results, name, call, min_seconds)
+            # Entidades carregadas não se acumulam na identity map
+            session.expunge_all()
+
+
+# ==========================================================
+# API
+# ==========================================================
+
+def bench_api(results: Dict, database: BenchDatabase, min_seconds: float) -> None:
+    print("🌐 API (TestClient)")
+
+    async def bench_session():
+        async with AsyncSession(database.async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = bench_session
+    app.dependency_overrides[get_async_read_session] = bench_session
+
+    # Sem o cache de KPIs: mede o banco a cada chamada
+    kpi_cache.ttl = 0
+
+    features = feature_dicts(synthetic_features(API_BATCH_SIZE, seed=7))
+    single = {"features": features[0]}
+    batch = {"transactions": [{"features": row} for row in features]}
+    ids = itertools.cycle(range(1, database.seeded_max_id + 1, 997))
+
+    # Sem o context manager: o startup (micro-batching, write-behind,
+    # conexão com o banco padrão) não roda
+    client = TestClient(app)
+
+    def get(path: str) -> Callable[[], object]:
+        return lambda: client.get(path).raise_for_status()
+
+    cases = {
+        "api.transactions": get(f"/api/v1/transactions?limit={PAGE_SIZE}"),
+        "api.transactions[risk_level]": get(
+            f"/api/v1/transactions?limit={PAGE_SIZE}&risk_level={RiskLevel.HIGH.value}"
+        ),
+        "api.transactions[id]": lambda: client.get(
+            f"/api/v1/transactions/{next(ids)}"
+        ).raise_for_status(),
+        "api.anomalies": get(f"/api/v1/anomalies?limit={PAGE_SIZE}"),
+        "api.kpis.overview": get("/api/v1/kpis/overview"),
+        "api.kpis.risk_distribution": get("/api/v1/kpis/risk-distribution"),
+        "api.kpis.daily_transactions": get("/api/v1/kpis/daily-transactions"),
+        "api.kpis.daily_anomalies": get("/api/v1/kpis/daily-anomalies"),
+        # Escritas por último: as leituras veem só o volume semeado
+        "api.predict": lambda: client.post(
+            "/api/v1/predict", json=single
+        ).raise_for_status(),
+        f"api.predict_batch[{API_BATCH_SIZE}]": lambda: client.post(
+            "/api/v1/predict/batch", json=batch
+        ).raise_for_status(),
+    }
+
+    try:
+        for name, call in cases.items():
+            run_case(results, name, call, min_seconds)
+    finally:
+        app.dependency_overrides.clear()
+        kpi_cache.ttl = settings.KPI_CACHE_TTL_SECONDS
+
+
+# ==========================================================
+# RESULTADOS
+# ==========================================================
+
+def environment(database_label: Optional[str], rows: Optional[int]) -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "system": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__,
+        "model_version": detector.version,
+        "database": database_label,
+        "rows": rows,
+    }
+
+
+def save_results(path: Path, results: Dict, env: Dict, args) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "environment": env,
+        "config": {
+            "groups": args.only,
+            "sizes": args.sizes,
+            "min_seconds": args.min_seconds,
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n💾 Resultados gravados em {path}")
+
+
+def load_results(path: Path) -> Dict:
+    if not path.exists():
+        raise SystemExit(f"❌ Arquivo não encontrado: {path}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Imprime a comparação e devolve os cenários com regressão."""
+    differences = [
+        f"{key}: {baseline['environment'].get(key)} -> {current['environment'].get(key)}"
+        for key in ENVIRONMENT_KEYS
+        if baseline["environment"].get(key) != current["environment"].get(key)
+    ]
+    if differences:
+        print("⚠️ Ambientes diferentes (comparação pouco confiável):")
+        for difference in differences:
+            print(f"   - {difference}")
+
+    print(
+        f"\n{'cenário':<47} | {'base (ms)':>11} | {'atual (ms)':>11} | "
+        f"{'variação':>9} | status"
+    )
+
+    regressions = []
+    names = list(baseline["results"]) + [
+        name for name in current["results"] if name not in baseline["results"]
+    ]
+
+    for name in names:
+        old = baseline["results"].get(name)
+        new = current["results"].get(name)
+
+        if old is None:
+            print(f"{name:<47} | {'':>11} | {new['median_ms']:>11.3f} | {'':>9} | 🆕 novo")
+            continue
+        if new is None:
+            print(f"{name:<47} | {old['median_ms']:>11.3f} | {'':>11} | {'':>9} | ➖ ausente")
+            continue
+
+        change = new["median_ms"] / old["median_ms"] - 1
+
+        if change > threshold:
+            status = "❌ regressão"
+            regressions.append(name)
+        elif change < -threshold:
+            status = "🚀 melhora"
+        else:
+            status = "✅"
+
+        print(
+            f"{name:<47} | {old['median_ms']:>11.3f} | {new['median_ms']:>11.3f} | "
+            f"{change:>+8.1%} | {status}"
+        )
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressão(ões) acima de {threshold:.0%}: "
+              f"{', '.join(regressions)}")
+    else:
+        print(f"\n✅ Nenhuma regressão acima de {threshold:.0%}")
+
+    return regressions
+
+
+# ==========================================================
+# COMANDOS
+# ==========================================================
+
+def run(args) -> None:
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    if not detector.ready:
+        detector.load()
+
+    results: Dict = {}
+    database = None
+
+    if "scoring" in args.only:
+        bench_scoring(results, args.sizes, args.min_seconds)
+
+    if "db" in args.only or "api" in args.only:
+        database = BenchDatabase(args.rows, args.postgres)
+        try:
+            database.prepare()
+
+            if "db" in args.only:
+                bench_db(results, database, args.min_seconds)
+
+            if "api" in args.only:
+                try:
+                    bench_api(results, database, args.min_seconds)
+                finally:
+                    database.cleanup()
+        finally:
+            database.dispose()
+
+    env = environment(
+        database.label if database else None,
+        args.rows if database else None,
+    )
+    save_results(args.output, results, env, args)
+
+    if baseline is not None:
+        current = {"environment": env, "results": results}
+        if compare(baseline, current, args.threshold):
+            sys.exit(1)
+
+
+def compare_files(args) -> None:
+    regressions = compare(
+        load_results(args.baseline),
+        load_results(args.current),
+        args.threshold,
+    )
+    if regressions:
+        sys.exit(1)
+
+
+def parse_list(value: str, cast=str) -> list:
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    # Matrizes sem nomes de colunas no predict_proba do scikit-learn
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks e comparação com baseline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Executa os benchmarks")
+    run_parser.add_argument(
+        "--only",
+        type=parse_list,
+        default=GROUPS,
+        help=f"Grupos a executar, separados por vírgula ({','.join(GROUPS)})",
+    )
+    run_parser.add_argument(
+        "--sizes",
+        type=lambda value: parse_list(value, int),
+        default=BATCH_SIZES,
+        help="Tamanhos de lote do scoring, separados por vírgula",
+    )
+    run_parser.add_argument("--rows", type=int, default=ROWS,
+                            help="Transações semeadas no banco de benchmark")
+    run_parser.add_argument("--postgres", action="store_true",
+                            help=f"Usa o schema {SCHEMA} de DATABASE_URL em vez do SQLite")
+    run_parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS,
+                            help="Tempo mínimo de medição por cenário")
+    run_parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT,
+                            help="Arquivo JSON com os resultados")
+    run_parser.add_argument("--baseline", type=Path,
+                            help="Baseline para comparar ao final")
+    run_parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                            help="Aumento relativo da mediana tratado como regressão")
+
+    compare_parser = commands.add_parser("compare", help="Compara dois resultados")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        unknown = set(args.only) - set(GROUPS)
+        if unknown:
+            parser.error(f"grupos desconhecidos: {', '.join(sorted(unknown))}")
+        run(args)
+    else:
+        compare_files(args)
+
+
+if __name__ == "__main__":
+    main()
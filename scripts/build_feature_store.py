@@ -0,0 +1,88 @@
+"""
+Conversão do dataset bruto para o feature store colunar.
+
+Este script:
+- Lê data/raw/creditcard.csv em blocos (memória constante)
+- Grava um .npy por coluna em data/processed/creditcard
+- Registra no metadata.json o número de linhas, os dtypes e o
+  SHA-256 do CSV (usado pelo seed para detectar store desatualizado)
+
+V1..V28 são gravadas em float32 por padrão (os scores não mudam: a
+árvore já converte a entrada para float32). Time, Amount e Class
+mantêm o valor exato. Use --dtype float64 para persistir V1..V28
+com os mesmos valores do CSV: o seed (scripts/seed_data.py) só lê
+um store float64 e volta para o CSV com o float32.
+
+Execução:
+    python scripts/build_feature_store.py [--dtype float32|float64]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+from app.ml.feature_store import FeatureStore, file_hash
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+CSV_FILE_PATH = PROJECT_ROOT / "data" / "raw" / "creditcard.csv"
+FEATURE_STORE_PATH = PROJECT_ROOT / "data" / "processed" / "creditcard"
+CHUNK_SIZE = 50_000
+# ==========================================================
+
+
+def build_feature_store(dtype: str = "float32") -> FeatureStore:
+    if not CSV_FILE_PATH.exists():
+        raise FileNotFoundError(
+            f"Arquivo CSV não encontrado em: {CSV_FILE_PATH}"
+        )
+
+    print(f"📥 Convertendo {CSV_FILE_PATH} ({dtype})...")
+    start = time.perf_counter()
+
+    store = FeatureStore.from_csv(
+        CSV_FILE_PATH,
+        FEATURE_STORE_PATH,
+        chunk_size=CHUNK_SIZE,
+        dtype=dtype,
+        source_hash=file_hash(CSV_FILE_PATH),
+    )
+
+    size = sum(path.stat().st_size for path in FEATURE_STORE_PATH.iterdir())
+    print(
+        f"✅ {len(store)} linhas, {len(store.columns)} colunas "
+        f"({size / 1e6:.1f} MB) em {time.perf_counter() - start:.1f}s: "
+        f"{FEATURE_STORE_PATH}"
+    )
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera o feature store colunar")
+    parser.add_argument(
+        "--dtype",
+        choices=["float32", "float64"],
+        default="float32",
+        help="dtype das features V1..V28",
+    )
+    args = parser.parse_args()
+
+    build_feature_store(args.dtype)
+
+
+if __name__ == "__main__":
+    main()
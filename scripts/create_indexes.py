@@ -0,0 +1,99 @@
+"""
+Criação dos índices de transactions em bancos já existentes (PostgreSQL).
+
+Bancos novos recebem os índices no create_all. Em bancos criados antes
+deles, o startup da API só avisa o que falta: construir um índice em
+uma tabela grande leva minutos e não pode travar o startup de cada
+worker. Este script:
+- Cria com CREATE INDEX CONCURRENTLY (sem bloquear escritas) os índices
+  de INDEX_UPGRADES que não existem
+- Remove e reconstrói os que ficaram INVALID (um CONCURRENTLY
+  interrompido), que o IF NOT EXISTS pularia para sempre
+- Remove os índices de OBSOLETE_INDEXES (ex.: o antigo índice só de
+  risk_level), redundantes depois dos índices compostos
+- Segura um advisory lock: duas execuções simultâneas não disputam o
+  mesmo índice (a segunda termina com erro)
+
+Com transactions particionada o PostgreSQL não aceita CONCURRENTLY na
+tabela pai: o build bloqueia as escritas até terminar, então rode em
+janela de manutenção.
+
+Execução:
+    python scripts/create_indexes.py [--check]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+from app.core.database import (
+    create_db_and_tables,
+    create_indexes,
+    engine,
+    index_states,
+    obsolete_indexes,
+)
+
+
+def check() -> int:
+    with engine.connect() as connection:
+        states = index_states(connection)
+
+        obsolete = obsolete_indexes(connection)
+
+    for name, state in states.items():
+        print(f"{'✅' if state == 'valid' else '⚠️'} {name}: {state}")
+    for name in obsolete:
+        print(f"⚠️ {name}: redundante")
+
+    return 0 if all(state == "valid" for state in states.values()) and not obsolete else 1
+
+
+def run() -> None:
+    # Cria transactions se ainda não existir (idempotente)
+    create_db_and_tables()
+
+    start = time.perf_counter()
+    try:
+        actions = create_indexes(log=print)
+    except RuntimeError as exc:
+        raise SystemExit(f"❌ {exc}")
+
+    for name, action in actions.items():
+        print(f"  {name}: {action}")
+    print(f"✅ Índices verificados em {time.perf_counter() - start:.1f}s.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cria os índices de transactions")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Só lista o estado dos índices (sai com 1 se algum faltar ou sobrar)",
+    )
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("❌ Requer PostgreSQL")
+
+    if args.check:
+        raise SystemExit(check())
+
+    run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Driver de carga: tráfego sintético na taxa alvo contra uma API local.
+
+Diferente do load_test_async.py (N clientes em loop, vazão máxima), a
+carga aqui segue um cronograma de chegadas com taxa média --rps
+(constante, Poisson ou em rajadas, ver synthetic_transactions.py). Cada
+chegada vai para um endpoint sorteado por --mix:
+- predict: POST /predict com uma transação do TransactionGenerator
+  (V1..V28 do perfil ajustado ou do padrão, --fraud-ratio de fraudes)
+- predict_batch: POST /predict/batch com --batch-size transações
+- transactions, anomalies, kpis: leituras do dashboard (os /kpis/*
+  em rodízio)
+
+No máximo --max-in-flight requisições ficam abertas: acima disso a
+chegada espera no driver (laço fechado, a API não recebe mais que isso).
+A latência é medida do instante agendado até a resposta: a espera no
+driver entra na conta, e a API lenta não "desacelera" o cronograma.
+Ao final reporta, por endpoint e no total: requisições, vazão
+(respostas 2xx/s), p50/p95/p99 e taxa de erros (status >= 400, timeout
+ou falha de conexão). Com --output grava o resumo e a linha do tempo
+por segundo em JSON.
+
+A API e o banco são os locais (uvicorn app.main:app + PostgreSQL do
+.env); o /predict grava as transações geradas no banco.
+
+Execução:
+    python scripts/load_driver.py [--url URL] [--rps 50] [--duration 60]
+        [--pattern constant|poisson|bursty] [--burst-factor 5]
+        [--mix predict=70,transactions=10,anomalies=5,kpis=15]
+        [--fraud-ratio R] [--batch-size N] [--max-in-flight N]
+        [--seed S] [--output arquivo.json]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from synthetic_transactions import (
+    BURST_FACTOR,
+    FRAUD_RATIO,
+    PATTERNS,
+    PROFILE_PATH,
+    TransactionGenerator,
+    TransactionProfile,
+    arrival_offsets,
+)
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+DEFAULT_URL = "http://localhost:8000"
+DEFAULT_RPS = 50.0
+DEFAULT_DURATION_SECONDS = 60.0
+DEFAULT_MIX = "predict=70,transactions=10,anomalies=5,kpis=15"
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_IN_FLIGHT = 256
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+# Atraso (s) no envio a partir do qual o driver avisa que não acompanhou
+LATE_THRESHOLD_SECONDS = 0.05
+
+READ_ENDPOINTS = {
+    "transactions": ["/api/v1/transactions?limit=20"],
+    "anomalies": ["/api/v1/anomalies?limit=20"],
+    "kpis": [
+        "/api/v1/kpis/overview",
+        "/api/v1/kpis/risk-distribution",
+        "/api/v1/kpis/daily-transactions",
+        "/api/v1/kpis/daily-anomalies",
+    ],
+}
+WRITE_ENDPOINTS = {
+    "predict": "/api/v1/predict",
+    "predict_batch": "/api/v1/predict/batch",
+}
+# ==========================================================
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    scheduled: float     # s desde o início
+    started: float
+    finished: float
+    outcome: str         # status HTTP ou nome da exceção
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome.isdigit() and int(self.outcome) < 400
+
+    @property
+    def latency(self) -> float:
+        return self.finished - self.scheduled
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+
+        if name not in READ_ENDPOINTS and name not in WRITE_ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"endpoint desconhecido no mix: {name}")
+        mix[name] = float(weight or 1)
+
+    total = sum(mix.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("o mix precisa de ao menos um peso positivo")
+    return {name: weight / total for name, weight in mix.items()}
+
+
+# ==========================================================
+# CRONOGRAMA
+# ==========================================================
+
+def build_schedule(args) -> List[Tuple[float, str, str, str, Optional[Dict]]]:
+    """(instante, endpoint, método, caminho, corpo) de cada chegada."""
+    offsets = arrival_offsets(
+        args.rps, args.duration, args.pattern, args.seed, args.burst_factor
+    )
+
+    rng = np.random.default_rng(args.seed + 1)
+    names = list(args.mix)
+    endpoints = rng.choice(names, size=len(offsets), p=list(args.mix.values()))
+
+    generator = TransactionGenerator(
+        profile=TransactionProfile.load(args.profile),
+        fraud_ratio=args.fraud_ratio,
+        seed=args.seed + 2,
+    )
+
+    # Features geradas de uma vez; Time acompanha o instante de chegada
+    predict_at = offsets[endpoints == "predict"]
+    single, _ = generator.payloads(len(predict_at), times=predict_at)
+    single = iter(single)
+
+    batch_at = offsets[endpoints == "predict_batch"]
+    batch_rows, _ = generator.payloads(
+        len(batch_at) * args.batch_size,
+        times=np.repeat(batch_at, args.batch_size),
+    )
+    batches = iter(
+        {"transactions": batch_rows[i:i + args.batch_size]}
+        for i in range(0, len(batch_rows), args.batch_size)
+    )
+
+    reads = {name: itertools.cycle(paths) for name, paths in READ_ENDPOINTS.items()}
+
+    schedule = []
+    for offset, endpoint in zip(offsets, endpoints):
+        if endpoint == "predict":
+            schedule.append((offset, endpoint, "POST", WRITE_ENDPOINTS[endpoint], next(single)))
+        elif endpoint == "predict_batch":
+            schedule.append((offset, endpoint, "POST", WRITE_ENDPOINTS[endpoint], next(batches)))
+        else:
+            schedule.append((offset, endpoint, "GET", next(reads[endpoint]), None))
+
+    print(f"🧪 {len(schedule):,} chegadas em {args.duration:.0f}s "
+          f"(padrão {args.pattern}, perfil {generator.profile.source})")
+    return schedule
+
+
+# ==========================================================
+# EXECUÇÃO
+# ==========================================================
+
+async def send(
+    client: httpx.AsyncClient,
+    slots: asyncio.Semaphore,
+    origin: float,
+    item: Tuple,
+    samples: List[Sample],
+) -> None:
+    offset, endpoint, method, path, body = item
+    started = time.perf_counter() - origin
+
+    try:
+        response = await client.request(method, path, json=body)
+        outcome = str(response.status_code)
+    except httpx.HTTPError as exc:
+        outcome = type(exc).__name__
+    finally:
+        slots.release()
+
+    samples.append(Sample(endpoint, offset, started, time.perf_counter() - origin, outcome))
+
+
+async def drive(url: str, schedule: List[Tuple], max_in_flight: int) -> Tuple[List[Sample], float]:
+    limits = httpx.Limits(
+        max_connections=max_in_flight,
+        max_keepalive_connections=max_in_flight
+    )
+    samples: List[Sample] = []
+    slots = asyncio.Semaphore(max_in_flight)
+
+    async with httpx.AsyncClient(
+        base_url=url,
+        limits=limits,
+        timeout=REQUEST_TIMEOUT_SECONDS
+    ) as client:
+        try:
+            (await client.get("/health/ready")).raise_for_status()
+        except httpx.HTTPError as exc:
+            raise SystemExit(f"❌ API indisponível em {url}: {exc}")
+
+        tasks = set()
+        origin = time.perf_counter()
+
+        for item in schedule:
+            delay = item[0] - (time.perf_counter() - origin)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Laço fechado: espera uma vaga (a espera conta na latência)
+            await slots.acquire()
+
+            task = asyncio.create_task(send(client, slots, origin, item, samples))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - origin
+
+    return samples, elapsed
+
+
+# ==========================================================
+# RELATÓRIO
+# ==========================================================
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict:
+    latencies = [sample.latency for sample in samples if sample.ok]
+    p50, p95, p99 = (
+        np.percentile(latencies, [50, 95, 99]) * 1000
+        if latencies else (0.0, 0.0, 0.0)
+    )
+    errors = Counter(sample.outcome for sample in samples if not sample.ok)
+
+    return {
+        "requests": len(samples),
+        "ok": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "error_rate": sum(errors.values()) / len(samples) if samples else 0.0,
+        "errors": dict(errors),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+def timeline(samples: List[Sample]) -> List[Dict]:
+    """Por segundo do cronograma: chegadas, erros e p95."""
+    seconds: Dict[int, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        seconds[int(sample.scheduled)].append(sample)
+
+    return [
+        {
+            "second": second,
+            "requests": len(items),
+            "errors": sum(not item.ok for item in items),
+            "p95_ms": float(np.percentile([item.latency for item in items], 95) * 1000),
+        }
+        for second, items in sorted(seconds.items())
+    ]
+
+
+def report(samples: List[Sample], elapsed: float, args) -> Dict:
+    by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    rows = {name: summarize(items, elapsed) for name, items in sorted(by_endpoint.items())}
+    rows["total"] = summarize(samples, elapsed)
+
+    print(
+        f"\n{'endpoint':>14} | {'req':>7} | {'2xx/s':>8} | {'p50 (ms)':>9} | "
+        f"{'p95 (ms)':>9} | {'p99 (ms)':>9} | {'erros':>7}"
+    )
+    for name, row in rows.items():
+        print(
+            f"{name:>14} | {row['requests']:>7,} | {row['throughput']:>8,.1f} | "
+            f"{row['p50_ms']:>9.1f} | {row['p95_ms']:>9.1f} | {row['p99_ms']:>9.1f} | "
+            f"{row['error_rate']:>6.2%}"
+        )
+
+    errors = rows["total"]["errors"]
+    if errors:
+        print(f"\n⚠️ Erros: {', '.join(f'{key}={count}' for key, count in errors.items())}")
+
+    late = [sample for sample in samples if sample.started - sample.scheduled > LATE_THRESHOLD_SECONDS]
+    if late:
+        print(
+            f"⚠️ {len(late):,} requisições saíram mais de "
+            f"{LATE_THRESHOLD_SECONDS * 1000:.0f} ms atrasadas "
+            f"(--max-in-flight atingido ou driver saturado)"
+        )
+
+    per_second = timeline(samples)
+    peak = max((second["requests"] for second in per_second), default=0)
+    # Em rajadas a média do cronograma só se aproxima de --rps em
+    # durações bem maiores que CALM_SECONDS + BURST_SECONDS
+    print(f"📈 Cronograma: {len(samples) / args.duration:.1f} req/s em média "
+          f"(alvo {args.rps:.1f}), pico de {peak} req/s | respostas 2xx: "
+          f"{rows['total']['throughput']:.1f}/s")
+
+    return {
+        "config": {
+            "url": args.url,
+            "rps": args.rps,
+            "duration": args.duration,
+            "pattern": args.pattern,
+            "burst_factor": args.burst_factor,
+            "mix": args.mix,
+            "fraud_ratio": args.fraud_ratio,
+            "batch_size": args.batch_size,
+            "max_in_flight": args.max_in_flight,
+            "seed": args.seed,
+        },
+        "elapsed_seconds": elapsed,
+        "late_requests": len(late),
+        "endpoints": rows,
+        "timeline": per_second,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Driver de carga sintética da API")
+    parser.add_argument("--url", default=DEFAULT_URL, help="URL base da API")
+    parser.add_argument("--rps", type=float, default=DEFAULT_RPS,
+                        help="Taxa média de chegadas (req/s)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_SECONDS,
+                        help="Duração do cronograma (s)")
+    parser.add_argument("--pattern", choices=PATTERNS, default="poisson",
+                        help="Processo de chegada")
+    parser.add_argument("--burst-factor", type=float, default=BURST_FACTOR,
+                        help="Taxa na rajada / taxa fora dela (--pattern bursty)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help="Pesos por endpoint (predict, predict_batch, "
+                             "transactions, anomalies, kpis)")
+    parser.add_argument("--fraud-ratio", type=float, default=FRAUD_RATIO,
+                        help="Proporção de fraudes nas transações geradas")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Transações por chamada ao /predict/batch")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="Requisições abertas ao mesmo tempo")
+    parser.add_argument("--profile", type=Path, default=PROFILE_PATH,
+                        help="Perfil ajustado (o padrão é usado se não existir)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Grava o resumo em JSON")
+    args = parser.parse_args()
+
+    schedule = build_schedule(args)
+    samples, elapsed = asyncio.run(drive(args.url, schedule, args.max_in_flight))
+    result = report(samples, elapsed, args)
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"💾 Resultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
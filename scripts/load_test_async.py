@@ -0,0 +1,195 @@
+"""
+Teste de carga da API: vazão e latência por nível de concorrência.
+
+Dispara requisições concorrentes (asyncio + httpx, uma conexão por
+cliente) contra uma API já no ar, alternando entre os endpoints de
+leitura, e mede por nível de concorrência:
+- vazão (requisições/s concluídas com sucesso)
+- latência p50 / p95 / p99
+- erros (status >= 400 ou falha de conexão)
+
+Para medir o ganho do modo assíncrono, rode com os mesmos parâmetros
+contra a versão com rotas síncronas (--output baseline.json) e contra
+a versão atual (--baseline baseline.json): a coluna "ganho" compara a
+vazão em cada nível. Com rotas síncronas a concorrência útil fica
+limitada ao threadpool do Starlette (40 threads); com rotas async o
+limite passa a ser o pool de leitura (DB_READ_POOL_SIZE +
+DB_READ_MAX_OVERFLOW, 15 por padrão): dimensione-o para a concorrência
+medida.
+
+O ganho só aparece quando a API passa a maior parte do tempo esperando
+o banco. Rode o teste de outra máquina, contra uma API com CPU sobrando:
+com gerador, API e PostgreSQL disputando os mesmos núcleos a vazão
+mede a CPU e as duas versões empatam.
+
+Execução:
+    python scripts/load_test_async.py [--url URL] [--concurrency 1,16,64,256]
+        [--duration S] [--output arquivo.json] [--baseline arquivo.json]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+DEFAULT_URL = "http://localhost:8000"
+DEFAULT_CONCURRENCY = [1, 16, 64, 256]
+DEFAULT_DURATION_SECONDS = 10.0
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+# Leituras que chegam ao banco (o /kpis responde do cache)
+ENDPOINTS = [
+    "/api/v1/transactions?limit=20",
+    "/api/v1/transactions?limit=20&is_fraud=true&count=none",
+    "/api/v1/anomalies?limit=20",
+]
+# ==========================================================
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    offset: int,
+    deadline: float,
+    latencies: List[float],
+    errors: List[int],
+) -> None:
+    """Um cliente: requisições em sequência até o deadline."""
+    index = offset
+
+    while time.perf_counter() < deadline:
+        path = ENDPOINTS[index % len(ENDPOINTS)]
+        index += 1
+
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors[0] += 1
+
+
+async def run_level(url: str, concurrency: int, duration: float) -> Dict:
+    limits = httpx.Limits(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency
+    )
+    latencies: List[float] = []
+    errors = [0]
+
+    async with httpx.AsyncClient(
+        base_url=url,
+        limits=limits,
+        timeout=REQUEST_TIMEOUT_SECONDS
+    ) as client:
+        # Aquecimento: abre as conexões antes de medir
+        await asyncio.gather(*(client.get("/health") for _ in range(concurrency)))
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            client_loop(client, offset, deadline, latencies, errors)
+            for offset in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = (
+        np.percentile(latencies, [50, 95, 99]) * 1000
+        if latencies else (0.0, 0.0, 0.0)
+    )
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+async def run_load_test(
+    url: str,
+    levels: List[int],
+    duration: float,
+    baseline: Optional[Dict[int, Dict]],
+) -> List[Dict]:
+    print(f"{'concorrência':>12} | {'req/s':>9} | {'p50 (ms)':>9} | "
+          f"{'p95 (ms)':>9} | {'p99 (ms)':>9} | {'erros':>6} | {'ganho':>6}")
+
+    results = []
+    for concurrency in levels:
+        result = await run_level(url, concurrency, duration)
+        results.append(result)
+
+        gain = "-"
+        reference = (baseline or {}).get(concurrency)
+        if reference and reference["throughput"]:
+            gain = f"{result['throughput'] / reference['throughput']:.2f}x"
+
+        print(
+            f"{concurrency:>12} | {result['throughput']:>9,.1f} | "
+            f"{result['p50_ms']:>9.1f} | {result['p95_ms']:>9.1f} | "
+            f"{result['p99_ms']:>9.1f} | {result['errors']:>6} | {gain:>6}"
+        )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga da API")
+    parser.add_argument("--url", default=DEFAULT_URL, help="URL base da API")
+    parser.add_argument(
+        "--concurrency",
+        default=",".join(map(str, DEFAULT_CONCURRENCY)),
+        help="Níveis de concorrência separados por vírgula",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=DEFAULT_DURATION_SECONDS,
+        help="Segundos de carga por nível",
+    )
+    parser.add_argument("--output", type=Path, help="Grava os resultados em JSON")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Resultados (--output) de outra execução, para a coluna ganho",
+    )
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    baseline = None
+    if args.baseline:
+        baseline = {
+            result["concurrency"]: result
+            for result in json.loads(args.baseline.read_text())
+        }
+
+    results = asyncio.run(run_load_test(args.url, levels, args.duration, baseline))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"💾 Resultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Particionamento mensal da tabela transactions (PostgreSQL).
+
+Subcomandos:
+- convert: converte a tabela existente em PARTITION BY RANGE
+  (created_at), com uma partição por mês desde a transação mais antiga
+  até --months-ahead meses à frente. Copia todas as linhas em uma
+  única transação: a tabela fica bloqueada até o fim, então rode em
+  janela de manutenção
+- maintain: roda uma vez a manutenção que a API faz periodicamente
+  (cria as partições futuras e, com PARTITION_RETENTION_MONTHS > 0,
+  arquiva os meses expirados em Parquet). Útil em cron, com a
+  manutenção da API desativada. Os meses são desanexados com DETACH
+  CONCURRENTLY; no PostgreSQL < 14 ou com uma partição DEFAULT (convert
+  de versões anteriores) isso não é possível, e o arquivamento só
+  roda com --blocking-detach, que trava transactions a cada DETACH:
+  use em janela de manutenção
+
+Execução:
+    python scripts/partition_transactions.py convert [--months-ahead N] [--keep-old]
+    python scripts/partition_transactions.py maintain [--blocking-detach]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+from app.core.config import settings
+from app.core.database import engine, create_db_and_tables
+from app.repositories.partitions_repository import PartitionsRepository
+from app.services.partition_maintenance import partition_maintainer
+
+
+def convert(months_ahead: int, keep_old: bool) -> None:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("❌ Particionamento requer PostgreSQL")
+
+    # Cria transactions se ainda não existir (idempotente)
+    create_db_and_tables()
+
+    with engine.connect() as connection:
+        if PartitionsRepository.is_partitioned(connection):
+            print("✅ transactions já é particionada")
+            return
+
+    print("🔄 Convertendo transactions em tabela particionada por mês...")
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        rows = PartitionsRepository.convert(connection, months_ahead, keep_old)
+
+    print(f"✅ {rows} transações copiadas em {time.perf_counter() - start:.1f}s.")
+
+
+def maintain(blocking_detach: bool) -> None:
+    result = partition_maintainer.run_once(blocking_detach)
+
+    print(f"🗓️ Partições criadas: {', '.join(result['created']) or 'nenhuma'}")
+    print(f"📦 Partições arquivadas: {', '.join(result['archived']) or 'nenhuma'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Particionamento de transactions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert", help="Converte a tabela existente")
+    convert_parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=settings.PARTITION_MONTHS_AHEAD,
+        help="Partições criadas à frente do mês corrente",
+    )
+    convert_parser.add_argument(
+        "--keep-old",
+        action="store_true",
+        help="Mantém a tabela original como transactions_unpartitioned",
+    )
+
+    maintain_parser = commands.add_parser(
+        "maintain",
+        help="Cria partições futuras e arquiva as expiradas",
+    )
+    maintain_parser.add_argument(
+        "--blocking-detach",
+        action="store_true",
+        help="Arquiva mesmo sem DETACH CONCURRENTLY (trava transactions; janela de manutenção)",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        convert(args.months_ahead, args.keep_old)
+    else:
+        maintain(args.blocking_detach)
+
+
+if __name__ == "__main__":
+    main()
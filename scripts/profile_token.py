@@ -0,0 +1,68 @@
+"""
+Gera um token para os headers X-Profile-Token e X-Admin-Token.
+
+Uma requisição com X-Profile-Token é perfilada pela API (PROFILING_ENABLED=true)
+e o mesmo token dá acesso a GET /profiles. O token é assinado com
+PROFILING_SECRET (HMAC-SHA256) e expira depois de --ttl segundos
+(no máximo 24 h).
+
+Com --models o token é assinado com MODELS_ADMIN_SECRET e vale para o
+header X-Admin-Token de POST /models/{versão}/activate e /models/rollback.
+
+Execução:
+    python scripts/profile_token.py [--ttl S] [--models]
+
+Exemplo:
+    curl -H "X-Profile-Token: $(python scripts/profile_token.py)" \\
+        -X POST http://localhost:8000/api/v1/predict/batch -d @lote.json
+    curl -H "X-Admin-Token: $(python scripts/profile_token.py --models)" \\
+        -X POST http://localhost:8000/api/v1/models/v2/activate
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+from app.core.config import settings
+from app.core.profiling import MAX_TOKEN_TTL_SECONDS, sign_profile_token
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+DEFAULT_TTL_SECONDS = 600
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ttl", type=int, default=DEFAULT_TTL_SECONDS,
+                        help="validade do token em segundos")
+    parser.add_argument("--models", action="store_true",
+                        help="token X-Admin-Token (MODELS_ADMIN_SECRET)")
+    args = parser.parse_args()
+
+    name = "MODELS_ADMIN_SECRET" if args.models else "PROFILING_SECRET"
+    secret = getattr(settings, name)
+    if not secret:
+        sys.exit(f"❌ {name} não definido")
+
+    if not 0 < args.ttl <= MAX_TOKEN_TTL_SECONDS:
+        sys.exit(f"❌ --ttl deve estar entre 1 e {MAX_TOKEN_TTL_SECONDS}")
+
+    print(sign_profile_token(secret, int(time.time()) + args.ttl))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Reconstrução do rollup diário de KPIs (tabela daily_kpis).
+
+O rollup é mantido incrementalmente pelos INSERTs da API e do seed.
+Este script recalcula os agregados a partir da tabela transactions,
+por exemplo depois de uma carga feita por fora da aplicação.
+
+Execução:
+    python scripts/rebuild_daily_kpis.py [--since AAAA-MM-DD]
+
+Sem --since, o rollup é recalculado a partir da transação mais antiga
+(dias de partições já arquivadas são preservados). Deve ser executado
+a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# ==========================================================
+# CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "backend"))
+# ==========================================================
+
+from sqlmodel import Session
+
+from app.core.database import engine, create_db_and_tables
+from app.repositories.kpi_repository import KPIRepository
+
+
+def rebuild(since: date | None = None) -> None:
+    # Cria daily_kpis se ainda não existir (idempotente)
+    create_db_and_tables()
+
+    scope = f"a partir de {since}" if since else "completo"
+    print(f"🔄 Reconstruindo rollup diário ({scope})...")
+
+    start = time.perf_counter()
+    with Session(engine) as session:
+        days = KPIRepository.rebuild_daily(session, since)
+
+    print(f"✅ {days} dias recalculados em {time.perf_counter() - start:.1f}s.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstrói a tabela daily_kpis")
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        default=None,
+        help="Recalcula apenas os dias a partir desta data (AAAA-MM-DD)",
+    )
+    args = parser.parse_args()
+
+    rebuild(args.since)
+
+
+if __name__ == "__main__":
+    main()
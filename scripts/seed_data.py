@@ -3,20 +3,40 @@ Seed de dados para o banco PostgreSQL.
 
 Este script:
 - Cria as tabelas do banco (se não existirem)
-- Lê o dataset creditcard.csv
-- Processa os dados via modelo de detecção de fraude
-- Persiste as transações no banco
+- Lê o dataset em blocos (memória constante): do feature store em
+  data/processed quando ele corresponde ao CSV e guarda os valores sem
+  perda (scripts/build_feature_store.py --dtype float64), senão do
+  creditcard.csv
+- Processa cada bloco via modelo de detecção de fraude
+- Persiste cada bloco com COPY FROM STDIN (INSERT multi-linha
+  em outros bancos)
+- Reporta o throughput em linhas/s
+
+Cada bloco é gravado junto com um checkpoint (seed_checkpoints) na
+mesma transação, identificado pelo hash do arquivo e pela faixa de
+linhas. Rodar de novo pula os blocos já gravados: uma carga
+interrompida continua de onde parou, sem duplicar transações.
+
+Com --workers N, N processos pontuam e gravam blocos disjuntos em
+paralelo.
 
 Execução:
-    python scripts/seed_data.py
+    python scripts/seed_data.py [--workers N] [--chunk-size LINHAS]
 
 Deve ser executado a partir da raiz do projeto.
 """
 
 from __future__ import annotations
 
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import io
+import multiprocessing
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterator, Set
 
 # ==========================================================
 # CONFIGURAÇÃO DE PATH (scripts/ -> raiz do projeto)
@@ -27,70 +47,306 @@ sys.path.append(str(PROJECT_ROOT / "backend"))
 # ==========================================================
 
 import pandas as pd
-from sqlmodel import Session
+from sqlalchemy import insert
+from sqlmodel import Session, select
 
+from app.core.config import settings
 from app.core.database import engine, create_db_and_tables
+from app.ml.feature_store import FeatureStore, file_hash
+from app.models.seed_checkpoint import SeedCheckpoint
 from app.models.transaction import Transaction
-from app.services.deteccao import detector
+from app.repositories.kpi_repository import KPIRepository
 
 # ==========================================================
 # CONSTANTES
 # ==========================================================
 CSV_FILE_PATH = PROJECT_ROOT / "data" / "raw" / "creditcard.csv"
-BATCH_SIZE = 5_000  # evita estouro de memória
+FEATURE_STORE_PATH = PROJECT_ROOT / "data" / "processed" / "creditcard"
+CHUNK_SIZE = 50_000  # linhas por bloco lido, pontuado e gravado
+
+# Colunas lidas do feature store (projeção: "class" não é carregada)
+STORE_COLUMNS = ["time", "amount"] + [f"v{i}" for i in range(1, 29)]
+
+COPY_COLUMNS = (
+    ["time", "amount"]
+    + [f"v{i}" for i in range(1, 29)]
+    + ["prediction", "risk_score", "risk_level", "model_version", "created_at"]
+)
+ROLLUP_COLUMNS = ["created_at", "prediction", "risk_level", "amount"]
+COPY_SQL = (
+    f"COPY {Transaction.__tablename__} ({', '.join(COPY_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
 # ==========================================================
 
 
-def seed_database() -> None:
-    """Executa o processo completo de seed do banco."""
-    print("🔄 Iniciando seed do banco de dados...")
+def read_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Lê o CSV em blocos de chunk_size linhas."""
+    yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def open_source() -> tuple:
+    """
+    Escolhe a origem dos dados e devolve (hash do CSV, leitor de blocos).
+    O hash é sempre o do CSV, então checkpoints gravados a partir do
+    CSV e do feature store são intercambiáveis. Por isso o store só é
+    usado se for float64: um store float32 gravaria V1..V28 com menos
+    precisão, e uma carga retomada pela outra origem misturaria as duas
+    precisões na tabela.
+    """
+    source_hash = file_hash(CSV_FILE_PATH) if CSV_FILE_PATH.exists() else None
 
-    if not CSV_FILE_PATH.exists():
+    if FeatureStore.exists(FEATURE_STORE_PATH):
+        store = FeatureStore.open(FEATURE_STORE_PATH)
+
+        if not store.lossless:
+            print(
+                "⚠️ Feature store em float32 (perde precisão ao persistir); "
+                "gere com --dtype float64 para usá-lo no seed"
+            )
+        elif source_hash is None or store.source_hash == source_hash:
+            print(f"📦 Lendo do feature store: {FEATURE_STORE_PATH}")
+            return store.source_hash, (
+                lambda chunk_size: store.iter_chunks(chunk_size, STORE_COLUMNS)
+            )
+        else:
+            print("⚠️ Feature store desatualizado em relação ao CSV; usando o CSV")
+
+    if source_hash is None:
         raise FileNotFoundError(
             f"Arquivo CSV não encontrado em: {CSV_FILE_PATH}"
         )
 
+    print(f"📄 Lendo do CSV: {CSV_FILE_PATH}")
+    return source_hash, lambda chunk_size: read_chunks(CSV_FILE_PATH, chunk_size)
+
+
+def score_chunk(detector, chunk: pd.DataFrame) -> pd.DataFrame:
+    """Pontua um bloco e devolve apenas as colunas gravadas, na ordem do COPY."""
+    df = detector.process_dataframe(chunk)
+    df["created_at"] = datetime.utcnow()
+    return df[COPY_COLUMNS]
+
+
+def copy_chunk(connection, df: pd.DataFrame) -> None:
+    """
+    Grava o bloco na transação da conexão. No PostgreSQL usa COPY FROM
+    STDIN (psycopg 3) a partir de um CSV em memória; nos demais bancos,
+    um INSERT multi-linha.
+    """
+    if connection.dialect.name != "postgresql":
+        connection.execute(insert(Transaction), df.to_dict("records"))
+        return
+
+    buffer = io.StringIO()
+    df.to_csv(buffer, header=False, index=False)
+
+    with connection.connection.cursor() as cursor, cursor.copy(COPY_SQL) as copy:
+        copy.write(buffer.getvalue())
+
+
+def load_chunk(detector, chunk: pd.DataFrame, checkpoint: Dict) -> int:
+    """
+    Pontua o bloco e grava linhas, rollup diário e checkpoint em uma
+    única transação. Se o checkpoint já existir (outra execução gravou
+    o bloco), a chave primária rejeita o commit inteiro e nada é
+    duplicado.
+    """
+    df = score_chunk(detector, chunk)
+
+    with engine.begin() as connection:
+        copy_chunk(connection, df)
+        KPIRepository.increment_daily(
+            connection,
+            df[ROLLUP_COLUMNS].to_dict("records")
+        )
+        connection.execute(insert(SeedCheckpoint), [checkpoint])
+
+    return len(df)
+
+
+def committed_chunks(source_hash: str, chunk_size: int) -> Set[int]:
+    """Linhas iniciais dos blocos já gravados para este arquivo."""
+    with Session(engine) as session:
+        checkpoints = session.exec(
+            select(SeedCheckpoint).where(SeedCheckpoint.source_hash == source_hash)
+        ).all()
+
+    sizes = {checkpoint.chunk_size for checkpoint in checkpoints}
+    if sizes and sizes != {chunk_size}:
+        raise ValueError(
+            f"Seed anterior usou --chunk-size {sizes.pop()}; "
+            "use o mesmo valor para retomar"
+        )
+
+    return {checkpoint.start_row for checkpoint in checkpoints}
+
+
+# ==========================================================
+# WORKERS (modo paralelo)
+# ==========================================================
+
+_worker_detector = None
+
+
+def _init_worker() -> None:
+    global _worker_detector
+
+    from app.services.deteccao import detector
+
+    if not detector.ready:
+        detector.load()
+    _worker_detector = detector
+
+
+def _load_chunk_in_worker(chunk: pd.DataFrame, checkpoint: Dict) -> int:
+    return load_chunk(_worker_detector, chunk, checkpoint)
+
+
+# ==========================================================
+# SEED
+# ==========================================================
+
+def seed_database(workers: int = 1, chunk_size: int = CHUNK_SIZE) -> None:
+    """Executa o processo completo de seed do banco."""
+    print("🔄 Iniciando seed do banco de dados...")
+
+    source_hash, reader = open_source()
+
     # Cria tabelas (idempotente)
     create_db_and_tables()
 
-    # Carrega dataset
-    print("📥 Carregando CSV...")
-    df = pd.read_csv(CSV_FILE_PATH)
+    done = committed_chunks(source_hash, chunk_size)
+    if done:
+        print(f"⏭️ {len(done)} blocos já gravados serão pulados")
 
-    # Processa com pipeline de ML
-    print("🤖 Processando dados com modelo de detecção...")
-    df = detector.process_dataframe(df)
+    def pending_chunks():
+        for index, chunk in enumerate(reader(chunk_size)):
+            start_row = index * chunk_size
+            if start_row in done:
+                continue
 
-    # Garante apenas colunas do modelo
-    allowed_fields = set(Transaction.model_fields.keys())
-    df = df[[col for col in df.columns if col in allowed_fields]]
+            yield chunk, {
+                "source_hash": source_hash,
+                "source_name": CSV_FILE_PATH.name,
+                "start_row": start_row,
+                "end_row": start_row + len(chunk),
+                "chunk_size": chunk_size,
+            }
+
+    print(
+        f"📥 Processando em blocos de {chunk_size} linhas "
+        f"({workers} worker{'s' if workers > 1 else ''})..."
+    )
+    start = time.perf_counter()
+
+    if workers > 1:
+        total = _seed_parallel(pending_chunks(), workers)
+    else:
+        total = _seed_sequential(pending_chunks())
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ {total} transações inseridas com sucesso "
+        f"em {elapsed:.1f}s ({total / elapsed:,.0f} linhas/s)."
+    )
 
-    print("💾 Inserindo registros no banco...")
-    with Session(engine) as session:
-        buffer = []
 
-        for _, row in df.iterrows():
-            buffer.append(Transaction(**row.to_dict()))
+def _seed_sequential(chunks) -> int:
+    # Import tardio: os workers do pool de scoring (spawn) reimportam
+    # este módulo e não devem carregar o modelo do sklearn
+    from app.services.deteccao import detector
+    from app.services.scoring_pool import scoring_pool
+
+    if not detector.ready:
+        detector.load()
+
+    if settings.SCORING_POOL_WORKERS > 0:
+        scoring_pool.start()
+
+    total = 0
+    try:
+        for chunk, checkpoint in chunks:
+            chunk_start = time.perf_counter()
+            rows = load_chunk(detector, chunk, checkpoint)
 
-            if len(buffer) >= BATCH_SIZE:
-                session.add_all(buffer)
-                session.commit()
-                buffer.clear()
+            total += rows
+            elapsed = time.perf_counter() - chunk_start
+            print(
+                f"💾 linhas {checkpoint['start_row']}-{checkpoint['end_row']} "
+                f"gravadas ({rows / elapsed:,.0f} linhas/s no bloco)"
+            )
+    finally:
+        scoring_pool.stop()
 
-        if buffer:
-            session.add_all(buffer)
-            session.commit()
+    return total
 
-    print(f"✅ {len(df)} transações inseridas com sucesso.")
+
+def _seed_parallel(chunks, workers: int) -> int:
+    """
+    O processo principal lê o CSV e distribui os blocos; cada worker
+    pontua e grava o seu bloco em uma conexão própria. No máximo
+    2 * workers blocos ficam em memória ao mesmo tempo.
+    """
+    total = 0
+    in_flight = {}
+
+    def collect(futures) -> int:
+        rows = 0
+        for future in futures:
+            checkpoint = in_flight.pop(future)
+            rows += future.result()
+            print(
+                f"💾 linhas {checkpoint['start_row']}-{checkpoint['end_row']} gravadas"
+            )
+        return rows
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as executor:
+        try:
+            for chunk, checkpoint in chunks:
+                if len(in_flight) >= 2 * workers:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    total += collect(finished)
+
+                future = executor.submit(_load_chunk_in_worker, chunk, checkpoint)
+                in_flight[future] = checkpoint
+
+            total += collect(list(in_flight))
+        except BaseException:
+            # Blocos já gravados ficam no checkpoint; o resto é refeito
+            for future in in_flight:
+                future.cancel()
+            raise
+
+    return total
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed do banco de transações")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processos pontuando e gravando blocos em paralelo",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="Linhas por bloco (precisa ser o mesmo ao retomar)",
+    )
+    args = parser.parse_args()
+
     try:
-        seed_database()
+        seed_database(workers=args.workers, chunk_size=args.chunk_size)
     except Exception as exc:
         print("❌ Erro durante o seed do banco.")
         raise exc
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
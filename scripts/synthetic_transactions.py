@@ -0,0 +1,387 @@
+"""
+Gerador de transações sintéticas no formato do TransactionInput
+({"features": {"time", "amount", "v1".."v28"}}), para reproduzir carga
+sem o dataset real.
+
+Este script:
+- fit: ajusta, por classe (legítima / fraude), a média e a covariância
+  de V1..V28 e a distribuição log-normal de Amount a partir de
+  data/raw/creditcard.csv, e grava o perfil em
+  data/synthetic/profile.json
+- generate: grava N transações em NDJSON (uma por linha, prontas para
+  POST /predict), com a proporção de fraudes de --fraud-ratio
+
+Sem o perfil ajustado, usa DEFAULT_PROFILE: médias e desvios por classe
+aproximados das estatísticas publicadas do creditcard.csv, com
+covariância diagonal (no perfil ajustado ela é completa).
+
+Também é importado pelo scripts/load_driver.py: TransactionGenerator
+produz as features e arrival_offsets os instantes de chegada
+(constante, Poisson ou em rajadas).
+
+Execução:
+    python scripts/synthetic_transactions.py fit [--csv arquivo.csv]
+    python scripts/synthetic_transactions.py generate --count N
+        [--fraud-ratio R] [--seed S] [--output arquivo.ndjson]
+
+Deve ser executado a partir da raiz do projeto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ==========================================================
+# CONSTANTES
+# ==========================================================
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CSV_FILE_PATH = PROJECT_ROOT / "data" / "raw" / "creditcard.csv"
+PROFILE_PATH = PROJECT_ROOT / "data" / "synthetic" / "profile.json"
+
+V_COLUMNS = [f"v{i}" for i in range(1, 29)]
+FEATURES = ["time", "amount"] + V_COLUMNS
+
+FRAUD_RATIO = 0.00172    # 492 / 284.807 no dataset original
+TIME_SPAN = 172_792      # Time cobre dois dias (segundos)
+
+PATTERNS = ["constant", "poisson", "bursty"]
+BURST_FACTOR = 5.0       # taxa na rajada / taxa fora dela
+BURST_SECONDS = 2.0      # duração média de uma rajada
+CALM_SECONDS = 10.0      # duração média entre rajadas
+
+# (média, desvio) de V1..V28 por classe, aproximados do creditcard.csv
+DEFAULT_PROFILE = {
+    "legit": {
+        "mean": [0.0] * 28,
+        "std": [
+            1.96, 1.65, 1.52, 1.42, 1.38, 1.33, 1.24, 1.19, 1.10, 1.09,
+            1.02, 1.00, 0.995, 0.959, 0.915, 0.876, 0.849, 0.838, 0.814, 0.771,
+            0.735, 0.726, 0.624, 0.606, 0.521, 0.482, 0.404, 0.330,
+        ],
+        "log_amount": (3.1, 1.6),
+    },
+    "fraud": {
+        "mean": [
+            -4.77, 3.62, -7.03, 4.54, -3.15, -1.40, -5.57, 0.57, -2.58, -5.68,
+            3.80, -6.26, -0.11, -6.97, -0.09, -4.14, -6.67, -2.25, 0.68, 0.37,
+            0.71, 0.01, -0.04, -0.11, 0.04, 0.05, 0.17, 0.08,
+        ],
+        "std": [
+            6.78, 4.29, 7.11, 2.87, 5.37, 1.86, 7.21, 6.80, 2.50, 4.90,
+            2.68, 4.65, 1.10, 4.28, 1.05, 3.87, 6.97, 2.90, 1.54, 1.35,
+            3.87, 1.49, 1.58, 0.52, 0.80, 0.47, 1.38, 0.55,
+        ],
+        "log_amount": (2.4, 2.0),
+    },
+}
+# ==========================================================
+
+
+# ==========================================================
+# PERFIL
+# ==========================================================
+
+@dataclass
+class ClassProfile:
+    """Distribuição das features de uma classe."""
+    mean: np.ndarray           # V1..V28
+    cov: np.ndarray            # 28 x 28
+    log_amount_mean: float     # log1p(Amount) ~ Normal
+    log_amount_std: float
+
+    def to_dict(self) -> Dict:
+        return {
+            "mean": self.mean.tolist(),
+            "cov": self.cov.tolist(),
+            "log_amount_mean": self.log_amount_mean,
+            "log_amount_std": self.log_amount_std,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ClassProfile":
+        return cls(
+            mean=np.asarray(data["mean"], dtype=float),
+            cov=np.asarray(data["cov"], dtype=float),
+            log_amount_mean=float(data["log_amount_mean"]),
+            log_amount_std=float(data["log_amount_std"]),
+        )
+
+
+@dataclass
+class TransactionProfile:
+    legit: ClassProfile
+    fraud: ClassProfile
+    source: str
+
+    @classmethod
+    def default(cls) -> "TransactionProfile":
+        def build(data: Dict) -> ClassProfile:
+            return ClassProfile(
+                mean=np.asarray(data["mean"], dtype=float),
+                cov=np.diag(np.square(data["std"])),
+                log_amount_mean=data["log_amount"][0],
+                log_amount_std=data["log_amount"][1],
+            )
+
+        return cls(
+            legit=build(DEFAULT_PROFILE["legit"]),
+            fraud=build(DEFAULT_PROFILE["fraud"]),
+            source="padrão (aproximação do creditcard.csv)",
+        )
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, source: str) -> "TransactionProfile":
+        """df com as colunas do creditcard.csv (qualquer caixa) e Class."""
+        df = df.rename(columns=str.lower)
+
+        def build(rows: pd.DataFrame) -> ClassProfile:
+            log_amount = np.log1p(rows["amount"].to_numpy())
+            return ClassProfile(
+                mean=rows[V_COLUMNS].mean().to_numpy(),
+                cov=np.cov(rows[V_COLUMNS].to_numpy(), rowvar=False),
+                log_amount_mean=float(log_amount.mean()),
+                log_amount_std=float(log_amount.std()),
+            )
+
+        fraud = df["class"] == 1
+        if not fraud.any() or fraud.all():
+            raise ValueError("O ajuste requer transações das duas classes")
+
+        return cls(legit=build(df[~fraud]), fraud=build(df[fraud]), source=source)
+
+    @classmethod
+    def load(cls, path: Path = PROFILE_PATH) -> "TransactionProfile":
+        """Perfil ajustado (fit), se existir; senão o padrão."""
+        if not path.exists():
+            return cls.default()
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            legit=ClassProfile.from_dict(data["legit"]),
+            fraud=ClassProfile.from_dict(data["fraud"]),
+            source=data["source"],
+        )
+
+    def save(self, path: Path = PROFILE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "source": self.source,
+            "features": V_COLUMNS,
+            "legit": self.legit.to_dict(),
+            "fraud": self.fraud.to_dict(),
+        }
+        path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+# ==========================================================
+# GERADOR
+# ==========================================================
+
+class TransactionGenerator:
+    """
+    Amostra transações do perfil: V1..V28 de uma normal multivariada
+    por classe, Amount log-normal e Time a partir do instante de
+    chegada. A classe de cada transação é sorteada com fraud_ratio.
+    """
+
+    def __init__(
+        self,
+        profile: Optional[TransactionProfile] = None,
+        fraud_ratio: float = FRAUD_RATIO,
+        seed: int = 42,
+    ) -> None:
+        if not 0 <= fraud_ratio <= 1:
+            raise ValueError("fraud_ratio deve estar entre 0 e 1")
+
+        self.profile = profile or TransactionProfile.load()
+        self.fraud_ratio = fraud_ratio
+        self.rng = np.random.default_rng(seed)
+
+        # Fator de Cholesky de cada classe (amostra = média + z @ L.T)
+        self._factors = {
+            False: self._cholesky(self.profile.legit.cov),
+            True: self._cholesky(self.profile.fraud.cov),
+        }
+
+    @staticmethod
+    def _cholesky(cov: np.ndarray) -> np.ndarray:
+        # Jitter na diagonal: covariâncias ajustadas podem sair
+        # semidefinidas por arredondamento
+        jitter = 1e-9 * np.trace(cov) / len(cov)
+        return np.linalg.cholesky(cov + np.eye(len(cov)) * jitter)
+
+    def sample(
+        self,
+        n: int,
+        times: Optional[np.ndarray] = None,
+    ) -> Tuple[pd.DataFrame, np.ndarray]:
+        """n transações (colunas FEATURES) e o rótulo de fraude de cada uma."""
+        is_fraud = self.rng.random(n) < self.fraud_ratio
+        v = np.empty((n, len(V_COLUMNS)))
+        amount = np.empty(n)
+
+        for label, profile in ((False, self.profile.legit), (True, self.profile.fraud)):
+            mask = is_fraud == label
+            count = int(mask.sum())
+            if not count:
+                continue
+
+            z = self.rng.standard_normal((count, len(V_COLUMNS)))
+            v[mask] = profile.mean + z @ self._factors[label].T
+            amount[mask] = np.expm1(self.rng.normal(
+                profile.log_amount_mean, profile.log_amount_std, count
+            ))
+
+        if times is None:
+            times = np.sort(self.rng.uniform(0, TIME_SPAN, n))
+
+        df = pd.DataFrame(v, columns=V_COLUMNS)
+        df.insert(0, "amount", np.clip(amount, 0, None).round(2))
+        df.insert(0, "time", np.mod(times, TIME_SPAN).round(3))
+
+        return df, is_fraud
+
+    def payloads(
+        self,
+        n: int,
+        times: Optional[np.ndarray] = None,
+    ) -> Tuple[List[Dict], np.ndarray]:
+        """Corpos de POST /predict ({"features": {...}}) e os rótulos."""
+        df, is_fraud = self.sample(n, times)
+        return [{"features": row} for row in df.to_dict("records")], is_fraud
+
+
+# ==========================================================
+# CHEGADAS
+# ==========================================================
+
+def arrival_offsets(
+    rps: float,
+    duration: float,
+    pattern: str = "poisson",
+    seed: int = 42,
+    burst_factor: float = BURST_FACTOR,
+    burst_seconds: float = BURST_SECONDS,
+    calm_seconds: float = CALM_SECONDS,
+) -> np.ndarray:
+    """
+    Instantes de chegada (s desde o início) com taxa média rps:
+    - constant: intervalos iguais
+    - poisson: intervalos exponenciais
+    - bursty: Poisson modulado por dois estados (calmo / rajada) com
+      durações exponenciais de médias calm_seconds e burst_seconds; na
+      rajada a taxa é burst_factor vezes a do estado calmo
+    """
+    if rps <= 0 or duration <= 0:
+        return np.empty(0)
+
+    rng = np.random.default_rng(seed)
+
+    if pattern == "constant":
+        return np.arange(0, duration, 1 / rps)
+
+    if pattern == "poisson":
+        return _poisson(rng, rps, 0.0, duration)
+
+    if pattern != "bursty":
+        raise ValueError(f"Padrão de chegada desconhecido: {pattern}")
+
+    # Taxa calma tal que a média ponderada pelos tempos seja rps
+    burst_share = burst_seconds / (burst_seconds + calm_seconds)
+    calm_rate = rps / (1 - burst_share + burst_share * burst_factor)
+
+    segments = []
+    start, bursting = 0.0, False
+    while start < duration:
+        length = rng.exponential(burst_seconds if bursting else calm_seconds)
+        end = min(start + length, duration)
+        rate = calm_rate * burst_factor if bursting else calm_rate
+
+        segments.append(_poisson(rng, rate, start, end))
+        start, bursting = end, not bursting
+
+    return np.concatenate(segments)
+
+
+def _poisson(rng: np.random.Generator, rate: float, start: float, end: float) -> np.ndarray:
+    # Número de chegadas ~ Poisson e instantes uniformes no intervalo
+    count = rng.poisson(rate * (end - start))
+    return np.sort(rng.uniform(start, end, count))
+
+
+# ==========================================================
+# COMANDOS
+# ==========================================================
+
+def fit_command(args) -> None:
+    if not args.csv.exists():
+        raise SystemExit(f"❌ Arquivo CSV não encontrado em: {args.csv}")
+
+    print(f"📥 Lendo {args.csv}...")
+    df = pd.read_csv(args.csv).rename(columns=str.lower)
+
+    try:
+        profile = TransactionProfile.fit(df, source=args.csv.name)
+    except (KeyError, ValueError) as exc:
+        raise SystemExit(f"❌ Não foi possível ajustar o perfil: {exc}")
+
+    profile.save(args.output)
+
+    print(f"✅ Perfil ajustado em {len(df):,} transações "
+          f"({int(df['class'].sum()):,} fraudes) gravado em {args.output}")
+
+
+def generate_command(args) -> None:
+    generator = TransactionGenerator(
+        profile=TransactionProfile.load(args.profile),
+        fraud_ratio=args.fraud_ratio,
+        seed=args.seed,
+    )
+    payloads, is_fraud = generator.payloads(args.count)
+
+    lines = "".join(json.dumps(payload) + "\n" for payload in payloads)
+
+    if args.output is None:
+        sys.stdout.write(lines)
+        return
+
+    args.output.write_text(lines, encoding="utf-8")
+    print(f"✅ {args.count:,} transações ({int(is_fraud.sum()):,} fraudes, perfil "
+          f"{generator.profile.source}) gravadas em {args.output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gerador de transações sintéticas")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = commands.add_parser("fit", help="Ajusta o perfil a partir do CSV real")
+    fit_parser.add_argument("--csv", type=Path, default=CSV_FILE_PATH)
+    fit_parser.add_argument("--output", type=Path, default=PROFILE_PATH)
+
+    generate_parser = commands.add_parser("generate", help="Grava transações em NDJSON")
+    generate_parser.add_argument("--count", type=int, required=True)
+    generate_parser.add_argument("--fraud-ratio", type=float, default=FRAUD_RATIO)
+    generate_parser.add_argument("--seed", type=int, default=42)
+    generate_parser.add_argument("--profile", type=Path, default=PROFILE_PATH,
+                                 help="Perfil ajustado (o padrão é usado se não existir)")
+    generate_parser.add_argument("--output", type=Path,
+                                 help="Arquivo NDJSON (stdout se omitido)")
+
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        fit_command(args)
+    else:
+        generate_command(args)
+
+
+if __name__ == "__main__":
+    main()